@@ -0,0 +1,317 @@
+"""
+Benchmark de punta a punta de IOLClient contra el servidor local.
+
+Mide throughput y latencia de los metodos del cliente con concurrencia, el
+costo de decodificar cada respuesta y la contencion al renovar el token.
+Guarda los resultados en benchmarks/results y los compara con la corrida
+anterior (o con --baseline) para detectar regresiones.
+
+    python -m benchmarks.bench_client
+    python -m benchmarks.bench_client --payloads grabados/ --fail-on-regression
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import platform
+import sys
+import time
+from datetime import date, datetime
+from pathlib import Path
+
+from iol_client import IOLClient
+from iol_client.cache import ResponseCache
+from iol_client.constants import Ajustada, Instrumento, Mercado, Pais, Panel
+from iol_client.metrics import Metrics
+from iol_client.ordenes import OrdenDeCompra
+from iol_client.rate_limiter import RateLimiter
+
+from .payloads import cargar_payloads
+from .servidor import ServidorIOL
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+
+def percentil(valores: list[float], q: float) -> float:
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, math.ceil(q * len(ordenados)) - 1)]
+
+
+def crear_cliente(servidor: ServidorIOL, metrics: Metrics | None = None) -> IOLClient:
+    # sin cache, coalescing ni limitador para medir cada consulta real
+    return IOLClient(
+        "user",
+        "pass",
+        base_url=servidor.base_url,
+        token_url=servidor.token_url,
+        rate_limiter=RateLimiter(budgets={}),
+        response_cache=ResponseCache(ttls={}),
+        coalesce_requests=False,
+        metrics=metrics,
+    )
+
+
+async def medir_escenario(
+    servidor: ServidorIOL,
+    nombre: str,
+    consulta,
+    endpoint: str,
+    requests: int,
+    concurrency: int,
+) -> dict:
+    metrics = Metrics()
+    async with crear_cliente(servidor, metrics) as client:
+        # calentamiento: token y conexiones del pool
+        await asyncio.gather(*[consulta(client, i) for i in range(concurrency)])
+        metrics.endpoints.clear()
+
+        latencias = []
+        semaforo = asyncio.Semaphore(concurrency)
+
+        async def una(i: int):
+            async with semaforo:
+                started = time.perf_counter()
+                await consulta(client, i)
+                latencias.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*[una(i) for i in range(requests)])
+        segundos = time.perf_counter() - started
+
+    (medidas,) = [m for (e, _), m in metrics.endpoints.items() if e == endpoint]
+    decode = medidas.phases["decode"]
+    return {
+        "nombre": nombre,
+        "requests": requests,
+        "concurrency": concurrency,
+        "seconds": segundos,
+        "rps": requests / segundos,
+        "p50_ms": percentil(latencias, 0.50) * 1000,
+        "p95_ms": percentil(latencias, 0.95) * 1000,
+        "p99_ms": percentil(latencias, 0.99) * 1000,
+        "decode_ms": decode.sum / decode.count * 1000,
+        "bytes": medidas.bytes // medidas.requests,
+    }
+
+
+async def medir_token(servidor: ServidorIOL, rondas: int, concurrency: int) -> dict:
+    """
+    En cada ronda vence el token y lanza concurrency consultas a la vez; todas
+    deberian esperar una unica renovacion.
+    """
+    latencias = []
+    antes = servidor.token_requests
+    async with crear_cliente(servidor) as client:
+        for _ in range(rondas):
+            client.token_manager.token[".expires"] = datetime.utcnow()
+            started = time.perf_counter()
+            await asyncio.gather(
+                *[
+                    client.get_titulo_cotizacion(f"SIM{i}", Mercado.BCBA)
+                    for i in range(concurrency)
+                ]
+            )
+            latencias.append(time.perf_counter() - started)
+
+    return {
+        "nombre": "token_refresh",
+        "requests": rondas * concurrency,
+        "concurrency": concurrency,
+        "seconds": sum(latencias),
+        "rps": rondas * concurrency / sum(latencias),
+        "p50_ms": percentil(latencias, 0.50) * 1000,
+        "p95_ms": percentil(latencias, 0.95) * 1000,
+        "p99_ms": percentil(latencias, 0.99) * 1000,
+        "token_requests_per_round": (servidor.token_requests - antes) / rondas,
+    }
+
+
+async def correr(args) -> list[dict]:
+    escenarios = [
+        (
+            "cotizacion",
+            lambda client, i: client.get_titulo_cotizacion(f"SIM{i}", Mercado.BCBA),
+            "{mercado}/Titulos/{simbolo}/Cotizacion",
+            args.requests,
+            args.concurrency,
+        ),
+        (
+            "historicos",
+            lambda client, i: client.get_titulo_historicos(
+                f"SIM{i}",
+                Mercado.BCBA,
+                Ajustada.AJUSTADA,
+                date(2014, 1, 1),
+                date(2023, 12, 31),
+            ),
+            "{mercado}/Titulos/{simbolo}/Cotizacion/seriehistorica",
+            max(args.requests // 20, args.concurrency),
+            args.concurrency,
+        ),
+        (
+            "panel",
+            lambda client, i: client.get_panel_cotizaciones(
+                Pais.ARG,
+                Instrumento.ARG.ACCIONES,
+                Panel.ARG.ACCIONES.PANEL_GENERAL,
+            ),
+            "Cotizaciones/{instrumento}/{panel}/{pais}",
+            max(args.requests // 5, args.concurrency),
+            args.concurrency,
+        ),
+        (
+            "opciones",
+            lambda client, i: client.get_titulo_opciones(f"SIM{i}", Mercado.BCBA),
+            "{mercado}/Titulos/{simbolo}/Opciones",
+            max(args.requests // 5, args.concurrency),
+            args.concurrency,
+        ),
+    ]
+
+    # consultas por orden: armado, validacion y serializacion en cada envio
+    # contra una plantilla pre-codificada
+    plantillas = {}
+
+    async def orden_plantilla(client, i):
+        compra = plantillas.get(client)
+        if compra is None:
+            compra = plantillas[client] = client.plantilla_de_compra(
+                Mercado.BCBA, "GGAL"
+            )
+        return await compra.enviar(precio=100 + i % 10, cantidad=10)
+
+    escenarios += [
+        (
+            "orden",
+            lambda client, i: client.post_operar_comprar(
+                OrdenDeCompra(Mercado.BCBA, "GGAL", cantidad=10, precio=100 + i % 10)
+            ),
+            "operar/Comprar",
+            args.requests // 2,
+            args.concurrency,
+        ),
+        (
+            "orden_plantilla",
+            orden_plantilla,
+            "operar/Comprar",
+            args.requests // 2,
+            args.concurrency,
+        ),
+    ]
+
+    resultados = []
+    payloads = cargar_payloads(args.payloads)
+    async with ServidorIOL(payloads, latencia=args.latencia) as servidor:
+        for nombre, consulta, endpoint, requests, concurrency in escenarios:
+            if args.only and nombre not in args.only:
+                continue
+            resultados.append(
+                await medir_escenario(
+                    servidor, nombre, consulta, endpoint, requests, concurrency
+                )
+            )
+        if not args.only or "token_refresh" in args.only:
+            resultados.append(await medir_token(servidor, 20, args.concurrency))
+    return resultados
+
+
+def comparar(
+    resultados: list[dict], baseline: list[dict], tolerancia: float
+) -> list[str]:
+    """
+    Regresiones respecto de la corrida base: throughput menor o p95 mayor que
+    la tolerancia relativa.
+    """
+    previos = {r["nombre"]: r for r in baseline}
+    regresiones = []
+    for r in resultados:
+        previo = previos.get(r["nombre"])
+        if previo is None:
+            continue
+        if r["rps"] < previo["rps"] * (1 - tolerancia):
+            regresiones.append(
+                f"{r['nombre']}: rps {previo['rps']:.1f} -> {r['rps']:.1f}"
+            )
+        if r["p95_ms"] > previo["p95_ms"] * (1 + tolerancia):
+            regresiones.append(
+                f"{r['nombre']}: p95 {previo['p95_ms']:.2f} ms -> {r['p95_ms']:.2f} ms"
+            )
+    return regresiones
+
+
+def guardar(resultados: list[dict], args) -> Path:
+    RESULTS_DIR.mkdir(exist_ok=True)
+    archivo = RESULTS_DIR / f"{datetime.now():%Y%m%d-%H%M%S}.json"
+    archivo.write_text(
+        json.dumps(
+            {
+                "fecha": datetime.now().isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "plataforma": platform.platform(),
+                "parametros": {
+                    "requests": args.requests,
+                    "concurrency": args.concurrency,
+                    "latencia": args.latencia,
+                    "payloads": args.payloads,
+                },
+                "resultados": resultados,
+            },
+            indent=2,
+        )
+    )
+    return archivo
+
+
+def ultima_corrida() -> Path | None:
+    corridas = sorted(RESULTS_DIR.glob("*.json")) if RESULTS_DIR.exists() else []
+    return corridas[-1] if corridas else None
+
+
+def imprimir(resultados: list[dict]):
+    print(
+        f"{'escenario':14} {'req':>6} {'conc':>5} {'rps':>9} {'p50 ms':>8} "
+        f"{'p95 ms':>8} {'p99 ms':>8} {'decode ms':>10}"
+    )
+    for r in resultados:
+        decode = f"{r['decode_ms']:10.3f}" if "decode_ms" in r else " " * 10
+        print(
+            f"{r['nombre']:14} {r['requests']:6} {r['concurrency']:5} {r['rps']:9.1f} "
+            f"{r['p50_ms']:8.2f} {r['p95_ms']:8.2f} {r['p99_ms']:8.2f} {decode}"
+        )
+        if "token_requests_per_round" in r:
+            print(f"{'':14} token requests por ronda: {r['token_requests_per_round']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latencia", type=float, default=0.0)
+    parser.add_argument("--payloads", help="directorio con respuestas grabadas")
+    parser.add_argument("--only", nargs="*", help="escenarios a correr")
+    parser.add_argument("--baseline", help="resultados contra los que comparar")
+    parser.add_argument("--tolerancia", type=float, default=0.15)
+    parser.add_argument("--no-save", action="store_true")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+
+    baseline = Path(args.baseline) if args.baseline else ultima_corrida()
+    resultados = asyncio.run(correr(args))
+    imprimir(resultados)
+
+    if not args.no_save:
+        print(f"resultados guardados en {guardar(resultados, args)}")
+
+    if baseline is not None:
+        previos = json.loads(baseline.read_text())["resultados"]
+        regresiones = comparar(resultados, previos, args.tolerancia)
+        print(f"comparado con {baseline}: {len(regresiones)} regresiones")
+        for regresion in regresiones:
+            print(f"  {regresion}")
+        if regresiones and args.fail_on_regression:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Micro-benchmark del decodificador de fechas de la API.
+
+Compara iol_decoder_hook contra la implementacion anterior basada en regex y
+pandas sobre una serie historica y un panel sinteticos, y los backends de JSON
+instalados decodificando desde bytes.
+
+    python -m benchmarks.bench_decoder
+"""
+import json
+import re
+import timeit
+from datetime import datetime
+
+from iol_client.utils import (
+    HISTORICOS_DATE_FIELDS,
+    iol_decoder_hook,
+    make_iol_decoder_hook,
+)
+
+from iol_client.json_backend import get_json_backend
+
+from .payloads import historico_payload, opciones_payload, panel_payload
+
+
+def legacy_decoder_hook(dct):
+    import pandas as pd
+
+    for k, v in dct.items():
+        if isinstance(v, str):
+            if re.match(r"(\d{4}\-\d{2}\-\d{2}T\d{2}\:\d{2}\:\d{2}\.\d{3}Z)", v):
+                dct[k] = datetime.utcfromtimestamp(
+                    pd.to_datetime(v, format="%Y-%m-%dT%H:%M:%S.%fZ").timestamp()
+                )
+            elif re.match(r"(\d{4}\-\d{2}\-\d{2}T\d{2}\:\d{2}\:\d{2}\.\d{1,3}$)", v):
+                dct[k] = datetime.utcfromtimestamp(
+                    pd.to_datetime(v, format="%Y-%m-%dT%H:%M:%S.%f").timestamp()
+                )
+            elif re.match(
+                r"(\d{4}\-\d{2}\-\d{2}T\d{2}\:\d{2}\:\d{2}\.\d{7}[+-]\d{2}\:\d{2})", v
+            ):
+                dct[k] = datetime.utcfromtimestamp(
+                    pd.to_datetime(v, format="%Y-%m-%dT%H:%M:%S.%f%z").timestamp()
+                )
+            elif re.match(
+                r"([a-zA-Z]{3}, \d{2} [a-zA-Z]{3} \d{4} \d{2}\:\d{2}\:\d{2} [A-Z]{3})",
+                v,
+            ):
+                dct[k] = datetime.utcfromtimestamp(
+                    pd.to_datetime(v, format="%a, %d %b %Y %H:%M:%S %Z").timestamp()
+                )
+            elif re.match(r"(\d{4}\-\d{2}\-\d{2}T\d{2}\:\d{2}\:\d{2})", v):
+                dct[k] = datetime.strptime(v, "%Y-%m-%dT%H:%M:%S")
+
+    return dct
+
+
+def medir(nombre: str, payload: str, hooks: dict, repeticiones: int = 5):
+    resultados = {}
+    for etiqueta, hook in hooks.items():
+        segundos = min(
+            timeit.repeat(
+                lambda: json.loads(payload, object_hook=hook),
+                number=1,
+                repeat=repeticiones,
+            )
+        )
+        resultados[etiqueta] = segundos
+
+    base = resultados["legacy"]
+    for etiqueta, segundos in resultados.items():
+        print(
+            f"{nombre:10} {etiqueta:12} {segundos * 1000:9.2f} ms  x{base / segundos:6.1f}"
+        )
+
+
+def medir_backends(nombre: str, payload: str, date_fields, repeticiones: int = 5):
+    body = payload.encode()
+    resultados = {}
+    for backend in ("json", "orjson", "msgspec"):
+        try:
+            decoder = get_json_backend(backend)
+        except ImportError:
+            continue
+        resultados[backend] = min(
+            timeit.repeat(
+                lambda: decoder.decode(body, date_fields),
+                number=1,
+                repeat=repeticiones,
+            )
+        )
+
+    base = resultados["json"]
+    for backend, segundos in resultados.items():
+        print(
+            f"{nombre:10} {backend:12} {segundos * 1000:9.2f} ms  x{base / segundos:6.1f}"
+        )
+
+
+def main():
+    medir(
+        "historico",
+        historico_payload(),
+        {
+            "legacy": legacy_decoder_hook,
+            "hook": iol_decoder_hook,
+            "campos": make_iol_decoder_hook(HISTORICOS_DATE_FIELDS),
+            "sin_fechas": None,
+        },
+    )
+    medir(
+        "panel",
+        panel_payload(),
+        {
+            "legacy": legacy_decoder_hook,
+            "hook": iol_decoder_hook,
+            "campos": make_iol_decoder_hook(("fecha",)),
+            "sin_fechas": None,
+        },
+    )
+    medir_backends("historico", historico_payload(), HISTORICOS_DATE_FIELDS)
+    medir_backends("panel", panel_payload(), None)
+    medir_backends("opciones", opciones_payload(), None)
+
+
+if __name__ == "__main__":
+    main()
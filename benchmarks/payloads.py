@@ -0,0 +1,180 @@
+"""
+Respuestas sinteticas con la forma de las de la API de IOL, para los
+benchmarks y el servidor local. Se pueden reemplazar por respuestas grabadas
+con cargar_payloads().
+"""
+
+import json
+from datetime import datetime, timedelta
+from pathlib import Path
+
+
+def historico_payload(dias: int = 2500) -> str:
+    inicio = datetime(2014, 1, 2, 17, 0, 0)
+    serie = []
+    for i in range(dias):
+        fecha = inicio + timedelta(days=i)
+        serie.append(
+            {
+                "ultimoPrecio": 100.0 + i,
+                "variacion": 0.5,
+                "apertura": 99.0 + i,
+                "maximo": 101.0 + i,
+                "minimo": 98.0 + i,
+                "fechaHora": fecha.strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3],
+                "tendencia": "sube",
+                "cierreAnterior": 99.5 + i,
+                "montoOperado": 1_000_000.0,
+                "volumenNominal": 10_000,
+                "precioPromedio": 100.0,
+                "moneda": "peso_Argentino",
+                "precioAjuste": 0.0,
+                "interesesAbiertos": 0.0,
+                "puntas": None,
+                "cantidadOperaciones": 500,
+                "descripcionTitulo": "Grupo Financiero Galicia",
+                "plazo": "t2",
+                "laminaMinima": 1,
+                "lote": 1,
+            }
+        )
+    return json.dumps(serie)
+
+
+def panel_payload(titulos: int = 400) -> str:
+    panel = []
+    for i in range(titulos):
+        panel.append(
+            {
+                "simbolo": f"SIM{i}",
+                "puntas": {
+                    "cantidadCompra": 100,
+                    "precioCompra": 10.0,
+                    "precioVenta": 10.5,
+                    "cantidadVenta": 200,
+                },
+                "ultimoPrecio": 10.2,
+                "variacionPorcentual": 1.2,
+                "apertura": 10.0,
+                "maximo": 10.6,
+                "minimo": 9.9,
+                "ultimoCierre": 10.1,
+                "volumen": 15000,
+                "cantidadOperaciones": 120,
+                "fecha": "2023-11-24T16:04:25.2370547-03:00",
+                "tipoOpcion": None,
+                "precioEjercicio": None,
+                "fechaVencimiento": None,
+                "mercado": "BCBA",
+                "moneda": "AR$",
+                "descripcion": "Descripcion del titulo",
+                "plazo": "T2",
+                "laminaMinima": 1,
+                "lote": 1,
+            }
+        )
+    return json.dumps({"titulos": panel})
+
+
+def cotizacion_payload() -> str:
+    return json.dumps(
+        {
+            "ultimoPrecio": 1234.5,
+            "variacion": 1.25,
+            "apertura": 1220.0,
+            "maximo": 1240.0,
+            "minimo": 1215.0,
+            "fechaHora": "2023-11-24T16:59:58.123",
+            "tendencia": "sube",
+            "cierreAnterior": 1219.25,
+            "montoOperado": 2_500_000_000.0,
+            "volumenNominal": 2_000_000,
+            "precioPromedio": 1230.0,
+            "moneda": "peso_Argentino",
+            "precioAjuste": 0.0,
+            "interesesAbiertos": 0.0,
+            "puntas": [
+                {
+                    "cantidadCompra": 100.0 * (i + 1),
+                    "precioCompra": 1234.0 - i,
+                    "precioVenta": 1235.0 + i,
+                    "cantidadVenta": 150.0 * (i + 1),
+                }
+                for i in range(5)
+            ],
+            "cantidadOperaciones": 5400,
+            "descripcionTitulo": "Grupo Financiero Galicia",
+            "plazo": "t2",
+            "laminaMinima": 1,
+            "lote": 1,
+        }
+    )
+
+
+def opciones_payload(series: int = 300) -> str:
+    vencimientos = [
+        datetime(2023, 12, 15),
+        datetime(2024, 2, 16),
+        datetime(2024, 4, 19),
+    ]
+    opciones = []
+    for i in range(series):
+        vencimiento = vencimientos[i % len(vencimientos)]
+        tipo = "Call" if i % 2 == 0 else "Put"
+        strike = 800.0 + 20.0 * (i // 6)
+        opciones.append(
+            {
+                "cotizacion": {
+                    "ultimoPrecio": 50.0 + (i % 40),
+                    "variacion": -2.5,
+                    "apertura": 52.0,
+                    "maximo": 55.0,
+                    "minimo": 48.0,
+                    "fechaHora": "2023-11-24T16:59:01.997",
+                    "tendencia": "baja",
+                    "cierreAnterior": 51.0,
+                    "montoOperado": 125_000.0,
+                    "volumenNominal": 250,
+                    "precioPromedio": 50.5,
+                    "moneda": "peso_Argentino",
+                    "precioAjuste": 0.0,
+                    "interesesAbiertos": 0.0,
+                    "puntas": None,
+                    "cantidadOperaciones": 12,
+                    "descripcionTitulo": None,
+                    "plazo": None,
+                    "laminaMinima": 0,
+                    "lote": 0,
+                },
+                "simboloSubyacente": "GGAL",
+                "fechaVencimiento": vencimiento.strftime("%Y-%m-%dT%H:%M:%S"),
+                "tipoOpcion": tipo,
+                "simbolo": f"GF{tipo[0]}{int(strike)}{vencimiento.strftime('%b')[:2].upper()}",
+                "descripcion": f"{tipo} GGAL {strike:,.2f} Vencimiento: {vencimiento:%d/%m/%Y}",
+                "mercado": "bCBA",
+            }
+        )
+    return json.dumps(opciones)
+
+
+# respuestas por nombre, el servidor local las serializa una sola vez
+PAYLOADS = {
+    "historico": historico_payload,
+    "panel": panel_payload,
+    "cotizacion": cotizacion_payload,
+    "opciones": opciones_payload,
+}
+
+
+def cargar_payloads(directorio: str | Path | None = None) -> dict[str, bytes]:
+    """
+    Devuelve las respuestas sinteticas, reemplazando las que tengan un archivo
+    <nombre>.json grabado en directorio.
+    """
+    payloads = {nombre: crear().encode() for nombre, crear in PAYLOADS.items()}
+    if directorio is not None:
+        for nombre in PAYLOADS:
+            archivo = Path(directorio) / f"{nombre}.json"
+            if archivo.exists():
+                payloads[nombre] = archivo.read_bytes()
+    return payloads
@@ -0,0 +1,175 @@
+"""
+Servidor local que imita /token y las rutas de api/v2 de IOL usadas por los
+benchmarks, para medir el cliente sin credenciales ni red.
+
+    python -m benchmarks.servidor --port 8080
+"""
+
+import argparse
+import asyncio
+import itertools
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+from aiohttp import web
+
+from .payloads import cargar_payloads
+
+
+class ServidorIOL:
+    """
+    Sirve respuestas pre-serializadas para cotizaciones, series historicas,
+    paneles y opciones. latencia agrega una demora fija a cada respuesta y
+    expires_in define la duracion de los tokens emitidos.
+    """
+
+    def __init__(
+        self,
+        payloads: dict[str, bytes] | None = None,
+        latencia: float = 0.0,
+        expires_in: int = 900,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ) -> None:
+        self.payloads = cargar_payloads() if payloads is None else payloads
+        self.latencia = latencia
+        self.expires_in = expires_in
+        self.host = host
+        self.port = port
+        self.token_requests = 0
+        self.requests = 0
+        self._tokens = set()
+        self._secuencia = itertools.count()
+        self._runner: web.AppRunner | None = None
+
+        self.app = web.Application()
+        self.app.router.add_post("/token", self._token)
+        api = "/api/v2"
+        self.app.router.add_get(
+            api
+            + "/{mercado}/Titulos/{simbolo}/Cotizacion/seriehistorica/{desde}/{hasta}/{ajustada}",
+            self._payload("historico"),
+        )
+        self.app.router.add_get(
+            api + "/{mercado}/Titulos/{simbolo}/Cotizacion",
+            self._payload("cotizacion"),
+        )
+        self.app.router.add_get(
+            api + "/{mercado}/Titulos/{simbolo}/Opciones", self._payload("opciones")
+        )
+        self.app.router.add_get(
+            api + "/Cotizaciones/{instrumento}/{panel}/{pais}", self._payload("panel")
+        )
+        self.app.router.add_post(api + "/operar/{operacion}", self._operar)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}/api/v2/"
+
+    @property
+    def token_url(self) -> str:
+        return f"http://{self.host}:{self.port}/token"
+
+    async def start(self):
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        # con port=0 el sistema elige un puerto libre
+        self.port = site._server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def _token(self, request: web.Request) -> web.Response:
+        self.token_requests += 1
+        form = await request.post()
+        if form.get("grant_type") not in ("password", "refresh_token"):
+            return web.Response(status=400)
+        if self.latencia:
+            await asyncio.sleep(self.latencia)
+
+        numero = next(self._secuencia)
+        access_token = f"access-{numero}"
+        self._tokens.add(access_token)
+        now = datetime.now(timezone.utc)
+        return web.json_response(
+            {
+                "access_token": access_token,
+                "token_type": "bearer",
+                "expires_in": self.expires_in,
+                "refresh_token": f"refresh-{numero}",
+                ".issued": format_datetime(now, usegmt=True),
+                ".expires": format_datetime(
+                    now + timedelta(seconds=self.expires_in), usegmt=True
+                ),
+                ".refreshexpires": format_datetime(
+                    now + timedelta(hours=1), usegmt=True
+                ),
+            }
+        )
+
+    async def _operar(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        _, _, access_token = request.headers.get("Authorization", "").partition(" ")
+        if access_token not in self._tokens:
+            return web.Response(status=401)
+        orden = await request.json()
+        if self.latencia:
+            await asyncio.sleep(self.latencia)
+        return web.json_response(
+            {
+                "ok": True,
+                "messages": [],
+                "numeroOperacion": next(self._secuencia),
+                "simbolo": orden["simbolo"],
+            }
+        )
+
+    def _payload(self, nombre: str):
+        async def handler(request: web.Request) -> web.Response:
+            self.requests += 1
+            _, _, access_token = request.headers.get("Authorization", "").partition(" ")
+            if access_token not in self._tokens:
+                return web.Response(status=401)
+            if self.latencia:
+                await asyncio.sleep(self.latencia)
+            return web.Response(
+                body=self.payloads[nombre], content_type="application/json"
+            )
+
+        return handler
+
+
+async def _serve(args):
+    payloads = cargar_payloads(args.payloads)
+    async with ServidorIOL(
+        payloads, latencia=args.latencia, host=args.host, port=args.port
+    ) as servidor:
+        print(f"base_url={servidor.base_url} token_url={servidor.token_url}")
+        await asyncio.Event().wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latencia", type=float, default=0.0)
+    parser.add_argument("--payloads", help="directorio con respuestas grabadas")
+    try:
+        asyncio.run(_serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+import copy
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+# segundos de validez por endpoint casi estatico, segun el path resuelto
+DEFAULT_TTLS = {
+    # get_instrumentos
+    r"^[^/]+/Titulos/Cotizacion/Instrumentos$": 6 * 3600,
+    # get_paneles
+    r"^[^/]+/Titulos/Cotizacion/Paneles/[^/]+$": 6 * 3600,
+    # get_fci_tipo_fondos
+    r"^Titulos/FCI/TipoFondos$": 6 * 3600,
+    # get_fci_administradoras
+    r"^Titulos/FCI/Administradoras$": 6 * 3600,
+    # get_titulo
+    r"^[^/]+/Titulos/[^/]+$": 3600,
+}
+
+
+class ResponseCache:
+    """
+    Cache en memoria de respuestas GET con vencimiento por endpoint y desalojo LRU.
+    Solo se guardan los paths que coinciden con alguna expresion de ttls; cada
+    lectura devuelve una copia para que el llamador pueda modificarla.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 256,
+        ttls: dict[str, float] | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.maxsize = maxsize
+        self.ttls = [
+            (re.compile(pattern), ttl)
+            for pattern, ttl in (DEFAULT_TTLS if ttls is None else ttls).items()
+        ]
+        self.clock = clock
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def ttl(self, path: str) -> float | None:
+        for pattern, ttl in self.ttls:
+            if pattern.match(path):
+                return ttl
+        return None
+
+    def get(self, path: str, key: Hashable = None) -> tuple[bool, Any]:
+        key = (path, key)
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires, value = entry
+            if expires > self.clock():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, copy.deepcopy(value)
+            del self._entries[key]
+
+        self.misses += 1
+        return False, None
+
+    def set(self, path: str, value: Any, key: Hashable = None):
+        ttl = self.ttl(path)
+        if ttl is None:
+            return
+
+        key = (path, key)
+        self._entries[key] = (self.clock() + ttl, copy.deepcopy(value))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    # Descarta las entradas cuyo path coincide con la expresion, o todas
+    def invalidate(self, pattern: str | None = None):
+        if pattern is None:
+            self._entries.clear()
+            return
+
+        regex = re.compile(pattern)
+        for key in [key for key in self._entries if regex.search(key[0])]:
+            del self._entries[key]
+
+    def stats(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
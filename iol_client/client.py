@@ -1,14 +1,39 @@
+import asyncio
+import contextlib
+import copy
+import functools
 from enum import Enum
 import aiohttp
 import json
 import logging
-from datetime import date
+import time
+from datetime import date, datetime
+from typing import AsyncIterator
 from urllib.parse import urljoin
 
 from .ordenes import OrdenDeCompra, OrdenDeVenta, OrdenFCI
 
-from .utils import get_logger, iol_decoder_hook
-from .token_manager import TokenManager
+from .utils import HISTORICOS_DATE_FIELDS, get_logger, make_iol_decoder_hook
+from .token_manager import TOKEN_ENDPOINT, TokenManager
+from .historicos_cache import HistoricosCache
+from .operaciones_sync import OperacionesSync
+from .descarga import DescargaHistoricos, HistoricoSpec
+from .lote import LoteDeOrdenes, ResultadoLote
+from .plantillas import PlantillaDeOrden
+from .suscripcion import SuscripcionCotizaciones
+from .cache import ResponseCache
+from .endpoints import endpoint_template
+from .hedging import LatencyTracker, hedged
+from .metrics import MetricsHook, RequestSample, connection_trace_config
+from .transport import AiohttpTransport, StreamResponse, Transport
+from .json_backend import JsonBackend, get_json_backend
+from .streaming import ErrorRespuesta, JsonArrayParser
+from .rate_limiter import (
+    DEFAULT_RATE_LIMITER,
+    THROTTLE_STATUS,
+    RateLimiter,
+    parse_retry_after,
+)
 from .constants import (
     Administradora,
     Ajustada,
@@ -18,6 +43,8 @@ from .constants import (
     Pais,
     Panel,
     Plazo,
+    Tarifas,
+    TipoDeOrden,
     TipoFondo,
 )
 
@@ -29,6 +56,25 @@ def format_date(date):
     return date.strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z"
 
 
+class _ConsultaCompartida:
+    # consulta GET en curso y los llamadores que esperan su respuesta
+    def __init__(self, deadline: float | None) -> None:
+        self.task: asyncio.Future | None = None
+        self.llamadores = 0
+        self.esperando = 0
+        self.deadline = deadline
+        self.plazo: asyncio.Timeout | None = None
+
+    # el plazo de la consulta es el del llamador que mas puede esperar
+    def extender(self, deadline: float | None):
+        if self.deadline is None:
+            return
+        if deadline is None or deadline > self.deadline:
+            self.deadline = deadline
+            if self.plazo is not None:
+                self.plazo.reschedule(deadline)
+
+
 class MethodRequest(Enum):
     def __str__(self) -> str:
         return self.value
@@ -46,72 +92,520 @@ class IOLClient:
     """
 
     def __init__(
-        self, username: str, password: str, logging_level=logging.NOTSET
+        self,
+        username: str,
+        password: str,
+        logging_level=logging.NOTSET,
+        limit: int = 100,
+        limit_per_host: int = 20,
+        ttl_dns_cache: int = 300,
+        keepalive_timeout: float = 30,
+        auto_refresh_token: bool = False,
+        historicos_cache: HistoricosCache | None = None,
+        rate_limiter: RateLimiter | None = None,
+        max_retries: int = 2,
+        response_cache: ResponseCache | None = None,
+        coalesce_requests: bool = True,
+        timeout: float | None = None,
+        hedge_percentile: float = 0.95,
+        hedge_default_delay: float = 0.5,
+        hedge_min_delay: float = 0.05,
+        metrics: MetricsHook | None = None,
+        base_url: str = BASE_URL,
+        token_url: str = TOKEN_ENDPOINT,
+        transport: Transport | None = None,
+        json_backend: str | JsonBackend = "auto",
     ) -> None:
         self.logger = get_logger(__name__, logging_level)
-        self.base_url = BASE_URL
+        # se pueden apuntar a un servidor local para pruebas y benchmarks
+        self.base_url = base_url
+        # metricas por endpoint y de tokens, sin costo si no se configuran
+        self.metrics = metrics
+        # parametros del pool de conexiones compartido por el cliente y el token manager
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.ttl_dns_cache = ttl_dns_cache
+        self.keepalive_timeout = keepalive_timeout
+        self._session: aiohttp.ClientSession | None = None
+        # envio de las consultas, por defecto sobre el pool de aiohttp; se
+        # reemplaza para grabar o reproducir sesiones
+        self.transport = transport or AiohttpTransport(self._get_session)
+        # orjson o msgspec si estan instalados, el resultado no depende del backend
+        self.json_backend = get_json_backend(json_backend)
         self.token_manager = TokenManager(
-            username, password, logging_level=logging_level
+            username,
+            password,
+            logging_level=logging_level,
+            get_session=self._get_session,
+            metrics=metrics,
+            token_url=token_url,
+            transport=self.transport,
+        )
+        # renueva el token en segundo plano mientras el cliente este abierto
+        self.auto_refresh_token = auto_refresh_token
+        # almacenamiento local opcional de series historicas
+        self.historicos_cache = historicos_cache
+        # por defecto todos los clientes del proceso comparten el mismo limitador;
+        # una reproduccion no consulta la API y corre sin limite
+        if rate_limiter is None:
+            rate_limiter = (
+                DEFAULT_RATE_LIMITER if self.transport.en_red else RateLimiter({})
+            )
+        self.rate_limiter = rate_limiter
+        # reintentos de consultas GET rechazadas por exceso de pedidos
+        self.max_retries = max_retries
+        # cache de endpoints casi estaticos, ResponseCache(ttls={}) lo desactiva
+        self.response_cache = (
+            ResponseCache() if response_cache is None else response_cache
         )
+        # consultas GET identicas y simultaneas comparten una unica respuesta
+        self.coalesce_requests = coalesce_requests
+        self._inflight: dict[tuple, _ConsultaCompartida] = {}
+        # plazo limite por defecto de cada consulta, en segundos
+        self.timeout = timeout
+        # consultas de respaldo para lecturas de cotizaciones sensibles a la latencia
+        self.latencies = LatencyTracker()
+        self.hedge_percentile = hedge_percentile
+        self.hedge_default_delay = hedge_default_delay
+        self.hedge_min_delay = hedge_min_delay
+
+    async def __aenter__(self):
+        await self._get_session()
+        if self.auto_refresh_token:
+            self.token_manager.start_auto_refresh()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    # Cierra el pool de conexiones, se vuelve a abrir en la proxima consulta
+    async def close(self):
+        await self.token_manager.close()
+        await self.transport.close()
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                ttl_dns_cache=self.ttl_dns_cache,
+                keepalive_timeout=self.keepalive_timeout,
+            )
+            trace_configs = (
+                [connection_trace_config(time.perf_counter)]
+                if self.metrics is not None
+                else None
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector, trace_configs=trace_configs
+            )
+        return self._session
+
+    # Deja listos un token vigente y una conexion abierta con la API
+    async def calentar(self):
+        await self.token_manager.ensure_access_token()
+        await self.transport.warm(self.base_url)
 
     async def _get_headers(self):
         header = {"Authorization": await self.token_manager.ensure_access_token()}
         return header
 
     async def _request(
-        self, method: MethodRequest, url: str, data_body=None, json_body=None
+        self,
+        method: MethodRequest,
+        url: str,
+        data_body=None,
+        json_body=None,
+        date_fields: tuple[str, ...] | None = None,
+        timeout: float | None = None,
+        hedge: bool = False,
+    ):
+        deadline = self._deadline(timeout)
+        async with asyncio.timeout_at(deadline):
+            return await self._dispatch(
+                method, url, data_body, json_body, date_fields, hedge, deadline
+            )
+
+    # Plazo limite en segundos a partir de ahora, None si no hay limite
+    def _deadline(self, timeout: float | None) -> float | None:
+        timeout = self.timeout if timeout is None else timeout
+        if timeout is None:
+            return None
+        return asyncio.get_running_loop().time() + timeout
+
+    async def _dispatch(
+        self,
+        method: MethodRequest,
+        url: str,
+        data_body=None,
+        json_body=None,
+        date_fields: tuple[str, ...] | None = None,
+        hedge: bool = False,
+        deadline: float | None = None,
     ):
+        path = url
         url = urljoin(self.base_url, url)
 
-        async with aiohttp.ClientSession() as session:
-            async with session.request(
+        cacheable = (
+            method == MethodRequest.GET
+            and json_body is None
+            and data_body is None
+            and self.response_cache.ttl(path) is not None
+        )
+        if cacheable:
+            hit, value = self.response_cache.get(path, date_fields)
+            if hit:
+                return value
+
+        async def send():
+            return await self._send(
+                method, path, url, data_body, json_body, date_fields
+            )
+
+        async def fetch():
+            # solo las consultas idempotentes admiten una consulta de respaldo
+            if hedge and method == MethodRequest.GET:
+                status, value = await hedged(send, self._hedge_delay(path))
+            else:
+                status, value = await send()
+            if cacheable and status == 200:
+                self.response_cache.set(path, value, date_fields)
+            return value
+
+        # los metodos que modifican datos nunca se agrupan
+        if not self.coalesce_requests or method != MethodRequest.GET:
+            return await fetch()
+
+        key = (
+            path,
+            json.dumps(json_body, sort_keys=True, default=str),
+            json.dumps(data_body, sort_keys=True, default=str),
+            date_fields,
+        )
+        return await self._coalesce(key, fetch, deadline)
+
+    # Ejecuta una sola vez la consulta para todos los llamadores simultaneos con la misma clave
+    async def _coalesce(self, key: tuple, fetch, deadline: float | None = None):
+        entry = self._inflight.get(key)
+        if entry is None:
+            entry = self._inflight[key] = _ConsultaCompartida(deadline)
+
+            async def run():
+                async with asyncio.timeout_at(entry.deadline) as plazo:
+                    entry.plazo = plazo
+                    return await fetch()
+
+            entry.task = asyncio.ensure_future(run())
+            entry.task.add_done_callback(lambda t: self._inflight_done(key, t))
+        else:
+            entry.extender(deadline)
+        entry.llamadores += 1
+        entry.esperando += 1
+
+        try:
+            value = await asyncio.shield(entry.task)
+        finally:
+            entry.esperando -= 1
+            # si todos los llamadores abandonaron, la consulta ya no le sirve a nadie
+            if entry.esperando == 0 and not entry.task.done():
+                entry.task.cancel()
+                if self._inflight.get(key) is entry:
+                    del self._inflight[key]
+        # con mas de un llamador cada uno recibe su propia copia
+        return copy.deepcopy(value) if entry.llamadores > 1 else value
+
+    def _inflight_done(self, key: tuple, task: asyncio.Future):
+        entry = self._inflight.get(key)
+        if entry is not None and entry.task is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()
+
+    # Demora antes de la consulta de respaldo segun el percentil de latencias observado
+    def _hedge_delay(self, path: str) -> float:
+        delay = self.latencies.percentile(
+            endpoint_template(path), self.hedge_percentile
+        )
+        if delay is None:
+            return self.hedge_default_delay
+        return max(delay, self.hedge_min_delay)
+
+    async def _send(
+        self,
+        method: MethodRequest,
+        path: str,
+        url: str,
+        data_body=None,
+        json_body=None,
+        date_fields: tuple[str, ...] | None = None,
+    ):
+        for attempt in range(self.max_retries + 1):
+            await self.rate_limiter.acquire(path)
+            headers = await self._get_headers()
+            # cuerpo JSON ya codificado, por ejemplo de una PlantillaDeOrden
+            if isinstance(data_body, bytes):
+                headers["Content-Type"] = "application/json"
+            trace = {} if self.metrics is not None else None
+            started = time.perf_counter()
+            try:
+                resp = await self.transport.request(
+                    method.value, url, headers, data_body, json_body, trace
+                )
+            except BaseException as e:
+                if trace is not None:
+                    self._record_failure(method, path, trace, started, e)
+                raise
+            first_byte = resp.first_byte
+            self.rate_limiter.feedback(
+                path,
+                resp.status,
+                parse_retry_after(resp.headers.get("Retry-After")),
+            )
+            if resp.status != 200 and resp.status != 202:
+                self.logger.warning(f"{method.value} {url} {resp.status}")
+            else:
+                self.logger.info(f"{method.value} {url} {resp.status}")
+
+            # solo las consultas GET se reintentan al ser rechazadas por exceso
+            if (
+                resp.status in THROTTLE_STATUS
+                and method == MethodRequest.GET
+                and attempt < self.max_retries
+            ):
+                if trace is not None:
+                    self._record(method, path, resp.status, trace, started, first_byte)
+                continue
+
+            status = resp.status
+            received = time.perf_counter()
+            if status == 200:
+                self.latencies.record(endpoint_template(path), received - started)
+            break
+
+        try:
+            value = self.json_backend.decode(resp.body, date_fields)
+        except Exception as e:
+            if trace is not None:
+                self._record_failure(method, path, trace, started, e)
+            raise
+        if trace is not None:
+            self._record(
+                method,
+                path,
+                status,
+                trace,
+                started,
+                first_byte,
+                received,
+                len(resp.body),
+            )
+        return status, value
+
+    def _record(
+        self,
+        method: MethodRequest,
+        path: str,
+        status: int | str,
+        trace: dict,
+        started: float,
+        first_byte: float,
+        received: float | None = None,
+        size: int = 0,
+    ):
+        now = time.perf_counter()
+        connect = trace.get("connect", 0.0)
+        self.metrics.on_request(
+            RequestSample(
+                endpoint=endpoint_template(path),
                 method=method.value,
-                url=url,
-                headers=await self._get_headers(),
-                data=data_body,
-                json=json_body,
-            ) as resp:
-                if resp.status != 200 and resp.status != 202:
-                    self.logger.warning(f"{resp.method} {resp.url} {resp.status}")
-                else:
-                    self.logger.info(f"{resp.method} {resp.url} {resp.status}")
+                status=status,
+                connect=connect,
+                ttfb=first_byte - started - connect,
+                body=(received or first_byte) - first_byte,
+                decode=now - received if received is not None else 0.0,
+                bytes=size,
+            )
+        )
 
-                data = await resp.text()
+    # Las consultas sin respuesta se cuentan con status "timeout" o "error"
+    def _record_failure(
+        self,
+        method: MethodRequest,
+        path: str,
+        trace: dict,
+        started: float,
+        error: BaseException,
+    ):
+        # una cancelacion viene del plazo limite o de una consulta de respaldo mas rapida
+        status = (
+            "timeout"
+            if isinstance(error, (TimeoutError, asyncio.CancelledError))
+            else "error"
+        )
+        self._record(method, path, status, trace, started, time.perf_counter())
+
+    # Entrega los elementos de una respuesta con un array JSON a medida que llegan,
+    # sin cache ni coalescing; timeout limita la espera hasta los encabezados
+    # (token, limitador y conexion incluidos) y despues la espera entre partes
+    async def _stream(
+        self,
+        method: MethodRequest,
+        url: str,
+        json_body=None,
+        date_fields: tuple[str, ...] | None = None,
+        timeout: float | None = None,
+    ) -> AsyncIterator:
+        path = url
+        url = urljoin(self.base_url, url)
+        timeout = self.timeout if timeout is None else timeout
+        trace = {} if self.metrics is not None else None
+        started = time.perf_counter()
+        size = 0
+
+        try:
+            async with contextlib.AsyncExitStack() as stack:
+                async with asyncio.timeout(timeout):
+                    resp = await self._open_stream(
+                        stack, method, path, url, json_body, trace
+                    )
+                first_byte = time.perf_counter()
+                if resp.status != 200:
+                    self.logger.warning(f"{method.value} {url} {resp.status}")
+                    async with asyncio.timeout(timeout):
+                        body = b"".join([chunk async for chunk in resp.chunks])
+                    if trace is not None:
+                        self._record(
+                            method,
+                            path,
+                            resp.status,
+                            trace,
+                            started,
+                            first_byte,
+                            time.perf_counter(),
+                            len(body),
+                        )
+                    raise ErrorRespuesta(resp.status, self.json_backend.decode(body))
 
-        return json.loads(data, object_hook=iol_decoder_hook)
-        # return json.loads(data)
+                self.logger.info(f"{method.value} {url} {resp.status}")
+                parser = JsonArrayParser(
+                    decode=functools.partial(
+                        self.json_backend.decode, date_fields=date_fields
+                    )
+                )
+                while True:
+                    try:
+                        async with asyncio.timeout(timeout):
+                            chunk = await anext(resp.chunks)
+                    except StopAsyncIteration:
+                        break
+                    size += len(chunk)
+                    for item in parser.feed(chunk):
+                        yield item
+                for item in parser.close():
+                    yield item
+        except (ErrorRespuesta, GeneratorExit):
+            # el error ya se registro con su status; GeneratorExit es un
+            # consumidor que dejo de iterar antes del final
+            raise
+        except BaseException as e:
+            if trace is not None:
+                self._record_failure(method, path, trace, started, e)
+            raise
+        if trace is not None:
+            self._record(
+                method, path, 200, trace, started, first_byte, time.perf_counter(), size
+            )
+
+    # Abre la respuesta por partes; los GET rechazados por exceso se reintentan
+    async def _open_stream(
+        self,
+        stack: contextlib.AsyncExitStack,
+        method: MethodRequest,
+        path: str,
+        url: str,
+        json_body=None,
+        trace: dict | None = None,
+    ) -> StreamResponse:
+        for attempt in range(self.max_retries + 1):
+            await self.rate_limiter.acquire(path)
+            headers = await self._get_headers()
+            started = time.perf_counter()
+            resp = await stack.enter_async_context(
+                self.transport.stream(method.value, url, headers, json_body=json_body)
+            )
+            self.rate_limiter.feedback(
+                path, resp.status, parse_retry_after(resp.headers.get("Retry-After"))
+            )
+            if (
+                resp.status in THROTTLE_STATUS
+                and method == MethodRequest.GET
+                and attempt < self.max_retries
+            ):
+                self.logger.warning(f"{method.value} {url} {resp.status}")
+                if trace is not None:
+                    first_byte = time.perf_counter()
+                    self._record(method, path, resp.status, trace, started, first_byte)
+                await stack.aclose()
+                continue
+            return resp
 
     # ----------------------------
     # AsesoresTestInversor
     # obtiene las preguntas del test inversor
-    async def get_asesores_test_inversor(self):
+    async def get_asesores_test_inversor(self, timeout: float | None = None):
         path = "asesores/test-inversor"
-        return await self._request(method=MethodRequest.GET, url=path)
+        return await self._request(method=MethodRequest.GET, url=path, timeout=timeout)
 
     # envia las respuestas del test inversor
     async def post_asesores_test_inversor(
-        self, respuesta_inversor, id_cliente_asesorado: int | None = None
+        self,
+        respuesta_inversor,
+        id_cliente_asesorado: int | None = None,
+        timeout: float | None = None,
     ):
         path = (
             "asesores/test-inversor"
             if not id_cliente_asesorado
-            else f"asesores/test-inversor/{id_cliente_asesorado}" 
+            else f"asesores/test-inversor/{id_cliente_asesorado}"
         )
         return await self._request(
-            method=MethodRequest.POST, url=path, json_body=respuesta_inversor
+            method=MethodRequest.POST,
+            url=path,
+            json_body=respuesta_inversor,
+            timeout=timeout,
         )
 
     # ----------------------------
     # MiCuenta
     # Datos del estado de la cuenta del cliente autenticado
-    async def get_estado_cuenta(self):
+    async def get_estado_cuenta(self, timeout: float | None = None):
         path = f"estadocuenta"
-        return await self._request(method=MethodRequest.GET, url=path)
+        return await self._request(method=MethodRequest.GET, url=path, timeout=timeout)
 
     # Datos del portafolio del cliente autenticado para un pais determinado
-    async def get_portafolio(self, pais: Pais):
+    async def get_portafolio(self, pais: Pais, timeout: float | None = None):
         path = f"portafolio/{pais}"
-        return await self._request(method=MethodRequest.GET, url=path)
+        return await self._request(method=MethodRequest.GET, url=path, timeout=timeout)
+
+    # Valuacion de la cartera en arrays de numpy (requiere numpy), con las
+    # cotizaciones de los paneles indicados y el resto consultadas en paralelo;
+    # sin paneles se consulta cada simbolo
+    async def valuar_portafolio(
+        self,
+        pais: Pais,
+        tarifa: Tarifas | float = Tarifas.GOLD,
+        paneles: list[tuple] = (),
+        refrescar: bool = True,
+        timeout: float | None = None,
+    ):
+        from .valuacion import valuar_portafolio
+
+        return await valuar_portafolio(
+            self, pais, tarifa, paneles=paneles, refrescar=refrescar, timeout=timeout
+        )
 
     # Datos de las operaciones del cliente autenticado de acuerdo a los filtros propuestos
     async def get_operaciones(
@@ -120,6 +614,7 @@ class IOLClient:
         pais: Pais,
         fecha_desde: date,
         fecha_hasta: date,
+        timeout: float | None = None,
     ):
         path = "operaciones"
         return await self._request(
@@ -131,127 +626,357 @@ class IOLClient:
                 "fechaDesde": format_date(fecha_desde),
                 "fechaHasta": format_date(fecha_hasta),
             },
+            timeout=timeout,
         )
 
+    # Igual que get_operaciones pero entrega cada operacion a medida que llega
+    async def iter_operaciones(
+        self,
+        estado: EstadoDeOperaciones,
+        pais: Pais,
+        fecha_desde: date,
+        fecha_hasta: date,
+        timeout: float | None = None,
+    ) -> AsyncIterator[dict]:
+        async for operacion in self._stream(
+            method=MethodRequest.GET,
+            url="operaciones",
+            json_body={
+                "estado": estado.value,
+                "pais": pais.value,
+                "fechaDesde": format_date(fecha_desde),
+                "fechaHasta": format_date(fecha_hasta),
+            },
+            timeout=timeout,
+        ):
+            yield operacion
+
     # Datos de las operaciones del cliente autenticado en el ultimo mes
-    async def get_operaciones_del_mes(self):
+    async def get_operaciones_del_mes(self, timeout: float | None = None):
         path = "operaciones"
-        return await self._request(method=MethodRequest.GET, url=path)
+        return await self._request(method=MethodRequest.GET, url=path, timeout=timeout)
 
     # Datos de una determinada operación realizada por un cliente autenticado
-    async def get_operacion(self, id_operacion: int):
+    async def get_operacion(self, id_operacion: int, timeout: float | None = None):
         path = f"operaciones/{id_operacion}"
-        return await self._request(method=MethodRequest.GET, url=path)
+        return await self._request(method=MethodRequest.GET, url=path, timeout=timeout)
 
     # Cancela una determinada operación realizada por un cliente autenticado
-    async def delete_operaciones(self, id_operacion: int):
+    async def delete_operaciones(self, id_operacion: int, timeout: float | None = None):
         path = f"operaciones/{id_operacion}"
-        return await self._request(method=MethodRequest.DELETE, url=path)
+        return await self._request(
+            method=MethodRequest.DELETE, url=path, timeout=timeout
+        )
 
     # ----------------------------
     # Operar
-    async def post_operar_vender(self, orden_venta: OrdenDeVenta):
-        path = "operar/Vender"
-        return await self._request(
-            method=MethodRequest.POST,
-            url=path,
-            json_body=orden_venta.json(),
+    async def post_operar_vender(
+        self, orden_venta: OrdenDeVenta, timeout: float | None = None
+    ):
+        return await self._post_operar(
+            "operar/Vender", orden_venta.json(), timeout=timeout
         )
 
-    async def post_operar_comprar(self, orden_compra: OrdenDeCompra):
-        path = "operar/Comprar"
+    async def post_operar_comprar(
+        self, orden_compra: OrdenDeCompra, timeout: float | None = None
+    ):
+        return await self._post_operar(
+            "operar/Comprar", orden_compra.json(), timeout=timeout
+        )
+
+    # payload ya codificado en bytes se envia tal cual, sin volver a serializarlo
+    async def _post_operar(
+        self, path: str, payload: dict | bytes, timeout: float | None = None
+    ):
+        if isinstance(payload, bytes):
+            return await self._request(
+                method=MethodRequest.POST, url=path, data_body=payload, timeout=timeout
+            )
         return await self._request(
-            method=MethodRequest.POST,
-            url=path,
-            json_body=orden_compra.json(),
+            method=MethodRequest.POST, url=path, json_body=payload, timeout=timeout
+        )
+
+    # Plantillas con mercado, simbolo, plazo y tipo de orden fijos para enviar
+    # ordenes con la menor latencia posible, ver PlantillaDeOrden
+    def plantilla_de_compra(
+        self,
+        mercado: Mercado,
+        simbolo: str,
+        tipo_orden: TipoDeOrden = TipoDeOrden.PRECIO_LIMITE,
+        plazo: Plazo = Plazo.T2,
+        validez: datetime | None = None,
+    ) -> PlantillaDeOrden:
+        return PlantillaDeOrden(
+            self, "operar/Comprar", mercado, simbolo, tipo_orden, plazo, validez
+        )
+
+    def plantilla_de_venta(
+        self,
+        mercado: Mercado,
+        simbolo: str,
+        tipo_orden: TipoDeOrden = TipoDeOrden.PRECIO_LIMITE,
+        plazo: Plazo = Plazo.T2,
+        validez: datetime | None = None,
+    ) -> PlantillaDeOrden:
+        return PlantillaDeOrden(
+            self, "operar/Vender", mercado, simbolo, tipo_orden, plazo, validez
         )
 
-    async def post_operar_rescate_fci(self, orden_fci: OrdenFCI):
+    # Envia varias ordenes de compra y venta a la vez, ver LoteDeOrdenes
+    async def post_operar_lote(
+        self,
+        ordenes: list[OrdenDeCompra | OrdenDeVenta],
+        concurrency: int = 4,
+        all_or_cancel: bool = False,
+        timeout: float | None = None,
+    ) -> ResultadoLote:
+        lote = LoteDeOrdenes(
+            self,
+            ordenes,
+            concurrency=concurrency,
+            all_or_cancel=all_or_cancel,
+            timeout=timeout,
+        )
+        return await lote.enviar()
+
+    async def post_operar_rescate_fci(
+        self, orden_fci: OrdenFCI, timeout: float | None = None
+    ):
         path = "operar/rescate/fci"
         return await self._request(
             method=MethodRequest.POST,
             url=path,
             json_body=orden_fci.json(),
+            timeout=timeout,
         )
 
-    async def post_operar_suscripcion_fci(self, orden_fci: OrdenFCI):
+    async def post_operar_suscripcion_fci(
+        self, orden_fci: OrdenFCI, timeout: float | None = None
+    ):
         path = "operar/suscripcion/fci"
         return await self._request(
             method=MethodRequest.POST,
             url=path,
             json_body=orden_fci.json(),
+            timeout=timeout,
         )
 
     # ----------------------------
     # Titulos
     # consultar mas tarde por información
-    async def get_fci_por_simbolo(self, simbolo: str):
+    async def get_fci_por_simbolo(self, simbolo: str, timeout: float | None = None):
         path = f"Titulos/FCI/{simbolo}"
-        return await self._request(method=MethodRequest.GET, url=path)
+        return await self._request(method=MethodRequest.GET, url=path, timeout=timeout)
 
-    async def get_fci(self):
+    async def get_fci(self, timeout: float | None = None):
         path = "Titulos/FCI"
-        return await self._request(method=MethodRequest.GET, url=path)
+        return await self._request(method=MethodRequest.GET, url=path, timeout=timeout)
+
+    # Igual que get_fci pero entrega cada fondo a medida que llega
+    async def iter_fci(self, timeout: float | None = None) -> AsyncIterator[dict]:
+        async for fondo in self._stream(
+            method=MethodRequest.GET, url="Titulos/FCI", timeout=timeout
+        ):
+            yield fondo
 
-    async def get_fci_tipo_fondos(self):
+    async def get_fci_tipo_fondos(self, timeout: float | None = None):
         path = "Titulos/FCI/TipoFondos"
-        return await self._request(method=MethodRequest.GET, url=path)
+        return await self._request(method=MethodRequest.GET, url=path, timeout=timeout)
 
-    async def get_fci_administradoras(self):
+    async def get_fci_administradoras(self, timeout: float | None = None):
         path = "Titulos/FCI/Administradoras"
-        return await self._request(method=MethodRequest.GET, url=path)
+        return await self._request(method=MethodRequest.GET, url=path, timeout=timeout)
 
     async def get_fci_tipo_fondos_administradoras_por_administradora(
-        self, administradora: Administradora
+        self,
+        administradora: Administradora,
+        timeout: float | None = None,
     ):
         path = f"Titulos/FCI/Administradoras/{administradora}/TipoFondos"
-        return await self._request(method=MethodRequest.GET, url=path)
+        return await self._request(method=MethodRequest.GET, url=path, timeout=timeout)
 
     async def get_fci_tipo_fondos_administradoras_por_administradora_y_tipo_de_fondo(
-        self, administradora: Administradora, tipo_fondo: TipoFondo
+        self,
+        administradora: Administradora,
+        tipo_fondo: TipoFondo,
+        timeout: float | None = None,
     ):
         path = f"Titulos/FCI/Administradoras/{administradora}/TipoFondos/{tipo_fondo}"
-        return await self._request(method=MethodRequest.GET, url=path)
+        return await self._request(method=MethodRequest.GET, url=path, timeout=timeout)
 
     # ----------------------------
     # Obtener los instrumentos segun el pais
-    async def get_instrumentos(self, pais: Pais):
+    async def get_instrumentos(self, pais: Pais, timeout: float | None = None):
         path = f"{pais}/Titulos/Cotizacion/Instrumentos"
-        return await self._request(method=MethodRequest.GET, url=path)
+        return await self._request(method=MethodRequest.GET, url=path, timeout=timeout)
 
     # Obtener los paneles segun el pais e instrumento
     async def get_paneles(
-        self, pais: Pais, instrumento: Instrumento.ARG | Instrumento.USA
+        self,
+        pais: Pais,
+        instrumento: Instrumento.ARG | Instrumento.USA,
+        timeout: float | None = None,
     ):
         path = f"{pais}/Titulos/Cotizacion/Paneles/{instrumento}"
-        return await self._request(method=MethodRequest.GET, url=path)
+        return await self._request(method=MethodRequest.GET, url=path, timeout=timeout)
 
     # Obtener un titulo
-    async def get_titulo(self, simbolo: str, mercado: Mercado):
+    async def get_titulo(
+        self, simbolo: str, mercado: Mercado, timeout: float | None = None
+    ):
         path = f"{mercado}/Titulos/{simbolo}"
-        return await self._request(method=MethodRequest.GET, url=path)
+        return await self._request(method=MethodRequest.GET, url=path, timeout=timeout)
 
     # Obtener las opciones de un titulo
-    async def get_titulo_opciones(self, simbolo: str, mercado: Mercado):
+    async def get_titulo_opciones(
+        self, simbolo: str, mercado: Mercado, timeout: float | None = None
+    ):
         path = f"{mercado}/Titulos/{simbolo}/Opciones"
-        return await self._request(method=MethodRequest.GET, url=path)
+        return await self._request(method=MethodRequest.GET, url=path, timeout=timeout)
+
+    # Cadena de opciones en columnas para calcular volatilidad implicita y
+    # griegas de todas las opciones a la vez (requiere numpy)
+    async def get_cadena_opciones(
+        self,
+        simbolo: str,
+        mercado: Mercado,
+        usar_puntas: bool = True,
+        timeout: float | None = None,
+    ):
+        from .opciones import CadenaOpciones
+
+        opciones = await self.get_titulo_opciones(simbolo, mercado, timeout=timeout)
+        if not isinstance(opciones, list):
+            return opciones
+        return CadenaOpciones(opciones, usar_puntas=usar_puntas)
 
     # Obtener la cotizacion de un titulo
-    async def get_titulo_cotizacion(self, simbolo: str, mercado: Mercado):
+    # hedge envia una consulta de respaldo si la primera demora mas de lo habitual
+    async def get_titulo_cotizacion(
+        self,
+        simbolo: str,
+        mercado: Mercado,
+        timeout: float | None = None,
+        hedge: bool = False,
+    ):
         path = f"{mercado}/Titulos/{simbolo}/Cotizacion"
-        return await self._request(method=MethodRequest.GET, url=path)
+        return await self._request(
+            method=MethodRequest.GET, url=path, timeout=timeout, hedge=hedge
+        )
 
     # Obtener la serie historica de un titulo
+    # as_frame devuelve un DataFrame y as_columns un dict de arrays de numpy
     async def get_titulo_historicos(
         self,
         simbolo: str,
         mercado: Mercado,
         ajustada: Ajustada,
         fecha_desde: date = date(1970, 1, 1),
-        fecha_hasta: date = date.today(),
+        fecha_hasta: date | None = None,
+        as_frame: bool = False,
+        as_columns: bool = False,
+        timeout: float | None = None,
+    ):
+        # por defecto hasta el dia de la consulta, no el de la importacion
+        fecha_hasta = fecha_hasta or date.today()
+        columnar = as_frame or as_columns
+        if self.historicos_cache is not None:
+
+            async def fetch(desde: date, hasta: date):
+                return await self._get_titulo_historicos(
+                    simbolo, mercado, ajustada, desde, hasta
+                )
+
+            # el plazo limite abarca todos los tramos faltantes
+            async with asyncio.timeout_at(self._deadline(timeout)):
+                serie = await self.historicos_cache.get_titulo_historicos(
+                    fetch, mercado, simbolo, ajustada, fecha_desde, fecha_hasta
+                )
+        else:
+            # en modo columnar las fechas se convierten directamente a datetime64
+            serie = await self._get_titulo_historicos(
+                simbolo,
+                mercado,
+                ajustada,
+                fecha_desde,
+                fecha_hasta,
+                date_fields=() if columnar else HISTORICOS_DATE_FIELDS,
+                timeout=timeout,
+            )
+
+        if not columnar or not isinstance(serie, list):
+            return serie
+
+        from .frames import historicos_columnas, to_frame
+
+        columnas = historicos_columnas(serie)
+        return to_frame(columnas, index="fechaHora") if as_frame else columnas
+
+    async def _get_titulo_historicos(
+        self,
+        simbolo: str,
+        mercado: Mercado,
+        ajustada: Ajustada,
+        fecha_desde: date,
+        fecha_hasta: date,
+        date_fields: tuple[str, ...] = HISTORICOS_DATE_FIELDS,
+        timeout: float | None = None,
     ):
         path = f'{mercado}/Titulos/{simbolo}/Cotizacion/seriehistorica/{fecha_desde.strftime("%Y-%m-%d")}/{fecha_hasta.strftime("%Y-%m-%d")}/{ajustada}'
-        return await self._request(method=MethodRequest.GET, url=path)
+        return await self._request(
+            method=MethodRequest.GET,
+            url=path,
+            date_fields=date_fields,
+            timeout=timeout,
+        )
+
+    # Igual que get_titulo_historicos pero entrega cada barra a medida que llega,
+    # con memoria acotada sin importar el largo de la serie
+    async def iter_titulo_historicos(
+        self,
+        simbolo: str,
+        mercado: Mercado,
+        ajustada: Ajustada,
+        fecha_desde: date = date(1970, 1, 1),
+        fecha_hasta: date | None = None,
+        timeout: float | None = None,
+    ) -> AsyncIterator[dict]:
+        fecha_hasta = fecha_hasta or date.today()
+        path = f'{mercado}/Titulos/{simbolo}/Cotizacion/seriehistorica/{fecha_desde.strftime("%Y-%m-%d")}/{fecha_hasta.strftime("%Y-%m-%d")}/{ajustada}'
+        async for barra in self._stream(
+            method=MethodRequest.GET,
+            url=path,
+            date_fields=HISTORICOS_DATE_FIELDS,
+            timeout=timeout,
+        ):
+            yield barra
+
+    # Descarga concurrente de series historicas de muchos titulos
+    def descargar_historicos(
+        self,
+        specs: list[HistoricoSpec],
+        concurrency: int = 8,
+        window_days: int = 365,
+        on_progress=None,
+    ) -> DescargaHistoricos:
+        return DescargaHistoricos(
+            self,
+            specs,
+            concurrency=concurrency,
+            window_days=window_days,
+            on_progress=on_progress,
+        )
+
+    # Copia local de las operaciones que se actualiza de forma incremental
+    def sincronizador_operaciones(
+        self,
+        path: str = ":memory:",
+        window_days: int = 90,
+        concurrency: int = 4,
+    ) -> OperacionesSync:
+        return OperacionesSync(
+            self, path, window_days=window_days, concurrency=concurrency
+        )
 
     # Obtener el panel de cotizaciones
     async def get_panel_cotizaciones(
@@ -264,13 +989,58 @@ class IOLClient:
         | Panel.ARG.FUTUROS
         | Panel.ARG.FCI
         | Panel.USA.BONOS,
+        as_frame: bool = False,
+        as_columns: bool = False,
+        timeout: float | None = None,
     ):
         path = f"Cotizaciones/{instrumento}/{panel}/{pais}"
-        return await self._request(method=MethodRequest.GET, url=path)
+        if not as_frame and not as_columns:
+            return await self._request(
+                method=MethodRequest.GET, url=path, timeout=timeout
+            )
+
+        cotizaciones = await self._request(
+            method=MethodRequest.GET, url=path, date_fields=(), timeout=timeout
+        )
+        if not isinstance(cotizaciones, dict) or "titulos" not in cotizaciones:
+            return cotizaciones
+
+        from .frames import panel_columnas, to_frame
+
+        columnas = panel_columnas(cotizaciones)
+        return to_frame(columnas, index="simbolo") if as_frame else columnas
+
+    # Suscripcion a las cotizaciones de un conjunto de titulos o de un panel completo
+    def suscribir_cotizaciones(
+        self,
+        simbolos: list[str] | None = None,
+        mercado: Mercado = Mercado.BCBA,
+        pais: Pais | None = None,
+        instrumento: Instrumento.ARG | Instrumento.USA | None = None,
+        panel=None,
+        intervalo: float = 1.0,
+    ) -> SuscripcionCotizaciones:
+        return SuscripcionCotizaciones(
+            self,
+            simbolos=simbolos,
+            mercado=mercado,
+            pais=pais,
+            instrumento=instrumento,
+            panel=panel,
+            intervalo=intervalo,
+            sleep=self.transport.sleep,
+        )
 
     # obtener cotizacion en detalle de un titulo a un de terminado plazo (experimental)
     async def get_titulo_cotizacion_plazo(
-        self, mercado: Mercado, simbolo: str, plazo: Plazo
+        self,
+        mercado: Mercado,
+        simbolo: str,
+        plazo: Plazo,
+        timeout: float | None = None,
+        hedge: bool = False,
     ):
         path = f"{mercado}/Titulos/{simbolo}/CotizacionDetalleMobile/{plazo}"
-        return await self._request(method=MethodRequest.GET, url=path)
+        return await self._request(
+            method=MethodRequest.GET, url=path, timeout=timeout, hedge=hedge
+        )
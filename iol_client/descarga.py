@@ -0,0 +1,141 @@
+import asyncio
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import TYPE_CHECKING, AsyncIterator, Callable
+
+from .constants import Ajustada, Mercado
+from .historicos_cache import as_date
+
+if TYPE_CHECKING:
+    from .client import IOLClient
+
+
+@dataclass(frozen=True)
+class HistoricoSpec:
+    simbolo: str
+    mercado: Mercado
+    ajustada: Ajustada = Ajustada.SIN_AJUSTAR
+    fecha_desde: date = date(1970, 1, 1)
+    fecha_hasta: date = field(default_factory=date.today)
+
+
+@dataclass
+class ReporteDescarga:
+    total: int = 0
+    ventanas: int = 0
+    ventanas_completadas: int = 0
+    completados: list[HistoricoSpec] = field(default_factory=list)
+    fallidos: list[tuple[HistoricoSpec, Exception]] = field(default_factory=list)
+
+    @property
+    def pendientes(self) -> int:
+        return self.total - len(self.completados) - len(self.fallidos)
+
+
+class ErrorDescarga(Exception):
+    def __init__(self, spec: HistoricoSpec, respuesta) -> None:
+        super().__init__(f"{spec.mercado}/{spec.simbolo}: {respuesta}")
+        self.spec = spec
+        self.respuesta = respuesta
+
+
+def ventanas(desde: date, hasta: date, dias: int) -> list[tuple[date, date]]:
+    if dias < 1:
+        raise AttributeError("Las ventanas deben ser de al menos un dia")
+    desde, hasta = as_date(desde), as_date(hasta)
+    res = []
+    while desde <= hasta:
+        fin = min(desde + timedelta(days=dias - 1), hasta)
+        res.append((desde, fin))
+        desde = fin + timedelta(days=1)
+    return res
+
+
+class DescargaHistoricos:
+    """
+    Descarga concurrente de series historicas para muchos titulos.
+    Divide cada rango en ventanas, limita las consultas simultaneas y entrega
+    cada serie completa, de la fecha mas reciente a la mas antigua, apenas termina.
+
+        async for spec, serie in client.descargar_historicos(specs):
+            ...
+    """
+
+    def __init__(
+        self,
+        client: "IOLClient",
+        specs: list[HistoricoSpec],
+        concurrency: int = 8,
+        window_days: int = 365,
+        on_progress: Callable[[ReporteDescarga], None] | None = None,
+    ) -> None:
+        if window_days < 1:
+            raise AttributeError("window_days debe ser al menos 1")
+        self.client = client
+        self.specs = list(specs)
+        self.concurrency = concurrency
+        self.window_days = window_days
+        self.on_progress = on_progress
+        self.reporte = ReporteDescarga(total=len(self.specs))
+
+    def __aiter__(self) -> AsyncIterator[tuple[HistoricoSpec, list[dict]]]:
+        return self._run()
+
+    async def _run(self):
+        sem = asyncio.Semaphore(self.concurrency)
+        tasks = [asyncio.create_task(self._descargar(spec, sem)) for spec in self.specs]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                spec, serie, error = await next_done
+                if error is not None:
+                    self.reporte.fallidos.append((spec, error))
+                else:
+                    self.reporte.completados.append(spec)
+                self._progress()
+
+                if error is None:
+                    yield spec, serie
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _descargar(self, spec: HistoricoSpec, sem: asyncio.Semaphore):
+        rangos = ventanas(spec.fecha_desde, spec.fecha_hasta, self.window_days)
+        self.reporte.ventanas += len(rangos)
+
+        async def ventana(desde: date, hasta: date):
+            async with sem:
+                serie = await self.client.get_titulo_historicos(
+                    simbolo=spec.simbolo,
+                    mercado=spec.mercado,
+                    ajustada=spec.ajustada,
+                    fecha_desde=desde,
+                    fecha_hasta=hasta,
+                )
+            if not isinstance(serie, list):
+                raise ErrorDescarga(spec, serie)
+            self.reporte.ventanas_completadas += 1
+            self._progress()
+            return serie
+
+        # si falla una ventana el TaskGroup cancela las demas del mismo titulo
+        try:
+            async with asyncio.TaskGroup() as tg:
+                tareas = [tg.create_task(ventana(d, h)) for d, h in rangos]
+        except ExceptionGroup as grupo:
+            return spec, None, grupo.exceptions[0]
+
+        # une las ventanas descartando barras repetidas en los bordes y sin fecha
+        barras = {}
+        for tarea in tareas:
+            for barra in tarea.result():
+                if barra.get("fechaHora") is not None:
+                    barras[barra["fechaHora"]] = barra
+        serie = sorted(
+            barras.values(), key=lambda barra: barra["fechaHora"], reverse=True
+        )
+        return spec, serie, None
+
+    def _progress(self):
+        if self.on_progress is not None:
+            self.on_progress(self.reporte)
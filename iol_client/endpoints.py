@@ -0,0 +1,59 @@
+import re
+
+# plantillas de los paths usados por IOLClient, en orden de prioridad
+ENDPOINT_TEMPLATES = [
+    (r"asesores/test-inversor", "asesores/test-inversor"),
+    (r"asesores/test-inversor/[^/]+", "asesores/test-inversor/{id_cliente}"),
+    (r"estadocuenta", "estadocuenta"),
+    (r"portafolio/[^/]+", "portafolio/{pais}"),
+    (r"operaciones", "operaciones"),
+    (r"operaciones/[^/]+", "operaciones/{id_operacion}"),
+    (r"operar/[^/]+", None),
+    (r"operar/(?:rescate|suscripcion)/fci", None),
+    (r"Titulos/FCI", None),
+    (r"Titulos/FCI/(?:TipoFondos|Administradoras)", None),
+    (
+        r"Titulos/FCI/Administradoras/[^/]+/TipoFondos",
+        "Titulos/FCI/Administradoras/{administradora}/TipoFondos",
+    ),
+    (
+        r"Titulos/FCI/Administradoras/[^/]+/TipoFondos/[^/]+",
+        "Titulos/FCI/Administradoras/{administradora}/TipoFondos/{tipo_fondo}",
+    ),
+    (r"Titulos/FCI/[^/]+", "Titulos/FCI/{simbolo}"),
+    (
+        r"[^/]+/Titulos/Cotizacion/Instrumentos",
+        "{pais}/Titulos/Cotizacion/Instrumentos",
+    ),
+    (
+        r"[^/]+/Titulos/Cotizacion/Paneles/[^/]+",
+        "{pais}/Titulos/Cotizacion/Paneles/{instrumento}",
+    ),
+    (r"[^/]+/Titulos/[^/]+", "{mercado}/Titulos/{simbolo}"),
+    (r"[^/]+/Titulos/[^/]+/Opciones", "{mercado}/Titulos/{simbolo}/Opciones"),
+    (r"[^/]+/Titulos/[^/]+/Cotizacion", "{mercado}/Titulos/{simbolo}/Cotizacion"),
+    (
+        r"[^/]+/Titulos/[^/]+/Cotizacion/seriehistorica/[^/]+/[^/]+/[^/]+",
+        "{mercado}/Titulos/{simbolo}/Cotizacion/seriehistorica",
+    ),
+    (
+        r"[^/]+/Titulos/[^/]+/CotizacionDetalleMobile/[^/]+",
+        "{mercado}/Titulos/{simbolo}/CotizacionDetalleMobile/{plazo}",
+    ),
+    (r"Cotizaciones/[^/]+/[^/]+/[^/]+", "Cotizaciones/{instrumento}/{panel}/{pais}"),
+]
+
+_COMPILED = [
+    (re.compile(pattern + "$"), template) for pattern, template in ENDPOINT_TEMPLATES
+]
+
+
+def endpoint_template(path: str) -> str:
+    """
+    Plantilla del endpoint de un path resuelto, sin simbolos ni fechas, para
+    agrupar metricas y latencias. Las rutas fijas se devuelven tal cual.
+    """
+    for pattern, template in _COMPILED:
+        if pattern.match(path):
+            return path if template is None else template
+    return path
@@ -0,0 +1,118 @@
+"""
+Salida columnar de series historicas y paneles de cotizaciones.
+
+Requiere numpy (y pandas para DataFrame), por lo que el modulo solo se importa
+cuando se pide as_frame o as_columns.
+"""
+
+from datetime import datetime
+from typing import Any, Callable
+
+import numpy as np
+
+from .utils import parse_iol_date
+
+HISTORICOS_COLUMNS = {
+    "fechaHora": "datetime64[us]",
+    "ultimoPrecio": "float64",
+    "apertura": "float64",
+    "maximo": "float64",
+    "minimo": "float64",
+    "cierreAnterior": "float64",
+    "variacion": "float64",
+    "precioPromedio": "float64",
+    "precioAjuste": "float64",
+    "montoOperado": "float64",
+    "interesesAbiertos": "float64",
+    "volumenNominal": "int64",
+    "cantidadOperaciones": "int64",
+}
+
+PANEL_COLUMNS = {
+    "simbolo": "object",
+    "fecha": "datetime64[us]",
+    "ultimoPrecio": "float64",
+    "variacionPorcentual": "float64",
+    "apertura": "float64",
+    "maximo": "float64",
+    "minimo": "float64",
+    "ultimoCierre": "float64",
+    "volumen": "int64",
+    "cantidadOperaciones": "int64",
+}
+
+# campos anidados en "puntas" (mejor oferta de compra y venta)
+PUNTAS_COLUMNS = {
+    "precioCompra": "float64",
+    "precioVenta": "float64",
+    "cantidadCompra": "float64",
+    "cantidadVenta": "float64",
+}
+
+
+def _float(value: Any) -> float:
+    return np.nan if value is None else value
+
+
+def _int(value: Any) -> int:
+    return 0 if value is None else int(value)
+
+
+def _datetime_column(values: list) -> np.ndarray:
+    # camino rapido: numpy interpreta los ISO sin zona horaria directamente,
+    # las fechas con offset (mas de 24 caracteres) se convierten a UTC una por una
+    if not any(isinstance(v, str) and len(v) > 24 for v in values):
+        try:
+            return np.array(
+                [v.rstrip("Z") if isinstance(v, str) else v for v in values],
+                dtype="datetime64[us]",
+            )
+        except ValueError:
+            pass
+
+    parsed = []
+    for v in values:
+        if isinstance(v, str):
+            v = parse_iol_date(v)
+        parsed.append(v if isinstance(v, datetime) else None)
+    return np.array(parsed, dtype="datetime64[us]")
+
+
+def _column(rows: list[dict], get: Callable[[dict], Any], dtype: str) -> np.ndarray:
+    n = len(rows)
+    if dtype == "float64":
+        return np.fromiter((_float(get(r)) for r in rows), dtype=np.float64, count=n)
+    if dtype == "int64":
+        return np.fromiter((_int(get(r)) for r in rows), dtype=np.int64, count=n)
+    if dtype.startswith("datetime64"):
+        return _datetime_column([get(r) for r in rows])
+    return np.array([get(r) for r in rows], dtype=object)
+
+
+def historicos_columnas(serie: list[dict]) -> dict[str, np.ndarray]:
+    return {
+        name: _column(serie, lambda r, name=name: r.get(name), dtype)
+        for name, dtype in HISTORICOS_COLUMNS.items()
+    }
+
+
+def panel_columnas(panel: dict | list) -> dict[str, np.ndarray]:
+    titulos = panel.get("titulos", []) if isinstance(panel, dict) else panel
+    columnas = {
+        name: _column(titulos, lambda r, name=name: r.get(name), dtype)
+        for name, dtype in PANEL_COLUMNS.items()
+    }
+    for name, dtype in PUNTAS_COLUMNS.items():
+        columnas[name] = _column(
+            titulos, lambda r, name=name: (r.get("puntas") or {}).get(name), dtype
+        )
+    return columnas
+
+
+def to_frame(columnas: dict[str, np.ndarray], index: str | None = None):
+    import pandas as pd
+
+    frame = pd.DataFrame(columnas, copy=False)
+    if index is not None:
+        frame = frame.set_index(index)
+    return frame
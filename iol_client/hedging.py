@@ -0,0 +1,60 @@
+import asyncio
+import math
+from collections import deque
+from typing import Awaitable, Callable, TypeVar
+
+T = TypeVar("T")
+
+
+class LatencyTracker:
+    """
+    Ultimas latencias exitosas por endpoint, para estimar cuando conviene
+    enviar una consulta de respaldo.
+    """
+
+    def __init__(self, window: int = 200, min_samples: int = 20) -> None:
+        self.window = window
+        self.min_samples = min_samples
+        self._samples: dict[str, deque] = {}
+
+    def record(self, endpoint: str, seconds: float):
+        samples = self._samples.get(endpoint)
+        if samples is None:
+            samples = self._samples[endpoint] = deque(maxlen=self.window)
+        samples.append(seconds)
+
+    def percentile(self, endpoint: str, q: float) -> float | None:
+        samples = self._samples.get(endpoint)
+        if samples is None or len(samples) < self.min_samples:
+            return None
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, math.ceil(q * len(ordered)) - 1)]
+
+
+async def hedged(send: Callable[[], Awaitable[T]], delay: float) -> T:
+    """
+    Ejecuta send y, si no respondio en delay segundos, lanza una segunda
+    consulta identica; devuelve la primera respuesta exitosa y cancela la otra.
+    Solo debe usarse con consultas idempotentes.
+    """
+    tasks = {asyncio.ensure_future(send())}
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=delay)
+        if not done:
+            tasks.add(asyncio.ensure_future(send()))
+
+        pending = set(tasks)
+        error = None
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                error = error or task.exception()
+        raise error
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
@@ -0,0 +1,237 @@
+import asyncio
+import json
+import sqlite3
+from datetime import date, datetime, timedelta
+from typing import Any, Awaitable, Callable
+
+from .constants import Ajustada, Mercado
+from .utils import HISTORICOS_DATE_FIELDS, make_iol_decoder_hook
+
+ONE_DAY = timedelta(days=1)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS barras (
+    mercado TEXT NOT NULL,
+    simbolo TEXT NOT NULL,
+    ajustada TEXT NOT NULL,
+    fecha TEXT NOT NULL,
+    datos TEXT NOT NULL,
+    PRIMARY KEY (mercado, simbolo, ajustada, fecha)
+);
+CREATE TABLE IF NOT EXISTS cobertura (
+    mercado TEXT NOT NULL,
+    simbolo TEXT NOT NULL,
+    ajustada TEXT NOT NULL,
+    desde TEXT NOT NULL,
+    hasta TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS cobertura_clave ON cobertura (mercado, simbolo, ajustada);
+CREATE TABLE IF NOT EXISTS vigencia (
+    mercado TEXT NOT NULL,
+    simbolo TEXT NOT NULL,
+    ajustada TEXT NOT NULL,
+    guardado TEXT NOT NULL,
+    PRIMARY KEY (mercado, simbolo, ajustada)
+);
+"""
+
+
+def as_date(value: date) -> date:
+    # acepta datetime ya que get_titulo_historicos historicamente lo permite
+    return date(value.year, value.month, value.day)
+
+
+def _encode(value: Any):
+    if isinstance(value, datetime):
+        return value.isoformat(timespec="milliseconds")
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class HistoricosCache:
+    """
+    Almacenamiento local en SQLite de series historicas por (mercado, simbolo, ajustada).
+    Guarda los intervalos ya descargados y solo pide a la API los tramos faltantes;
+    las ruedas cerradas no cambian, por lo que solo el dia actual se vuelve a consultar.
+    Las series ajustadas cambian hacia atras con cada dividendo o split, por lo que se
+    descartan completas pasado ttl_ajustada (None las conserva sin vencimiento).
+    """
+
+    def __init__(
+        self, path: str = ":memory:", ttl_ajustada: timedelta | None = ONE_DAY
+    ) -> None:
+        self.path = path
+        self.ttl_ajustada = ttl_ajustada
+        self._conn = sqlite3.connect(path)
+        self._conn.executescript(SCHEMA)
+        self._decoder_hook = make_iol_decoder_hook(HISTORICOS_DATE_FIELDS)
+
+    def close(self):
+        self._conn.close()
+
+    @staticmethod
+    def _key(mercado: Mercado, simbolo: str, ajustada: Ajustada):
+        return (str(mercado), simbolo, str(ajustada))
+
+    # Descarta lo almacenado de un simbolo, de ambas series si no se indica ajustada
+    def invalidar(
+        self, mercado: Mercado, simbolo: str, ajustada: Ajustada | None = None
+    ):
+        condicion, params = "mercado=? AND simbolo=?", [str(mercado), simbolo]
+        if ajustada is not None:
+            condicion += " AND ajustada=?"
+            params.append(str(ajustada))
+        with self._conn:
+            for tabla in ("barras", "cobertura", "vigencia"):
+                self._conn.execute(f"DELETE FROM {tabla} WHERE {condicion}", params)
+
+    def _vencida(
+        self, mercado: Mercado, simbolo: str, ajustada: Ajustada, ahora: datetime
+    ) -> bool:
+        if ajustada != Ajustada.AJUSTADA or self.ttl_ajustada is None:
+            return False
+        row = self._conn.execute(
+            "SELECT guardado FROM vigencia WHERE mercado=? AND simbolo=? AND ajustada=?",
+            self._key(mercado, simbolo, ajustada),
+        ).fetchone()
+        return (
+            row is not None
+            and datetime.fromisoformat(row[0]) + self.ttl_ajustada <= ahora
+        )
+
+    def cobertura(
+        self, mercado: Mercado, simbolo: str, ajustada: Ajustada
+    ) -> list[tuple[date, date]]:
+        rows = self._conn.execute(
+            "SELECT desde, hasta FROM cobertura WHERE mercado=? AND simbolo=? AND ajustada=? ORDER BY desde",
+            self._key(mercado, simbolo, ajustada),
+        ).fetchall()
+        return [(date.fromisoformat(d), date.fromisoformat(h)) for d, h in rows]
+
+    # Rangos de fechas de [desde, hasta] que todavia no estan almacenados
+    def faltantes(
+        self,
+        mercado: Mercado,
+        simbolo: str,
+        ajustada: Ajustada,
+        desde: date,
+        hasta: date,
+    ) -> list[tuple[date, date]]:
+        desde, hasta = as_date(desde), as_date(hasta)
+        gaps = []
+        cursor = desde
+        for cubierto_desde, cubierto_hasta in self.cobertura(
+            mercado, simbolo, ajustada
+        ):
+            if cubierto_hasta < cursor:
+                continue
+            if cubierto_desde > hasta:
+                break
+            if cubierto_desde > cursor:
+                gaps.append((cursor, cubierto_desde - ONE_DAY))
+            cursor = cubierto_hasta + ONE_DAY
+            if cursor > hasta:
+                break
+
+        if cursor <= hasta:
+            gaps.append((cursor, hasta))
+        return gaps
+
+    def guardar(
+        self,
+        mercado: Mercado,
+        simbolo: str,
+        ajustada: Ajustada,
+        desde: date,
+        hasta: date,
+        serie: list[dict],
+        hoy: date | None = None,
+    ):
+        key = self._key(mercado, simbolo, ajustada)
+        with self._conn:
+            # conserva el momento de la descarga mas antigua, que vence primero
+            self._conn.execute(
+                "INSERT OR IGNORE INTO vigencia VALUES (?, ?, ?, ?)",
+                (*key, datetime.now().isoformat()),
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO barras VALUES (?, ?, ?, ?, ?)",
+                [
+                    (
+                        *key,
+                        barra["fechaHora"].date().isoformat(),
+                        json.dumps(barra, default=_encode),
+                    )
+                    for barra in serie
+                    if isinstance(barra.get("fechaHora"), datetime)
+                ],
+            )
+
+            # el dia en curso puede cambiar, no se marca como cubierto
+            hasta = min(as_date(hasta), (hoy or date.today()) - ONE_DAY)
+            desde = as_date(desde)
+            if desde <= hasta:
+                self._marcar_cubierto(key, desde, hasta)
+
+    def _marcar_cubierto(self, key, desde: date, hasta: date):
+        rows = self._conn.execute(
+            "SELECT desde, hasta FROM cobertura WHERE mercado=? AND simbolo=? AND ajustada=?",
+            key,
+        ).fetchall()
+
+        # une el nuevo intervalo con los que se solapan o son contiguos
+        intervalos = []
+        for d, h in rows:
+            d, h = date.fromisoformat(d), date.fromisoformat(h)
+            if h + ONE_DAY < desde or d - ONE_DAY > hasta:
+                intervalos.append((d, h))
+            else:
+                desde, hasta = min(desde, d), max(hasta, h)
+        intervalos.append((desde, hasta))
+
+        self._conn.execute(
+            "DELETE FROM cobertura WHERE mercado=? AND simbolo=? AND ajustada=?", key
+        )
+        self._conn.executemany(
+            "INSERT INTO cobertura VALUES (?, ?, ?, ?, ?)",
+            [(*key, d.isoformat(), h.isoformat()) for d, h in intervalos],
+        )
+
+    # Serie almacenada entre desde y hasta, de la fecha mas reciente a la mas antigua
+    def leer(
+        self,
+        mercado: Mercado,
+        simbolo: str,
+        ajustada: Ajustada,
+        desde: date,
+        hasta: date,
+    ) -> list[dict]:
+        rows = self._conn.execute(
+            "SELECT datos FROM barras WHERE mercado=? AND simbolo=? AND ajustada=? AND fecha BETWEEN ? AND ? ORDER BY fecha DESC",
+            (
+                *self._key(mercado, simbolo, ajustada),
+                as_date(desde).isoformat(),
+                as_date(hasta).isoformat(),
+            ),
+        ).fetchall()
+        return [json.loads(datos, object_hook=self._decoder_hook) for (datos,) in rows]
+
+    async def get_titulo_historicos(
+        self,
+        fetch: Callable[[date, date], Awaitable[list[dict]]],
+        mercado: Mercado,
+        simbolo: str,
+        ajustada: Ajustada,
+        fecha_desde: date,
+        fecha_hasta: date,
+    ) -> list[dict]:
+        if self._vencida(mercado, simbolo, ajustada, datetime.now()):
+            self.invalidar(mercado, simbolo, ajustada)
+        gaps = self.faltantes(mercado, simbolo, ajustada, fecha_desde, fecha_hasta)
+        series = await asyncio.gather(*[fetch(desde, hasta) for desde, hasta in gaps])
+        for (desde, hasta), serie in zip(gaps, series):
+            # respuestas de error de la API se devuelven sin almacenar
+            if not isinstance(serie, list):
+                return serie
+            self.guardar(mercado, simbolo, ajustada, desde, hasta, serie)
+
+        return self.leer(mercado, simbolo, ajustada, fecha_desde, fecha_hasta)
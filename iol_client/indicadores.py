@@ -0,0 +1,411 @@
+"""
+Indicadores tecnicos incrementales (SMA, EMA, RSI, VWAP y bandas de Bollinger).
+
+Cada indicador se inicializa con la serie historica en operaciones de numpy y
+despues se actualiza en O(1) con cada barra nueva. Requiere numpy; se importa
+solo al usarlo.
+"""
+
+import abc
+import math
+from functools import partial
+from typing import Callable
+
+import numpy as np
+
+from .frames import historicos_columnas
+
+NAN = math.nan
+
+
+class _Ventana:
+    """
+    Ultimos n valores de una o mas columnas en un buffer circular, con la suma
+    de cada columna. Las sumas se recalculan desde el buffer cada n barras para
+    que no acumulen error de redondeo.
+    """
+
+    __slots__ = ("n", "_buf", "_pos", "_count", "_sumas", "_hasta_recalculo")
+
+    def __init__(self, n: int, columnas: int = 1) -> None:
+        if n < 1:
+            raise AttributeError("La ventana debe tener al menos 1 valor")
+        self.n = n
+        self._buf = np.zeros((n, columnas))
+        self._pos = 0
+        self._count = 0
+        self._sumas = [0.0] * columnas
+        self._hasta_recalculo = n
+
+    @property
+    def llena(self) -> bool:
+        return self._count == self.n
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    @property
+    def sumas(self) -> list[float]:
+        return self._sumas
+
+    def cargar(self, valores: np.ndarray):
+        ultimos = valores[-self.n :]
+        self._count = len(ultimos)
+        self._buf[: self._count] = ultimos
+        self._pos = self._count % self.n
+        self._recalcular()
+
+    def _recalcular(self):
+        self._sumas = self._buf[: self._count].sum(axis=0).tolist()
+        self._hasta_recalculo = self.n
+
+    # Sumas que resultarian de agregar fila, sin modificar la ventana
+    def sumas_con(self, fila: tuple[float, ...]) -> list[float]:
+        if self._count < self.n:
+            return [s + v for s, v in zip(self._sumas, fila)]
+        sale = self._buf[self._pos]
+        return [s + v - float(o) for s, v, o in zip(self._sumas, fila, sale)]
+
+    def agregar(self, fila: tuple[float, ...]) -> list[float]:
+        self._sumas = self.sumas_con(fila)
+        self._buf[self._pos] = fila
+        self._pos = (self._pos + 1) % self.n
+        self._count = min(self._count + 1, self.n)
+        self._hasta_recalculo -= 1
+        if self._hasta_recalculo == 0:
+            self._recalcular()
+        return self._sumas
+
+
+def _suavizar(inicial: float, valores: np.ndarray, alpha: float) -> float:
+    # resultado de aplicar x = alpha * v + (1 - alpha) * x a todos los valores,
+    # como un unico producto escalar con los pesos de cada valor
+    m = len(valores)
+    if m == 0:
+        return inicial
+    pesos = (1.0 - alpha) ** np.arange(m - 1, -1, -1, dtype=np.float64)
+    return (1.0 - alpha) ** m * inicial + alpha * float(np.dot(pesos, valores))
+
+
+class Indicador(abc.ABC):
+    """
+    Interfaz comun: inicializar() con arrays de precios y volumenes en orden
+    cronologico, agregar() con una barra cerrada y previsualizar() para el
+    valor con una barra en curso, sin modificar el estado.
+    """
+
+    __slots__ = ()
+
+    @abc.abstractmethod
+    def inicializar(self, precios: np.ndarray, volumenes: np.ndarray):
+        ...
+
+    @abc.abstractmethod
+    def agregar(self, precio: float, volumen: float = 0.0):
+        ...
+
+    @abc.abstractmethod
+    def previsualizar(self, precio: float, volumen: float = 0.0):
+        ...
+
+    @property
+    @abc.abstractmethod
+    def valor(self):
+        ...
+
+
+class SMA(Indicador):
+    __slots__ = ("_ventana",)
+
+    def __init__(self, n: int = 20) -> None:
+        self._ventana = _Ventana(n)
+
+    def _media(self, suma: float, count: int) -> float:
+        return suma / count if count == self._ventana.n else NAN
+
+    def inicializar(self, precios: np.ndarray, volumenes: np.ndarray):
+        self._ventana.cargar(precios[:, None])
+
+    def agregar(self, precio: float, volumen: float = 0.0) -> float:
+        (suma,) = self._ventana.agregar((precio,))
+        return self._media(suma, self._ventana.count)
+
+    def previsualizar(self, precio: float, volumen: float = 0.0) -> float:
+        (suma,) = self._ventana.sumas_con((precio,))
+        return self._media(suma, min(self._ventana.count + 1, self._ventana.n))
+
+    @property
+    def valor(self) -> float:
+        return self._media(self._ventana.sumas[0], self._ventana.count)
+
+
+class EMA(Indicador):
+    """
+    Media exponencial con alpha = 2 / (n + 1), que empieza con la media simple
+    de las primeras n barras.
+    """
+
+    __slots__ = ("n", "alpha", "_ema", "_count", "_suma")
+
+    def __init__(self, n: int = 20) -> None:
+        self.n = n
+        self.alpha = 2.0 / (n + 1)
+        self._ema = NAN
+        self._count = 0
+        self._suma = 0.0
+
+    def inicializar(self, precios: np.ndarray, volumenes: np.ndarray):
+        self._count = min(len(precios), self.n)
+        self._suma = float(precios[: self.n].sum())
+        if len(precios) < self.n:
+            self._ema = NAN
+            return
+        self._ema = _suavizar(self._suma / self.n, precios[self.n :], self.alpha)
+
+    def _siguiente(self, precio: float) -> tuple[float, int, float]:
+        if self._count < self.n:
+            suma = self._suma + precio
+            count = self._count + 1
+            return (suma / self.n if count == self.n else NAN), count, suma
+        return self.alpha * precio + (1.0 - self.alpha) * self._ema, self._count, 0.0
+
+    def agregar(self, precio: float, volumen: float = 0.0) -> float:
+        self._ema, self._count, self._suma = self._siguiente(precio)
+        return self._ema
+
+    def previsualizar(self, precio: float, volumen: float = 0.0) -> float:
+        return self._siguiente(precio)[0]
+
+    @property
+    def valor(self) -> float:
+        return self._ema
+
+
+class RSI(Indicador):
+    """
+    RSI de Wilder: promedios de subas y bajas suavizados con alpha = 1 / n,
+    que empiezan con la media simple de las primeras n variaciones.
+    """
+
+    __slots__ = ("n", "_ultimo", "_subas", "_bajas", "_count")
+
+    def __init__(self, n: int = 14) -> None:
+        self.n = n
+        self._ultimo = NAN
+        self._subas = 0.0
+        self._bajas = 0.0
+        # variaciones acumuladas, hasta n
+        self._count = 0
+
+    def inicializar(self, precios: np.ndarray, volumenes: np.ndarray):
+        self._ultimo = float(precios[-1]) if len(precios) else NAN
+        variaciones = np.diff(precios)
+        subas = np.maximum(variaciones, 0.0)
+        bajas = np.maximum(-variaciones, 0.0)
+        self._count = min(len(variaciones), self.n)
+        if len(variaciones) < self.n:
+            self._subas = float(subas.sum())
+            self._bajas = float(bajas.sum())
+            return
+        alpha = 1.0 / self.n
+        self._subas = _suavizar(subas[: self.n].mean(), subas[self.n :], alpha)
+        self._bajas = _suavizar(bajas[: self.n].mean(), bajas[self.n :], alpha)
+
+    def _siguiente(self, precio: float) -> tuple[float, float, int]:
+        if math.isnan(self._ultimo):
+            return 0.0, 0.0, 0
+        variacion = precio - self._ultimo
+        suba, baja = max(variacion, 0.0), max(-variacion, 0.0)
+        if self._count < self.n:
+            subas, bajas, count = (
+                self._subas + suba,
+                self._bajas + baja,
+                self._count + 1,
+            )
+            if count == self.n:
+                subas, bajas = subas / self.n, bajas / self.n
+            return subas, bajas, count
+        alpha = 1.0 / self.n
+        return (
+            self._subas + alpha * (suba - self._subas),
+            self._bajas + alpha * (baja - self._bajas),
+            self._count,
+        )
+
+    def _rsi(self, subas: float, bajas: float, count: int) -> float:
+        if count < self.n:
+            return NAN
+        if bajas == 0.0:
+            return 100.0 if subas > 0.0 else 50.0
+        return 100.0 - 100.0 / (1.0 + subas / bajas)
+
+    def agregar(self, precio: float, volumen: float = 0.0) -> float:
+        self._subas, self._bajas, self._count = self._siguiente(precio)
+        self._ultimo = precio
+        return self.valor
+
+    def previsualizar(self, precio: float, volumen: float = 0.0) -> float:
+        return self._rsi(*self._siguiente(precio))
+
+    @property
+    def valor(self) -> float:
+        return self._rsi(self._subas, self._bajas, self._count)
+
+
+class VWAP(Indicador):
+    """
+    Precio promedio ponderado por volumen de las ultimas n barras.
+    """
+
+    __slots__ = ("_ventana",)
+
+    def __init__(self, n: int = 20) -> None:
+        self._ventana = _Ventana(n, columnas=2)
+
+    @staticmethod
+    def _vwap(monto: float, volumen: float) -> float:
+        return monto / volumen if volumen > 0 else NAN
+
+    def inicializar(self, precios: np.ndarray, volumenes: np.ndarray):
+        self._ventana.cargar(np.column_stack((precios * volumenes, volumenes)))
+
+    def agregar(self, precio: float, volumen: float = 0.0) -> float:
+        return self._vwap(*self._ventana.agregar((precio * volumen, volumen)))
+
+    def previsualizar(self, precio: float, volumen: float = 0.0) -> float:
+        return self._vwap(*self._ventana.sumas_con((precio * volumen, volumen)))
+
+    @property
+    def valor(self) -> float:
+        return self._vwap(*self._ventana.sumas)
+
+
+class Bollinger(Indicador):
+    """
+    Bandas de Bollinger: (inferior, media, superior) con k desvios estandar
+    poblacionales de las ultimas n barras.
+    """
+
+    __slots__ = ("k", "_ventana")
+
+    def __init__(self, n: int = 20, k: float = 2.0) -> None:
+        self.k = k
+        self._ventana = _Ventana(n, columnas=2)
+
+    def _bandas(self, suma: float, cuadrados: float, count: int):
+        n = self._ventana.n
+        if count < n:
+            return (NAN, NAN, NAN)
+        media = suma / n
+        desvio = math.sqrt(max(cuadrados / n - media * media, 0.0))
+        return (media - self.k * desvio, media, media + self.k * desvio)
+
+    def inicializar(self, precios: np.ndarray, volumenes: np.ndarray):
+        self._ventana.cargar(np.column_stack((precios, precios * precios)))
+
+    def agregar(self, precio: float, volumen: float = 0.0):
+        sumas = self._ventana.agregar((precio, precio * precio))
+        return self._bandas(*sumas, self._ventana.count)
+
+    def previsualizar(self, precio: float, volumen: float = 0.0):
+        sumas = self._ventana.sumas_con((precio, precio * precio))
+        return self._bandas(*sumas, min(self._ventana.count + 1, self._ventana.n))
+
+    @property
+    def valor(self):
+        return self._bandas(*self._ventana.sumas, self._ventana.count)
+
+
+INDICADORES_POR_DEFECTO: dict[str, Callable[[], Indicador]] = {
+    "sma20": partial(SMA, 20),
+    "ema20": partial(EMA, 20),
+    "rsi14": partial(RSI, 14),
+    "vwap20": partial(VWAP, 20),
+    "bollinger20": partial(Bollinger, 20, 2.0),
+}
+
+
+def serie_cronologica(historicos: list[dict] | dict) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Precios y volumenes en orden cronologico a partir de get_titulo_historicos,
+    como lista (de la mas reciente a la mas antigua) o as_columns.
+    """
+    columnas = (
+        historicos if isinstance(historicos, dict) else historicos_columnas(historicos)
+    )
+    orden = np.argsort(columnas["fechaHora"], kind="stable")
+    precios = np.asarray(columnas["ultimoPrecio"], dtype=np.float64)[orden]
+    volumenes = np.asarray(columnas["volumenNominal"], dtype=np.float64)[orden]
+    return precios, volumenes
+
+
+class MotorIndicadores:
+    """
+    Indicadores de muchos simbolos en un proceso. Cada simbolo se carga una vez
+    con su serie historica y despues cada barra cerrada (barra) o cotizacion
+    de la barra en curso (tick) cuesta O(1) por indicador.
+
+        motor = MotorIndicadores()
+        motor.cargar("GGAL", await client.get_titulo_historicos("GGAL", ...))
+        async with client.suscribir_cotizaciones(["GGAL"]) as feed:
+            async for cambios in feed:
+                valores = motor.aplicar(cambios)
+    """
+
+    def __init__(
+        self, indicadores: dict[str, Callable[[], Indicador]] | None = None
+    ) -> None:
+        self.indicadores = dict(indicadores or INDICADORES_POR_DEFECTO)
+        self._estado: dict[str, dict[str, Indicador]] = {}
+
+    def __len__(self) -> int:
+        return len(self._estado)
+
+    def __contains__(self, simbolo: str) -> bool:
+        return simbolo in self._estado
+
+    def _indicadores(self, simbolo: str) -> dict[str, Indicador]:
+        estado = self._estado.get(simbolo)
+        if estado is None:
+            estado = {nombre: crear() for nombre, crear in self.indicadores.items()}
+            self._estado[simbolo] = estado
+        return estado
+
+    def cargar(self, simbolo: str, historicos: list[dict] | dict) -> dict:
+        precios, volumenes = serie_cronologica(historicos)
+        estado = {nombre: crear() for nombre, crear in self.indicadores.items()}
+        for indicador in estado.values():
+            indicador.inicializar(precios, volumenes)
+        self._estado[simbolo] = estado
+        return self.valores(simbolo)
+
+    # Barra cerrada: actualiza el estado
+    def barra(self, simbolo: str, precio: float, volumen: float = 0.0) -> dict:
+        return {
+            nombre: indicador.agregar(precio, volumen)
+            for nombre, indicador in self._indicadores(simbolo).items()
+        }
+
+    # Cotizacion de la barra en curso: valores sin modificar el estado
+    def tick(self, simbolo: str, precio: float, volumen: float = 0.0) -> dict:
+        return {
+            nombre: indicador.previsualizar(precio, volumen)
+            for nombre, indicador in self._indicadores(simbolo).items()
+        }
+
+    # Aplica un dict simbolo -> cotizacion como ticks de los simbolos cargados
+    def aplicar(self, cotizaciones: dict[str, dict]) -> dict[str, dict]:
+        res = {}
+        for simbolo, cotizacion in cotizaciones.items():
+            precio = (cotizacion or {}).get("ultimoPrecio")
+            if simbolo in self._estado and isinstance(precio, (int, float)):
+                volumen = cotizacion.get("volumenNominal") or 0.0
+                res[simbolo] = self.tick(simbolo, precio, volumen)
+        return res
+
+    def valores(self, simbolo: str) -> dict:
+        return {
+            nombre: indicador.valor
+            for nombre, indicador in self._estado[simbolo].items()
+        }
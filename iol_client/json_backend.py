@@ -0,0 +1,96 @@
+import json
+from typing import Any, Callable, Iterable
+
+from .utils import make_iol_decoder_hook
+
+# los backends rapidos convierten a float los enteros de mas de 64 bits; un
+# documento con 20 digitos seguidos se decodifica con la libreria estandar
+_DIGITOS = bytes(ord("0") if chr(i).isdigit() else ord(" ") for i in range(256))
+_ENTERO_LARGO = b"0" * 20
+
+
+class JsonBackend:
+    """
+    Decodificador de respuestas JSON a partir de los bytes crudos. Las fechas
+    se convierten despues, en una sola pasada sobre el resultado, asi que el
+    resultado es el mismo con cualquier backend. Los documentos que el backend
+    rechaza o no representa igual (enteros de mas de 64 bits, NaN, Infinity)
+    se decodifican con la libreria estandar.
+    """
+
+    def __init__(self, name: str, loads: Callable[[bytes], Any] | None = None):
+        self.name = name
+        self._loads = loads
+
+    def decode(self, body: bytes, date_fields: Iterable[str] | None = None) -> Any:
+        hook = make_iol_decoder_hook(date_fields)
+        if self._loads is None:
+            return json.loads(body, object_hook=hook)
+
+        if _ENTERO_LARGO in body.translate(_DIGITOS):
+            return json.loads(body, object_hook=hook)
+        try:
+            value = self._loads(body)
+        except Exception:
+            return json.loads(body, object_hook=hook)
+        if hook is not None:
+            convertir_fechas(value, hook)
+        return value
+
+    def __repr__(self) -> str:
+        return f"JsonBackend({self.name!r})"
+
+
+_CONTENEDORES = frozenset((dict, list))
+
+
+def convertir_fechas(value: Any, hook: Callable[[dict], dict]) -> Any:
+    # recorre una sola vez todos los objetos anidados, igual que object_hook;
+    # map(type, ...) descarta en C los objetos sin contenedores anidados
+    pendientes = [value]
+    while pendientes:
+        actual = pendientes.pop()
+        if type(actual) is dict:
+            hook(actual)
+            valores = actual.values()
+        elif type(actual) is list:
+            valores = actual
+        else:
+            continue
+        if not _CONTENEDORES.isdisjoint(map(type, valores)):
+            pendientes.extend(v for v in valores if type(v) in _CONTENEDORES)
+    return value
+
+
+def _orjson() -> JsonBackend:
+    import orjson
+
+    return JsonBackend("orjson", orjson.loads)
+
+
+def _msgspec() -> JsonBackend:
+    import msgspec
+
+    return JsonBackend("msgspec", msgspec.json.Decoder().decode)
+
+
+STDLIB = JsonBackend("json")
+BACKENDS = {"orjson": _orjson, "msgspec": _msgspec, "json": lambda: STDLIB}
+
+
+def get_json_backend(name: str | JsonBackend = "auto") -> JsonBackend:
+    """
+    Backend por nombre ("orjson", "msgspec" o "json"). Con "auto" usa el primero
+    instalado, en ese orden.
+    """
+    if isinstance(name, JsonBackend):
+        return name
+    if name != "auto":
+        return BACKENDS[name]()
+
+    for create in BACKENDS.values():
+        try:
+            return create()
+        except ImportError:
+            continue
+    return STDLIB
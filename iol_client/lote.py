@@ -0,0 +1,171 @@
+import asyncio
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import TYPE_CHECKING, Any
+
+from .ordenes import OrdenDeCompra, OrdenDeVenta
+
+if TYPE_CHECKING:
+    from .client import IOLClient
+
+
+class EstadoOrden(Enum):
+    def __str__(self) -> str:
+        return self.value
+
+    ACEPTADA = "aceptada"
+    RECHAZADA = "rechazada"
+    ERROR = "error"
+    INVALIDA = "invalida"
+    NO_ENVIADA = "noEnviada"
+    CANCELADA = "cancelada"
+
+
+@dataclass
+class ResultadoOrden:
+    orden: OrdenDeCompra | OrdenDeVenta
+    estado: EstadoOrden = EstadoOrden.NO_ENVIADA
+    respuesta: Any = None
+    error: Exception | None = None
+
+    @property
+    def numero_operacion(self) -> int | None:
+        if isinstance(self.respuesta, dict):
+            return self.respuesta.get("numeroOperacion")
+        return None
+
+
+@dataclass
+class ResultadoLote:
+    resultados: list[ResultadoOrden] = field(default_factory=list)
+    # True si se aplico all_or_cancel y se cancelaron las ordenes aceptadas
+    cancelado: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return all(r.estado == EstadoOrden.ACEPTADA for r in self.resultados)
+
+    def por_estado(self, estado: EstadoOrden) -> list[ResultadoOrden]:
+        return [r for r in self.resultados if r.estado == estado]
+
+
+def _aceptada(respuesta) -> bool:
+    return (
+        isinstance(respuesta, dict)
+        and respuesta.get("ok") is True
+        and respuesta.get("numeroOperacion") is not None
+    )
+
+
+class LoteDeOrdenes:
+    """
+    Envio concurrente de ordenes de compra y venta.
+    Valida y serializa todas las ordenes antes de enviar la primera, las envia
+    con concurrencia limitada (el limitador del cliente regula la familia operar)
+    y devuelve el resultado de cada una en el orden recibido.
+
+    Con all_or_cancel, si alguna orden es invalida no se envia ninguna, y si
+    alguna es rechazada o falla se dejan de enviar las pendientes y se cancelan
+    con delete_operaciones las que ya fueron aceptadas.
+
+        resultado = await client.post_operar_lote(ordenes, all_or_cancel=True)
+    """
+
+    def __init__(
+        self,
+        client: "IOLClient",
+        ordenes: list[OrdenDeCompra | OrdenDeVenta],
+        concurrency: int = 4,
+        all_or_cancel: bool = False,
+        timeout: float | None = None,
+    ) -> None:
+        self.client = client
+        self.ordenes = list(ordenes)
+        self.concurrency = concurrency
+        self.all_or_cancel = all_or_cancel
+        self.timeout = timeout
+
+    def _preparar(self, resultado: ResultadoOrden) -> tuple[str, dict] | None:
+        orden = resultado.orden
+        if isinstance(orden, OrdenDeCompra):
+            path = "operar/Comprar"
+        elif isinstance(orden, OrdenDeVenta):
+            path = "operar/Vender"
+        else:
+            resultado.estado = EstadoOrden.INVALIDA
+            resultado.error = TypeError(f"Orden no soportada {type(orden).__name__}")
+            return None
+
+        try:
+            orden._validar()
+            return path, orden.json()
+        except Exception as e:
+            resultado.estado = EstadoOrden.INVALIDA
+            resultado.error = e
+            return None
+
+    async def enviar(self) -> ResultadoLote:
+        lote = ResultadoLote([ResultadoOrden(orden) for orden in self.ordenes])
+        envios = [self._preparar(resultado) for resultado in lote.resultados]
+        if self.all_or_cancel and any(envio is None for envio in envios):
+            return lote
+
+        sem = asyncio.Semaphore(self.concurrency)
+        fallo = asyncio.Event()
+
+        async def enviar_orden(resultado: ResultadoOrden, path: str, payload: dict):
+            async with sem:
+                if fallo.is_set():
+                    return
+                try:
+                    respuesta = await self.client._post_operar(
+                        path, payload, timeout=self.timeout
+                    )
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    resultado.estado = EstadoOrden.ERROR
+                    resultado.error = e
+                else:
+                    resultado.respuesta = respuesta
+                    resultado.estado = (
+                        EstadoOrden.ACEPTADA
+                        if _aceptada(respuesta)
+                        else EstadoOrden.RECHAZADA
+                    )
+
+                if self.all_or_cancel and resultado.estado != EstadoOrden.ACEPTADA:
+                    fallo.set()
+
+        await asyncio.gather(
+            *[
+                enviar_orden(resultado, *envio)
+                for resultado, envio in zip(lote.resultados, envios)
+                if envio is not None
+            ]
+        )
+
+        if self.all_or_cancel and fallo.is_set():
+            await self._cancelar(lote)
+        return lote
+
+    async def _cancelar(self, lote: ResultadoLote):
+        lote.cancelado = True
+        aceptadas = lote.por_estado(EstadoOrden.ACEPTADA)
+
+        async def cancelar(resultado: ResultadoOrden):
+            try:
+                respuesta = await self.client.delete_operaciones(
+                    resultado.numero_operacion, timeout=self.timeout
+                )
+                if isinstance(respuesta, dict) and respuesta.get("ok") is False:
+                    raise ConnectionError(f"Cancelacion rechazada {respuesta}")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # sigue aceptada, el llamador debe revisarla
+                resultado.error = e
+            else:
+                resultado.estado = EstadoOrden.CANCELADA
+
+        await asyncio.gather(*[cancelar(resultado) for resultado in aceptadas])
@@ -0,0 +1,221 @@
+import bisect
+import json
+from collections import Counter
+from dataclasses import dataclass, field
+
+import aiohttp
+
+# limites de los histogramas de latencia, en segundos
+DEFAULT_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+PHASES = ("connect", "ttfb", "body", "decode")
+
+
+@dataclass
+class RequestSample:
+    endpoint: str
+    method: str
+    # codigo HTTP, o "timeout"/"error" si no hubo respuesta
+    status: int | str
+    connect: float
+    ttfb: float
+    body: float
+    decode: float
+    bytes: int
+
+
+@dataclass
+class TokenEvent:
+    kind: str
+    duration: float
+    ok: bool
+
+
+class MetricsHook:
+    """
+    Receptor de metricas del cliente. Se puede heredar para enviar las
+    mediciones a otro sistema; los metodos por defecto no hacen nada.
+    """
+
+    def on_request(self, sample: RequestSample):
+        pass
+
+    def on_token(self, event: TokenEvent):
+        pass
+
+
+class Histogram:
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> list[tuple[str, int]]:
+        res = []
+        total = 0
+        for le, count in zip((*map(str, self.buckets), "+Inf"), self.counts):
+            total += count
+            res.append((le, total))
+        return res
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "buckets": dict(self.cumulative()),
+        }
+
+
+@dataclass
+class EndpointMetrics:
+    requests: int = 0
+    bytes: int = 0
+    status: Counter = field(default_factory=Counter)
+    phases: dict[str, Histogram] = field(default_factory=dict)
+
+
+class Metrics(MetricsHook):
+    """
+    Metricas agregadas por endpoint: cantidad de consultas, codigos de estado,
+    histogramas de connect/ttfb/body/decode, bytes recibidos y pedidos de token.
+    Se exponen con snapshot() o como texto de Prometheus con prometheus().
+    Los hooks adicionales reciben cada medicion sin agregar.
+    """
+
+    def __init__(
+        self,
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+        hooks: list[MetricsHook] | None = None,
+    ) -> None:
+        self.buckets = buckets
+        self.hooks = list(hooks or [])
+        self.endpoints: dict[tuple[str, str], EndpointMetrics] = {}
+        self.tokens: dict[str, tuple[Counter, Histogram]] = {}
+
+    def on_request(self, sample: RequestSample):
+        key = (sample.endpoint, sample.method)
+        metrics = self.endpoints.get(key)
+        if metrics is None:
+            metrics = self.endpoints[key] = EndpointMetrics(
+                phases={phase: Histogram(self.buckets) for phase in PHASES}
+            )
+        metrics.requests += 1
+        metrics.bytes += sample.bytes
+        metrics.status[sample.status] += 1
+        for phase in PHASES:
+            metrics.phases[phase].observe(getattr(sample, phase))
+
+        for hook in self.hooks:
+            hook.on_request(sample)
+
+    def on_token(self, event: TokenEvent):
+        entry = self.tokens.get(event.kind)
+        if entry is None:
+            entry = self.tokens[event.kind] = (Counter(), Histogram(self.buckets))
+        entry[0]["ok" if event.ok else "error"] += 1
+        entry[1].observe(event.duration)
+
+        for hook in self.hooks:
+            hook.on_token(event)
+
+    def snapshot(self) -> dict:
+        return {
+            "requests": [
+                {
+                    "endpoint": endpoint,
+                    "method": method,
+                    "count": metrics.requests,
+                    "bytes": metrics.bytes,
+                    "status": {str(k): v for k, v in metrics.status.items()},
+                    "seconds": {
+                        phase: histogram.to_dict()
+                        for phase, histogram in metrics.phases.items()
+                    },
+                }
+                for (endpoint, method), metrics in self.endpoints.items()
+            ],
+            "tokens": {
+                kind: {"results": dict(results), "seconds": histogram.to_dict()}
+                for kind, (results, histogram) in self.tokens.items()
+            },
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(self.snapshot())
+
+    def prometheus(self) -> str:
+        lines = [
+            "# TYPE iol_requests_total counter",
+            "# TYPE iol_response_bytes_total counter",
+            "# TYPE iol_request_seconds histogram",
+        ]
+        for (endpoint, method), metrics in self.endpoints.items():
+            labels = f'endpoint="{endpoint}",method="{method}"'
+            for status, count in metrics.status.items():
+                lines.append(
+                    f'iol_requests_total{{{labels},status="{status}"}} {count}'
+                )
+            lines.append(f"iol_response_bytes_total{{{labels}}} {metrics.bytes}")
+            for phase, histogram in metrics.phases.items():
+                lines += _histogram_lines(
+                    "iol_request_seconds", f'{labels},phase="{phase}"', histogram
+                )
+
+        lines += [
+            "# TYPE iol_token_requests_total counter",
+            "# TYPE iol_token_seconds histogram",
+        ]
+        for kind, (results, histogram) in self.tokens.items():
+            for result, count in results.items():
+                lines.append(
+                    f'iol_token_requests_total{{kind="{kind}",result="{result}"}} {count}'
+                )
+            lines += _histogram_lines("iol_token_seconds", f'kind="{kind}"', histogram)
+        return "\n".join(lines) + "\n"
+
+
+def _histogram_lines(name: str, labels: str, histogram: Histogram) -> list[str]:
+    lines = [
+        f'{name}_bucket{{{labels},le="{le}"}} {count}'
+        for le, count in histogram.cumulative()
+    ]
+    lines.append(f"{name}_sum{{{labels}}} {histogram.sum}")
+    lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+    return lines
+
+
+# Mide el tiempo de conexion de cada consulta en el trace_request_ctx (un dict)
+def connection_trace_config(clock) -> aiohttp.TraceConfig:
+    async def on_connection_create_start(session, ctx, params):
+        if isinstance(ctx.trace_request_ctx, dict):
+            ctx.trace_request_ctx["connect_start"] = clock()
+
+    async def on_connection_create_end(session, ctx, params):
+        if isinstance(ctx.trace_request_ctx, dict):
+            start = ctx.trace_request_ctx.pop("connect_start", None)
+            if start is not None:
+                ctx.trace_request_ctx["connect"] = clock() - start
+
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_connection_create_start.append(on_connection_create_start)
+    trace_config.on_connection_create_end.append(on_connection_create_end)
+    return trace_config
@@ -0,0 +1,301 @@
+"""
+Volatilidad implicita y griegas de una cadena de opciones en columnas de numpy.
+
+Requiere numpy; se importa solo al usarla. Si scipy esta instalado se usa su
+distribucion normal, si no una aproximacion con error relativo menor a 1.2e-7.
+"""
+
+import math
+import re
+from datetime import datetime
+
+import numpy as np
+
+from .utils import parse_iol_date
+
+try:
+    from scipy.special import ndtr as _norm_cdf
+except ImportError:
+    # coeficientes de erfc de Numerical Recipes (erfcc)
+    _ERFC = (
+        -1.26551223,
+        1.00002368,
+        0.37409196,
+        0.09678418,
+        -0.18628806,
+        0.27886807,
+        -1.13520398,
+        1.48851587,
+        -0.82215223,
+        0.17087277,
+    )
+
+    def _norm_cdf(x: np.ndarray) -> np.ndarray:
+        z = np.abs(x) / math.sqrt(2.0)
+        t = 1.0 / (1.0 + 0.5 * z)
+        poly = _ERFC[-1]
+        for c in _ERFC[-2::-1]:
+            poly = c + t * poly
+        cola = 0.5 * t * np.exp(-z * z + poly)
+        return np.where(x < 0, cola, 1.0 - cola)
+
+
+_INV_SQRT_2PI = 1.0 / math.sqrt(2.0 * math.pi)
+# "Call GGAL 1,234.00 Vencimiento: 15/12/2023"
+_STRIKE = re.compile(r"^\s*(?:call|put)\s+\S+\s+([\d.,]+)", re.IGNORECASE)
+SEGUNDOS_POR_ANIO = 365.0 * 24 * 60 * 60
+VOL_MINIMA = 1e-6
+VOL_MAXIMA = 10.0
+
+
+def _norm_pdf(x: np.ndarray) -> np.ndarray:
+    return _INV_SQRT_2PI * np.exp(-0.5 * x * x)
+
+
+def parse_strike(descripcion: str) -> float | None:
+    match = _STRIKE.match(descripcion or "")
+    if match is None:
+        return None
+    try:
+        return float(match.group(1).replace(",", ""))
+    except ValueError:
+        return None
+
+
+def _d1_d2(spot, strike, sqrt_t, vol, drift):
+    # drift es tasa * t; el termino de la volatilidad se agrega aca
+    vol_sqrt_t = vol * sqrt_t
+    d1 = (np.log(spot / strike) + drift + 0.5 * vol * vol_sqrt_t * sqrt_t) / vol_sqrt_t
+    return d1, d1 - vol_sqrt_t
+
+
+def black_scholes(spot, strike, t, vol, es_call, tasa: float = 0.0) -> np.ndarray:
+    """
+    Prima de Black-Scholes sin dividendos para arrays de strike, plazo en anios,
+    volatilidad y tipo (True para call). Las opciones locales son americanas,
+    pero sin dividendos un call vale lo mismo que el europeo.
+    """
+    sqrt_t = np.sqrt(t)
+    descuento = np.exp(-tasa * t)
+    d1, d2 = _d1_d2(spot, strike, sqrt_t, vol, tasa * t)
+    call = spot * _norm_cdf(d1) - strike * descuento * _norm_cdf(d2)
+    return np.where(es_call, call, call - spot + strike * descuento)
+
+
+def volatilidad_implicita(
+    precio,
+    spot,
+    strike,
+    t,
+    es_call,
+    tasa: float = 0.0,
+    inicial=None,
+    tol: float = 1e-7,
+    max_iter: int = 100,
+) -> tuple[np.ndarray, int]:
+    """
+    Volatilidad implicita de toda la cadena a la vez. Cada iteracion da un paso
+    de Newton y, si sale del intervalo que encierra la solucion, biseca; solo
+    se siguen iterando las opciones que no convergieron. Las primas fuera de
+    los limites de arbitraje dan NaN. Devuelve tambien las iteraciones usadas.
+    """
+    precio, spot, strike, t, es_call = np.broadcast_arrays(
+        *(
+            np.asarray(v, dtype=dtype)
+            for v, dtype in (
+                (precio, np.float64),
+                (spot, np.float64),
+                (strike, np.float64),
+                (t, np.float64),
+                (es_call, bool),
+            )
+        )
+    )
+    descuento = np.exp(-tasa * t)
+    strike_descontado = strike * descuento
+    minimo = np.maximum(
+        np.where(es_call, spot - strike_descontado, strike_descontado - spot), 0.0
+    )
+    maximo = np.where(es_call, spot, strike_descontado)
+    vol = np.full(precio.shape, np.nan)
+    validas = (t > 0) & (strike > 0) & (precio > minimo) & (precio < maximo)
+
+    activas = np.flatnonzero(validas)
+    if inicial is None:
+        sigma = np.full(activas.shape, 0.3)
+    else:
+        inicial = np.broadcast_to(np.asarray(inicial, dtype=np.float64), precio.shape)
+        sigma = inicial[activas]
+        sigma = np.where(np.isfinite(sigma), sigma, 0.3).clip(VOL_MINIMA, VOL_MAXIMA)
+    bajo = np.full(activas.shape, VOL_MINIMA)
+    alto = np.full(activas.shape, VOL_MAXIMA)
+
+    iteraciones = 0
+    while activas.size and iteraciones < max_iter:
+        iteraciones += 1
+        s, k, tt, c, p = (
+            spot[activas],
+            strike[activas],
+            t[activas],
+            es_call[activas],
+            precio[activas],
+        )
+        sqrt_t = np.sqrt(tt)
+        d1, _ = _d1_d2(s, k, sqrt_t, sigma, tasa * tt)
+        diferencia = black_scholes(s, k, tt, sigma, c, tasa) - p
+        vega = s * _norm_pdf(d1) * sqrt_t
+
+        convergidas = (np.abs(diferencia) <= tol * s) | (alto - bajo <= tol)
+        vol[activas[convergidas]] = sigma[convergidas]
+
+        alto = np.where(diferencia > 0, sigma, alto)
+        bajo = np.where(diferencia < 0, sigma, bajo)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            newton = sigma - diferencia / vega
+        sigma = np.where((newton > bajo) & (newton < alto), newton, 0.5 * (bajo + alto))
+
+        seguir = ~convergidas
+        activas, sigma, bajo, alto = (
+            activas[seguir],
+            sigma[seguir],
+            bajo[seguir],
+            alto[seguir],
+        )
+
+    return vol, iteraciones
+
+
+class CadenaOpciones:
+    """
+    Cadena de get_titulo_opciones en columnas (simbolo, tipo, strike,
+    vencimiento y prima) para calcular volatilidad implicita, griegas y
+    moneyness de todas las opciones a la vez. Los valores que dependen solo de
+    la cadena (plazos, raices, descuentos) se calculan una vez, y la ultima
+    volatilidad implicita es el punto de partida de la siguiente evaluacion,
+    asi que reevaluar con un nuevo precio del subyacente converge en pocas
+    iteraciones.
+
+        cadena = CadenaOpciones(await client.get_titulo_opciones("GGAL", Mercado.BCBA))
+        analisis = cadena.evaluar(spot=1234.5, tasa=0.9)
+        analisis["delta"], analisis["iv"]
+
+    La prima es el punto medio de las puntas si hay compra y venta, si no el
+    ultimo precio. theta es por dia calendario y vega por punto de volatilidad.
+    """
+
+    def __init__(
+        self,
+        opciones: list[dict],
+        ahora: datetime | None = None,
+        usar_puntas: bool = True,
+    ) -> None:
+        self.usar_puntas = usar_puntas
+        filas = []
+        for opcion in opciones:
+            strike = parse_strike(opcion.get("descripcion"))
+            vencimiento = opcion.get("fechaVencimiento")
+            if isinstance(vencimiento, str):
+                vencimiento = parse_iol_date(vencimiento)
+            tipo = str(opcion.get("tipoOpcion", "")).lower()
+            if strike is None or vencimiento is None or tipo not in ("call", "put"):
+                continue
+            filas.append(
+                (
+                    opcion.get("simbolo"),
+                    tipo == "call",
+                    strike,
+                    vencimiento,
+                    _prima(opcion, usar_puntas),
+                )
+            )
+
+        self.simbolos = [f[0] for f in filas]
+        self.index = {simbolo: i for i, simbolo in enumerate(self.simbolos)}
+        self.es_call = np.array([f[1] for f in filas], dtype=bool)
+        self.strike = np.array([f[2] for f in filas], dtype=np.float64)
+        self.vencimiento = np.array([f[3] for f in filas], dtype="datetime64[us]")
+        self.prima = np.array([f[4] for f in filas], dtype=np.float64)
+        self.iteraciones = 0
+        self._vol: np.ndarray | None = None
+        self.set_ahora(ahora or datetime.now())
+
+    def __len__(self) -> int:
+        return len(self.simbolos)
+
+    def set_ahora(self, ahora: datetime):
+        restante = self.vencimiento - np.datetime64(ahora, "us")
+        segundos = restante / np.timedelta64(1, "s")
+        self.t = np.maximum(segundos, 0.0) / SEGUNDOS_POR_ANIO
+        self.sqrt_t = np.sqrt(self.t)
+        self._tasa: float | None = None
+
+    def _descuento(self, tasa: float) -> np.ndarray:
+        if self._tasa != tasa:
+            self._tasa = tasa
+            self._factor_descuento = np.exp(-tasa * self.t)
+        return self._factor_descuento
+
+    # Actualiza primas desde un dict simbolo -> cotizacion o prima
+    def actualizar_primas(self, primas: dict):
+        for simbolo, prima in primas.items():
+            i = self.index.get(simbolo)
+            if i is not None:
+                self.prima[i] = (
+                    _prima({"cotizacion": prima}, self.usar_puntas)
+                    if isinstance(prima, dict)
+                    else prima
+                )
+
+    def evaluar(self, spot: float, tasa: float = 0.0) -> dict[str, np.ndarray]:
+        vol, self.iteraciones = volatilidad_implicita(
+            self.prima, spot, self.strike, self.t, self.es_call, tasa, inicial=self._vol
+        )
+        # una opcion sin solucion no pisa el punto de partida anterior
+        self._vol = (
+            vol if self._vol is None else np.where(np.isnan(vol), self._vol, vol)
+        )
+        return {
+            "simbolo": np.array(self.simbolos, dtype=object),
+            "strike": self.strike,
+            "t": self.t,
+            "iv": vol,
+            "moneyness": spot / self.strike,
+            **self.griegas(spot, vol, tasa),
+        }
+
+    def griegas(
+        self, spot: float, vol: np.ndarray, tasa: float = 0.0
+    ) -> dict[str, np.ndarray]:
+        descuento = self._descuento(tasa)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            d1, d2 = _d1_d2(spot, self.strike, self.sqrt_t, vol, tasa * self.t)
+            nd1 = _norm_cdf(d1)
+            pdf = _norm_pdf(d1)
+            gamma = pdf / (spot * vol * self.sqrt_t)
+            vega = spot * pdf * self.sqrt_t
+            decaimiento = -spot * pdf * vol / (2.0 * self.sqrt_t)
+        k_descontado = tasa * self.strike * descuento
+        theta = np.where(
+            self.es_call,
+            decaimiento - k_descontado * _norm_cdf(d2),
+            decaimiento + k_descontado * _norm_cdf(-d2),
+        )
+        return {
+            "delta": np.where(self.es_call, nd1, nd1 - 1.0),
+            "gamma": gamma,
+            "vega": vega / 100.0,
+            "theta": theta / 365.0,
+        }
+
+
+def _prima(opcion: dict, usar_puntas: bool) -> float:
+    cotizacion = opcion.get("cotizacion") or {}
+    puntas = cotizacion.get("puntas") if usar_puntas else None
+    if isinstance(puntas, list):
+        puntas = puntas[0] if puntas else None
+    if isinstance(puntas, dict):
+        compra, venta = puntas.get("precioCompra"), puntas.get("precioVenta")
+        if compra and venta:
+            return 0.5 * (compra + venta)
+    ultimo = cotizacion.get("ultimoPrecio")
+    return ultimo if isinstance(ultimo, (int, float)) and ultimo > 0 else np.nan
@@ -0,0 +1,300 @@
+import asyncio
+import json
+import sqlite3
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import TYPE_CHECKING
+
+from .constants import EstadoDeOperaciones, Pais
+from .descarga import ventanas
+from .historicos_cache import ONE_DAY, _encode, as_date
+from .utils import iol_decoder_hook
+
+if TYPE_CHECKING:
+    from .client import IOLClient
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS operaciones (
+    numero INTEGER PRIMARY KEY,
+    pais TEXT NOT NULL,
+    estado TEXT,
+    fecha TEXT,
+    datos TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS operaciones_pais_fecha ON operaciones (pais, fecha);
+CREATE TABLE IF NOT EXISTS watermarks (
+    estado TEXT NOT NULL,
+    pais TEXT NOT NULL,
+    hasta TEXT NOT NULL,
+    PRIMARY KEY (estado, pais)
+);
+"""
+
+# estados de una operacion que ya no cambian, el resto se vuelve a revisar
+ESTADOS_FINALES = frozenset(("terminada", "cancelada", "rechazada", "vencida"))
+
+
+def es_pendiente(operacion: dict) -> bool:
+    estado = operacion.get("estado")
+    return not isinstance(estado, str) or estado.lower() not in ESTADOS_FINALES
+
+
+def _fecha(operacion: dict) -> str | None:
+    fecha = operacion.get("fechaOrden")
+    return fecha.date().isoformat() if isinstance(fecha, datetime) else None
+
+
+@dataclass
+class ResultadoSync:
+    nuevas: int = 0
+    actualizadas: int = 0
+    # consultas hechas a la API, incluida la revision de pendientes
+    consultas: int = 0
+    # operaciones almacenadas que siguen pendientes al terminar
+    pendientes: int = 0
+
+    def sumar(self, nuevas: int, actualizadas: int):
+        self.nuevas += nuevas
+        self.actualizadas += actualizadas
+
+
+class OperacionesSync:
+    """
+    Copia local en SQLite de las operaciones de la cuenta.
+    Guarda hasta que dia se sincronizo cada (estado, pais) y solo consulta los
+    dias siguientes; la primera sincronizacion divide el rango en ventanas que
+    se piden en paralelo. Las operaciones ya terminadas no cambian, solo se
+    vuelven a revisar las almacenadas como pendientes, y solo mientras no
+    superen max_dias_pendiente: un estado desconocido no se consulta para siempre.
+
+        sync = client.sincronizador_operaciones("operaciones.db")
+        await sync.sincronizar(pais=Pais.ARG, desde=date(2020, 1, 1))
+        operaciones = sync.leer(Pais.ARG)
+    """
+
+    def __init__(
+        self,
+        client: "IOLClient",
+        path: str = ":memory:",
+        window_days: int = 90,
+        concurrency: int = 4,
+        overlap_days: int = 1,
+        max_individuales: int = 5,
+        max_dias_pendiente: int | None = 90,
+    ) -> None:
+        if window_days < 1:
+            raise AttributeError("window_days debe ser al menos 1")
+        self.client = client
+        self.path = path
+        self.window_days = window_days
+        self.concurrency = concurrency
+        # dias ya sincronizados que se vuelven a pedir, para las operaciones
+        # cargadas cerca del corte anterior
+        self.overlap = timedelta(days=overlap_days)
+        # hasta cuantas pendientes se revisan con get_operacion una por una;
+        # con mas se vuelve a consultar el estado pendientes
+        self.max_individuales = max_individuales
+        # antiguedad maxima de una pendiente que se sigue revisando, None sin limite
+        self.max_dias_pendiente = max_dias_pendiente
+        self._conn = sqlite3.connect(path)
+        self._conn.executescript(SCHEMA)
+
+    def close(self):
+        self._conn.close()
+
+    def watermark(self, estado: EstadoDeOperaciones, pais: Pais) -> date | None:
+        row = self._conn.execute(
+            "SELECT hasta FROM watermarks WHERE estado=? AND pais=?",
+            (str(estado), str(pais)),
+        ).fetchone()
+        return date.fromisoformat(row[0]) if row else None
+
+    # Devuelve cuantas operaciones son nuevas y cuantas cambiaron
+    def guardar(self, pais: Pais, operaciones: list[dict]) -> tuple[int, int]:
+        nuevas = actualizadas = 0
+        with self._conn:
+            for operacion in operaciones:
+                numero = operacion.get("numero")
+                if numero is None:
+                    continue
+                datos = json.dumps(operacion, default=_encode)
+                row = self._conn.execute(
+                    "SELECT datos FROM operaciones WHERE numero=?", (numero,)
+                ).fetchone()
+                if row is None:
+                    nuevas += 1
+                elif row[0] != datos:
+                    actualizadas += 1
+                else:
+                    continue
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO operaciones VALUES (?, ?, ?, ?, ?)",
+                    (
+                        numero,
+                        str(pais),
+                        operacion.get("estado"),
+                        _fecha(operacion),
+                        datos,
+                    ),
+                )
+        return nuevas, actualizadas
+
+    # Operaciones almacenadas, de la mas reciente a la mas antigua
+    def leer(
+        self,
+        pais: Pais,
+        desde: date | None = None,
+        hasta: date | None = None,
+        solo_pendientes: bool = False,
+    ) -> list[dict]:
+        rows = self._conn.execute(
+            "SELECT datos FROM operaciones WHERE pais=? AND (fecha IS NULL OR fecha BETWEEN ? AND ?) ORDER BY fecha DESC, numero DESC",
+            (
+                str(pais),
+                as_date(desde).isoformat() if desde else date.min.isoformat(),
+                as_date(hasta).isoformat() if hasta else date.max.isoformat(),
+            ),
+        ).fetchall()
+        operaciones = [
+            json.loads(datos, object_hook=iol_decoder_hook) for (datos,) in rows
+        ]
+        if solo_pendientes:
+            return [o for o in operaciones if es_pendiente(o)]
+        return operaciones
+
+    async def _consultar(
+        self,
+        sem: asyncio.Semaphore,
+        estado: EstadoDeOperaciones,
+        pais: Pais,
+        desde: date,
+        hasta: date,
+    ) -> list[dict]:
+        async with sem:
+            # fechaHasta se envia como medianoche, se pide hasta el dia siguiente
+            operaciones = await self.client.get_operaciones(
+                estado, pais, desde, hasta + ONE_DAY
+            )
+        if not isinstance(operaciones, list):
+            raise ConnectionError(f"Respuesta inesperada de operaciones {operaciones}")
+        return operaciones
+
+    async def sincronizar(
+        self,
+        estado: EstadoDeOperaciones = EstadoDeOperaciones.TODAS,
+        pais: Pais = Pais.ARG,
+        desde: date | None = None,
+        hoy: date | None = None,
+    ) -> ResultadoSync:
+        """
+        Trae las operaciones desde la ultima sincronizacion de (estado, pais),
+        o desde `desde` (por defecto hace window_days) la primera vez, y revisa
+        las pendientes almacenadas que no vinieron en la consulta.
+        """
+        hoy = as_date(hoy or date.today())
+        watermark = self.watermark(estado, pais)
+        if watermark is not None:
+            inicio = watermark - self.overlap
+        else:
+            inicio = as_date(desde or hoy - timedelta(days=self.window_days))
+
+        sem = asyncio.Semaphore(self.concurrency)
+        rangos = ventanas(inicio, hoy, self.window_days)
+        respuestas = await asyncio.gather(
+            *[self._consultar(sem, estado, pais, d, h) for d, h in rangos]
+        )
+
+        resultado = ResultadoSync(consultas=len(rangos))
+        vistas = set()
+        for operaciones in respuestas:
+            resultado.sumar(*self.guardar(pais, operaciones))
+            vistas.update(o.get("numero") for o in operaciones)
+
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO watermarks VALUES (?, ?, ?)",
+                (str(estado), str(pais), hoy.isoformat()),
+            )
+
+        # las que vinieron en esta consulta ya estan al dia
+        await self._reconciliar(pais, hoy, resultado, excluir=vistas)
+        resultado.pendientes = len(self.leer(pais, solo_pendientes=True))
+        return resultado
+
+    async def reconciliar_pendientes(
+        self, pais: Pais = Pais.ARG, hoy: date | None = None
+    ) -> ResultadoSync:
+        """
+        Actualiza solo las operaciones almacenadas como pendientes. Si son pocas
+        se consulta cada una con get_operacion; si no, una consulta del estado
+        pendientes desde la mas antigua y get_operacion solo para las que ya no
+        aparecen, que son las que cambiaron de estado.
+        """
+        resultado = ResultadoSync()
+        await self._reconciliar(pais, as_date(hoy or date.today()), resultado)
+        resultado.pendientes = len(self.leer(pais, solo_pendientes=True))
+        return resultado
+
+    async def _reconciliar(
+        self,
+        pais: Pais,
+        hoy: date,
+        resultado: ResultadoSync,
+        excluir: set = frozenset(),
+    ):
+        limite = None
+        if self.max_dias_pendiente is not None:
+            limite = hoy - timedelta(days=self.max_dias_pendiente)
+        # con limite, las pendientes sin fecha tampoco se revisan
+        pendientes = [
+            o
+            for o in self.leer(pais, desde=limite, solo_pendientes=True)
+            if o["numero"] not in excluir
+            and (limite is None or isinstance(o.get("fechaOrden"), datetime))
+        ]
+        if not pendientes:
+            return
+
+        sem = asyncio.Semaphore(self.concurrency)
+        if len(pendientes) > self.max_individuales:
+            fechas = [
+                o["fechaOrden"]
+                for o in pendientes
+                if isinstance(o.get("fechaOrden"), datetime)
+            ]
+            if fechas:
+                siguen = await self._consultar(
+                    sem,
+                    EstadoDeOperaciones.PENDIENTES,
+                    pais,
+                    as_date(min(fechas)),
+                    hoy,
+                )
+                resultado.consultas += 1
+                resultado.sumar(*self.guardar(pais, siguen))
+                numeros = {o.get("numero") for o in siguen}
+                pendientes = [o for o in pendientes if o["numero"] not in numeros]
+
+        async def revisar(operacion: dict) -> dict:
+            async with sem:
+                detalle = await self.client.get_operacion(operacion["numero"])
+            return _actualizar(operacion, detalle)
+
+        actualizadas = await asyncio.gather(*[revisar(o) for o in pendientes])
+        resultado.consultas += len(pendientes)
+        resultado.sumar(*self.guardar(pais, actualizadas))
+
+
+def _actualizar(operacion: dict, detalle) -> dict:
+    # el detalle tiene otra forma que el listado: se copian los campos comunes
+    # y el estado actual, asi las filas almacenadas mantienen la del listado
+    if not isinstance(detalle, dict) or detalle.get("numero") != operacion["numero"]:
+        return operacion
+    actualizada = dict(operacion)
+    for clave, valor in detalle.items():
+        if clave in actualizada:
+            actualizada[clave] = valor
+    estado = detalle.get("estadoActual", detalle.get("estado"))
+    if estado is not None:
+        actualizada["estado"] = estado
+    return actualizada
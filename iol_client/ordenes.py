@@ -89,7 +89,7 @@ class OrdenDeVenta:
         self._validar()
 
     def _validar(self):
-        if self.cantidad is not None:
+        if self.cantidad is None:
             raise AttributeError("Parametro cantidad no definido")
 
         if self.tipo_orden == TipoDeOrden.PRECIO_MERCADO and self.precio > 0:
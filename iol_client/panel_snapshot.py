@@ -0,0 +1,100 @@
+"""
+Foto en memoria de un panel de cotizaciones indexada por simbolo.
+
+Requiere numpy; se importa solo al usarla.
+"""
+
+import numpy as np
+
+# (columna, clave dentro del titulo, clave dentro de "puntas")
+SNAPSHOT_COLUMNS = (
+    ("ultimoPrecio", "ultimoPrecio", None),
+    ("precioCompra", None, "precioCompra"),
+    ("precioVenta", None, "precioVenta"),
+    ("cantidadCompra", None, "cantidadCompra"),
+    ("cantidadVenta", None, "cantidadVenta"),
+    ("volumen", "volumen", None),
+)
+
+
+def _valor(titulo: dict, clave: str | None, clave_puntas: str | None) -> float:
+    if clave is not None:
+        valor = titulo.get(clave)
+    else:
+        valor = (titulo.get("puntas") or {}).get(clave_puntas)
+    return np.nan if valor is None else valor
+
+
+class PanelSnapshot:
+    """
+    Mantiene precio, puntas y volumen de cada titulo de un panel en columnas de numpy.
+    aplicar() actualiza la foto con una nueva respuesta de get_panel_cotizaciones y
+    devuelve solo los titulos que cambiaron, comparando todas las filas a la vez.
+    """
+
+    def __init__(self, capacity: int = 256) -> None:
+        self.columnas = tuple(nombre for nombre, _, _ in SNAPSHOT_COLUMNS)
+        self.index: dict[str, int] = {}
+        self.simbolos: list[str] = []
+        self._data = np.full((len(SNAPSHOT_COLUMNS), capacity), np.nan)
+        self._scratch = np.empty((len(SNAPSHOT_COLUMNS), capacity))
+
+    def __len__(self) -> int:
+        return len(self.simbolos)
+
+    def __contains__(self, simbolo: str) -> bool:
+        return simbolo in self.index
+
+    def _fila(self, simbolo: str) -> int:
+        fila = self.index.get(simbolo)
+        if fila is None:
+            fila = len(self.simbolos)
+            if fila == self._data.shape[1]:
+                self._crecer()
+            self.index[simbolo] = fila
+            self.simbolos.append(simbolo)
+        return fila
+
+    def _crecer(self):
+        capacity = self._data.shape[1] * 2
+        data = np.full((len(SNAPSHOT_COLUMNS), capacity), np.nan)
+        data[:, : self._data.shape[1]] = self._data
+        self._data = data
+        self._scratch = np.empty((len(SNAPSHOT_COLUMNS), capacity))
+
+    def aplicar(self, respuesta: dict | list) -> list[dict]:
+        titulos = (
+            respuesta.get("titulos", []) if isinstance(respuesta, dict) else respuesta
+        )
+        n = len(titulos)
+        previos = len(self.simbolos)
+        filas = np.fromiter(
+            (self._fila(titulo["simbolo"]) for titulo in titulos),
+            dtype=np.intp,
+            count=n,
+        )
+
+        if n > self._scratch.shape[1]:
+            self._scratch = np.empty((len(SNAPSHOT_COLUMNS), n))
+        nuevos = self._scratch[:, :n]
+        for i, (_, clave, clave_puntas) in enumerate(SNAPSHOT_COLUMNS):
+            nuevos[i] = np.fromiter(
+                (_valor(titulo, clave, clave_puntas) for titulo in titulos),
+                dtype=np.float64,
+                count=n,
+            )
+
+        actuales = self._data[:, filas]
+        # NaN contra NaN no cuenta como cambio
+        distintos = (nuevos != actuales) & ~(np.isnan(nuevos) & np.isnan(actuales))
+        cambiados = distintos.any(axis=0) | (filas >= previos)
+        self._data[:, filas] = nuevos
+
+        return [titulos[i] for i in np.flatnonzero(cambiados)]
+
+    def columna(self, nombre: str) -> np.ndarray:
+        return self._data[self.columnas.index(nombre), : len(self.simbolos)]
+
+    def fila(self, simbolo: str) -> dict[str, float]:
+        valores = self._data[:, self.index[simbolo]]
+        return dict(zip(self.columnas, valores.tolist()))
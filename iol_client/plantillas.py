@@ -0,0 +1,165 @@
+import asyncio
+import json
+import math
+import numbers
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import TYPE_CHECKING, Any
+
+from .constants import Mercado, Plazo, TipoDeOrden
+from .hedging import LatencyTracker
+from .ordenes import validez_by_default
+
+if TYPE_CHECKING:
+    from .client import IOLClient
+
+
+@dataclass
+class AckOrden:
+    respuesta: Any
+    # segundos desde la llamada hasta la respuesta del broker
+    rtt: float
+
+    @property
+    def numero_operacion(self) -> int | None:
+        if isinstance(self.respuesta, dict):
+            return self.respuesta.get("numeroOperacion")
+        return None
+
+
+def _numero(valor: int | float, nombre: str) -> bytes:
+    # los escalares de numpy se codifican como el int o float de Python equivalente
+    if isinstance(valor, bool) or not isinstance(valor, numbers.Real):
+        raise AttributeError(f"{nombre} debe ser un numero")
+    if isinstance(valor, numbers.Integral):
+        return repr(int(valor)).encode()
+    valor = float(valor)
+    if not math.isfinite(valor):
+        raise AttributeError(f"{nombre} debe ser un numero finito")
+    return float.__repr__(valor).encode()
+
+
+class PlantillaDeOrden:
+    """
+    Orden con mercado, simbolo, plazo y tipo de orden fijos, validados una sola
+    vez, y el cuerpo JSON pre-codificado. Cada envio solo agrega precio y
+    cantidad (o monto, en compras a precio de mercado) y mide el tiempo hasta
+    la respuesta del broker.
+
+    Como contexto async renueva el token antes de que venza y mantiene una
+    conexion abierta:
+
+        async with client.plantilla_de_compra(Mercado.BCBA, "GGAL") as compra:
+            ack = await compra.enviar(precio=1234.5, cantidad=10)
+    """
+
+    def __init__(
+        self,
+        client: "IOLClient",
+        path: str,
+        mercado: Mercado,
+        simbolo: str,
+        tipo_orden: TipoDeOrden = TipoDeOrden.PRECIO_LIMITE,
+        plazo: Plazo = Plazo.T2,
+        validez: datetime | None = None,
+        warm_interval: float = 15.0,
+    ) -> None:
+        if not simbolo:
+            raise AttributeError("Parametro simbolo no definido")
+
+        self.client = client
+        self.path = path
+        self.mercado = mercado
+        self.simbolo = simbolo
+        self.tipo_orden = tipo_orden
+        self.plazo = plazo
+        self.validez = validez
+        # las compras a precio de mercado se expresan en monto
+        self.campo_cantidad = (
+            "monto"
+            if path == "operar/Comprar" and tipo_orden == TipoDeOrden.PRECIO_MERCADO
+            else "cantidad"
+        )
+        # debe ser menor que el keepalive_timeout del pool
+        self.warm_interval = warm_interval
+        self.latencias = LatencyTracker(window=1000, min_samples=1)
+        self._warm_task: asyncio.Task | None = None
+        self._codificar()
+
+    def _codificar(self):
+        validez = self.validez or validez_by_default()
+        fijos = {
+            "mercado": self.mercado.value,
+            "simbolo": self.simbolo,
+            "tipoOrden": self.tipo_orden.value,
+            "plazo": self.plazo.value,
+            "validez": validez.strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z",
+        }
+        prefijo = json.dumps(fijos, separators=(",", ":"))[:-1]
+        self._prefijo = f'{prefijo},"precio":'.encode()
+        self._medio = f',"{self.campo_cantidad}":'.encode()
+        # la validez por defecto vence al final del dia, se recodifica al dia siguiente
+        self._vence = math.inf if self.validez is not None else validez.timestamp()
+
+    def body(self, precio: int | float, cantidad: int | float) -> bytes:
+        precio_codificado = _numero(precio, "precio")
+        cantidad_codificada = _numero(cantidad, self.campo_cantidad)
+        if self.tipo_orden == TipoDeOrden.PRECIO_MERCADO and precio > 0:
+            raise AttributeError("Precio debe ser 0 para tipo_orden='precioMercado'")
+        if self.tipo_orden == TipoDeOrden.PRECIO_LIMITE and precio <= 0:
+            raise AttributeError(
+                "Precio debe ser mayor que 0 para tipo_orden='precioLimite'"
+            )
+        if cantidad <= 0:
+            raise AttributeError(f"{self.campo_cantidad} debe ser mayor que 0")
+
+        if time.time() > self._vence:
+            self._codificar()
+        return (
+            self._prefijo + precio_codificado + self._medio + cantidad_codificada + b"}"
+        )
+
+    async def enviar(
+        self, precio: int | float, cantidad: int | float, timeout: float | None = None
+    ) -> AckOrden:
+        started = time.perf_counter()
+        respuesta = await self.client._post_operar(
+            self.path, self.body(precio, cantidad), timeout=timeout
+        )
+        rtt = time.perf_counter() - started
+        self.latencias.record(self.path, rtt)
+        return AckOrden(respuesta, rtt)
+
+    def rtt_percentil(self, q: float) -> float | None:
+        return self.latencias.percentile(self.path, q)
+
+    async def preparar(self):
+        await self.client.calentar()
+
+    async def __aenter__(self):
+        await self.preparar()
+        self._warm_task = asyncio.create_task(self._mantener_caliente())
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def close(self):
+        if self._warm_task is not None:
+            self._warm_task.cancel()
+            try:
+                await self._warm_task
+            except asyncio.CancelledError:
+                pass
+        self._warm_task = None
+
+    async def _mantener_caliente(self):
+        while True:
+            await asyncio.sleep(self.warm_interval)
+            try:
+                await self.preparar()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.client.logger.warning(f"Connection warm-up failed: {e}")
@@ -0,0 +1,144 @@
+import logging
+import time
+from typing import Awaitable, Callable, TypeVar
+
+import aiohttp
+
+from .cache import ResponseCache
+from .client import IOLClient
+from .metrics import MetricsHook, connection_trace_config
+from .rate_limiter import FairRateLimiter
+from .transport import AiohttpTransport
+
+T = TypeVar("T")
+
+# familia del limitador que usan las consultas de mercado
+MARKET_DATA_PATH = "Titulos"
+
+
+class IOLClientPool:
+    """
+    Varias cuentas sobre un unico pool de conexiones. Cada cuenta es un
+    IOLClient con su propio token manager, pero todas comparten la sesion de
+    aiohttp, la cache de respuestas y un FairRateLimiter que reparte por turnos
+    el techo de consultas entre las cuentas. Las consultas de mercado, que no
+    dependen de la cuenta, se envian por la cuenta con menos consultas en espera.
+
+        async with IOLClientPool({"a": (user_a, pass_a), "b": (user_b, pass_b)}) as pool:
+            portafolio = await pool["a"].get_portafolio(Pais.ARG)
+            cotizacion = await pool.get_titulo_cotizacion("GGAL", Mercado.BCBA)
+    """
+
+    def __init__(
+        self,
+        accounts: dict[str, tuple[str, str]],
+        logging_level=logging.NOTSET,
+        limit: int = 100,
+        limit_per_host: int = 20,
+        ttl_dns_cache: int = 300,
+        keepalive_timeout: float = 30,
+        rate_limiter: FairRateLimiter | None = None,
+        response_cache: ResponseCache | None = None,
+        metrics: MetricsHook | None = None,
+        **client_kwargs,
+    ) -> None:
+        if not accounts:
+            raise AttributeError("El pool necesita al menos una cuenta")
+
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.ttl_dns_cache = ttl_dns_cache
+        self.keepalive_timeout = keepalive_timeout
+        self.metrics = metrics
+        self._session: aiohttp.ClientSession | None = None
+        # un solo transporte sobre la sesion compartida; cerrar un cliente no la cierra
+        self.transport = AiohttpTransport(self._get_session)
+        self.rate_limiter = FairRateLimiter() if rate_limiter is None else rate_limiter
+        # solo se guardan endpoints que no dependen de la cuenta
+        self.response_cache = (
+            ResponseCache() if response_cache is None else response_cache
+        )
+        self.clients = {
+            name: IOLClient(
+                username,
+                password,
+                logging_level=logging_level,
+                rate_limiter=self.rate_limiter.for_account(name),
+                response_cache=self.response_cache,
+                metrics=metrics,
+                transport=self.transport,
+                **client_kwargs,
+            )
+            for name, (username, password) in accounts.items()
+        }
+        self._names = list(self.clients)
+        self._turn = 0
+
+    def __getitem__(self, name: str) -> IOLClient:
+        return self.clients[name]
+
+    def __len__(self) -> int:
+        return len(self.clients)
+
+    async def __aenter__(self):
+        await self._get_session()
+        for client in self.clients.values():
+            if client.auto_refresh_token:
+                client.token_manager.start_auto_refresh()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def close(self):
+        for client in self.clients.values():
+            await client.close()
+        await self.transport.close()
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                ttl_dns_cache=self.ttl_dns_cache,
+                keepalive_timeout=self.keepalive_timeout,
+            )
+            trace_configs = (
+                [connection_trace_config(time.perf_counter)]
+                if self.metrics is not None
+                else None
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector, trace_configs=trace_configs
+            )
+        return self._session
+
+    # Token vigente en cada cuenta y una conexion abierta con la API
+    async def calentar(self):
+        for client in self.clients.values():
+            await client.calentar()
+
+    # Cliente con menos consultas de mercado en espera; los empates se alternan
+    def market_data_client(self) -> IOLClient:
+        self._turn = (self._turn + 1) % len(self._names)
+        orden = self._names[self._turn :] + self._names[: self._turn]
+        name = min(orden, key=lambda n: self.rate_limiter.pending(n, MARKET_DATA_PATH))
+        return self.clients[name]
+
+    async def market_data(self, fetch: Callable[[IOLClient], Awaitable[T]]) -> T:
+        return await fetch(self.market_data_client())
+
+    async def get_titulo_cotizacion(self, *args, **kwargs):
+        return await self.market_data_client().get_titulo_cotizacion(*args, **kwargs)
+
+    async def get_panel_cotizaciones(self, *args, **kwargs):
+        return await self.market_data_client().get_panel_cotizaciones(*args, **kwargs)
+
+    async def get_titulo_historicos(self, *args, **kwargs):
+        return await self.market_data_client().get_titulo_historicos(*args, **kwargs)
+
+    async def get_titulo_opciones(self, *args, **kwargs):
+        return await self.market_data_client().get_titulo_opciones(*args, **kwargs)
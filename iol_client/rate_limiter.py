@@ -0,0 +1,240 @@
+import asyncio
+import time
+from collections import deque
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+# respuestas con las que la API indica que se la esta saturando
+THROTTLE_STATUS = (429, 503)
+
+# (consultas por segundo, rafaga maxima) por familia de endpoints
+DEFAULT_BUDGETS = {
+    "titulos": (10.0, 20.0),
+    "operar": (2.0, 5.0),
+    "operaciones": (5.0, 10.0),
+    "cuenta": (5.0, 10.0),
+}
+
+
+def familia(path: str) -> str:
+    path = path.lower()
+    if path.startswith("operar"):
+        return "operar"
+    if path.startswith("operaciones"):
+        return "operaciones"
+    if "titulos" in path or path.startswith("cotizaciones"):
+        return "titulos"
+    return "cuenta"
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        fecha = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if fecha.tzinfo is None:
+        fecha = fecha.replace(tzinfo=timezone.utc)
+    return max(0.0, (fecha - datetime.now(timezone.utc)).total_seconds())
+
+
+class TokenBucket:
+    """
+    Token bucket por reservas: cada consulta descuenta un token y espera el tiempo
+    necesario para que se repongan. No usa locks; se comparte entre las
+    corrutinas de un mismo event loop. Ante un 429/503 reduce la tasa a la mitad
+    y recuerda un techo algo menor al que provoco el rechazo; los rechazos que
+    llegan durante esa pausa solo la extienden. Con cada respuesta exitosa la
+    tasa vuelve al techo y este se prueba de a poco hacia la tasa maxima.
+    """
+
+    def __init__(self, rate: float, capacity: float, min_rate: float = 0.2) -> None:
+        self.max_rate = rate
+        self.rate = rate
+        self.ceiling = rate
+        self.min_rate = min(min_rate, rate)
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        now = time.monotonic()
+        self._refill(now)
+        self.tokens -= 1
+        wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+
+        # un Retry-After recibido mientras se esperaba tambien se respeta
+        while True:
+            wait = max(wait, self.blocked_until - time.monotonic())
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+            wait = 0.0
+
+    def throttled(self, retry_after: float | None = None):
+        now = time.monotonic()
+        if now < self.blocked_until:
+            # rechazos de consultas enviadas antes de la pausa: ya se redujo la tasa
+            if retry_after is not None:
+                self.blocked_until = max(self.blocked_until, now + retry_after)
+            return
+        self._refill(now)
+        previo = self.rate
+        self.ceiling = max(self.min_rate, previo * 0.9)
+        self.rate = max(self.min_rate, previo * 0.5)
+        self.tokens = min(self.tokens, 0.0)
+        pause = retry_after if retry_after is not None else 1 / self.rate
+        self.blocked_until = now + pause
+
+    def succeeded(self):
+        self._refill(time.monotonic())
+        if self.rate < self.ceiling:
+            self.rate = min(self.ceiling, self.rate + self.ceiling * 0.1)
+        elif self.ceiling < self.max_rate:
+            self.ceiling = min(self.max_rate, self.ceiling + self.max_rate * 0.01)
+            self.rate = self.ceiling
+
+
+class RateLimiter:
+    """
+    Limitador de consultas con un token bucket por familia de endpoints
+    (titulos/cotizaciones, operar, operaciones y cuenta). Las familias sin
+    presupuesto no se limitan.
+    """
+
+    def __init__(self, budgets: dict[str, tuple[float, float]] | None = None) -> None:
+        budgets = DEFAULT_BUDGETS if budgets is None else budgets
+        self.buckets = {
+            name: TokenBucket(rate, capacity)
+            for name, (rate, capacity) in budgets.items()
+        }
+
+    def bucket(self, path: str) -> TokenBucket | None:
+        return self.buckets.get(familia(path))
+
+    async def acquire(self, path: str):
+        bucket = self.bucket(path)
+        if bucket is not None:
+            await bucket.acquire()
+
+    def feedback(self, path: str, status: int, retry_after: float | None = None):
+        bucket = self.bucket(path)
+        if bucket is None:
+            return
+        if status in THROTTLE_STATUS:
+            bucket.throttled(retry_after)
+        elif status < 400:
+            bucket.succeeded()
+
+
+class _FairQueue:
+    """
+    Consultas en espera de un bucket agrupadas por cuenta. Los tokens se
+    entregan por turnos entre las cuentas con consultas en espera, asi una
+    cuenta con muchas consultas no demora a las demas mas de una por turno.
+    """
+
+    def __init__(self, bucket: TokenBucket) -> None:
+        self.bucket = bucket
+        self.waiters: dict[str, deque[asyncio.Future]] = {}
+        self.turns: deque[str] = deque()
+        self._task: asyncio.Task | None = None
+
+    def pending(self, account: str) -> int:
+        return sum(not f.done() for f in self.waiters.get(account, ()))
+
+    async def acquire(self, account: str):
+        future = asyncio.get_running_loop().create_future()
+        waiters = self.waiters.setdefault(account, deque())
+        if not waiters:
+            self.turns.append(account)
+        waiters.append(future)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._dispatch())
+        await future
+
+    def _next(self) -> asyncio.Future | None:
+        # la siguiente consulta viva por turno, descartando las canceladas
+        while self.turns:
+            account = self.turns.popleft()
+            waiters = self.waiters[account]
+            while waiters and waiters[0].done():
+                waiters.popleft()
+            if not waiters:
+                del self.waiters[account]
+                continue
+            future = waiters.popleft()
+            if waiters:
+                self.turns.append(account)
+            else:
+                del self.waiters[account]
+            return future
+        return None
+
+    async def _dispatch(self):
+        while self.turns:
+            await self.bucket.acquire()
+            future = self._next()
+            if future is not None:
+                future.set_result(None)
+
+
+class FairRateLimiter(RateLimiter):
+    """
+    Limitador compartido por varias cuentas: todas usan los mismos buckets
+    (el techo de consultas es comun), pero en cada familia las consultas en
+    espera se atienden por turnos entre cuentas. for_account() devuelve el
+    limitador que usa el cliente de cada cuenta.
+    """
+
+    def __init__(self, budgets: dict[str, tuple[float, float]] | None = None) -> None:
+        super().__init__(budgets)
+        self.queues = {
+            name: _FairQueue(bucket) for name, bucket in self.buckets.items()
+        }
+
+    async def acquire(self, path: str, account: str = ""):
+        queue = self.queues.get(familia(path))
+        if queue is not None:
+            await queue.acquire(account)
+
+    # Consultas de la cuenta esperando turno, en todas las familias o en la de path
+    def pending(self, account: str, path: str | None = None) -> int:
+        if path is not None:
+            queue = self.queues.get(familia(path))
+            return 0 if queue is None else queue.pending(account)
+        return sum(queue.pending(account) for queue in self.queues.values())
+
+    def for_account(self, account: str) -> "AccountRateLimiter":
+        return AccountRateLimiter(self, account)
+
+
+class AccountRateLimiter(RateLimiter):
+    """
+    Vista de un FairRateLimiter para una cuenta, con la interfaz de RateLimiter.
+    """
+
+    def __init__(self, shared: FairRateLimiter, account: str) -> None:
+        self.shared = shared
+        self.account = account
+        self.buckets = shared.buckets
+
+    async def acquire(self, path: str):
+        await self.shared.acquire(path, self.account)
+
+    def feedback(self, path: str, status: int, retry_after: float | None = None):
+        self.shared.feedback(path, status, retry_after)
+
+
+# limitador compartido por todos los clientes del proceso
+DEFAULT_RATE_LIMITER = RateLimiter()
@@ -0,0 +1,137 @@
+import codecs
+import json
+import re
+from typing import Any, Callable
+
+_WHITESPACE = re.compile(rb"[ \t\n\r]*")
+# tramos sin corchetes ni llaves, con las cadenas completas; fuera de un
+# contenedor la coma tambien corta el tramo
+_CADENA = rb'"[^"\\]*(?:\\.[^"\\]*)*"'
+_TRAMO = re.compile(rb"(?:[^\"\[\]{}]+|%s)*" % _CADENA)
+_TRAMO_ELEMENTO = re.compile(rb"(?:[^\"\[\]{},]+|%s)*" % _CADENA)
+_COMA, _CIERRE = ord(","), ord("]")
+
+
+class ErrorRespuesta(Exception):
+    def __init__(self, status: int, respuesta) -> None:
+        super().__init__(f"{status}: {respuesta}")
+        self.status = status
+        self.respuesta = respuesta
+
+
+class JsonArrayParser:
+    """
+    Separa incrementalmente los elementos de un array JSON a medida que llegan
+    los bytes. feed() devuelve los elementos completos y descarta del buffer lo
+    ya procesado, asi que la memoria depende del tamano de un elemento y no del
+    de la respuesta. Los elementos completos de cada parte se decodifican juntos
+    con decode, que recibe los bytes de un array; por defecto json.loads con
+    object_hook, y el cliente usa su JsonBackend como para la respuesta completa.
+    """
+
+    def __init__(
+        self,
+        object_hook: Callable[[dict], Any] | None = None,
+        decode: Callable[[bytes], list] | None = None,
+    ) -> None:
+        if decode is None:
+
+            def decode(data: bytes) -> list:
+                return json.loads(data, object_hook=object_hook)
+
+        self._decode = decode
+        self._buf = b""
+        self._abierto = False
+        self._vacio = True
+        self._cerrado = False
+
+    def feed(self, chunk: bytes) -> list:
+        self._buf += chunk
+        return self._parse(final=False)
+
+    def close(self) -> list:
+        items = self._parse(final=True)
+        if not self._cerrado:
+            raise _error("Array JSON incompleto", self._buf, 0)
+        if self._buf.strip():
+            raise _error("Datos despues del array", self._buf, 0)
+        return items
+
+    def _parse(self, final: bool) -> list:
+        buf = self._buf
+        if not self._abierto:
+            if not final and codecs.BOM_UTF8.startswith(buf):
+                return []
+            buf = buf.removeprefix(codecs.BOM_UTF8)
+        pos = _WHITESPACE.match(buf).end()
+        items, elementos = [], []
+
+        if not self._abierto:
+            if pos == len(buf):
+                self._buf = buf
+                return []
+            if buf[pos] != ord("["):
+                raise _error("Se esperaba un array JSON", buf, pos)
+            self._abierto = True
+            pos = _WHITESPACE.match(buf, pos + 1).end()
+
+        # camino rapido: lo anterior al ultimo "}," se decodifica de una vez; si el
+        # corte cae dentro de una cadena o de un objeto anidado el array queda
+        # desbalanceado, decode falla y se separa elemento por elemento
+        corte = buf.rfind(b"},", pos) if not self._cerrado else -1
+        if corte >= 0:
+            try:
+                items = self._decode(b"[" + buf[pos : corte + 1] + b"]")
+            except ValueError:
+                pass
+            else:
+                self._vacio = False
+                pos = _WHITESPACE.match(buf, corte + 2).end()
+
+        while not self._cerrado and pos < len(buf):
+            if self._vacio and buf[pos] == _CIERRE:
+                self._cerrado = True
+                pos += 1
+                break
+            # un elemento se acepta al ver el separador, un numero puede seguir
+            fin = _fin_elemento(buf, pos)
+            if fin is None:
+                if final:
+                    raise _error("Array JSON incompleto", buf, pos)
+                break
+            elemento = buf[pos:fin].rstrip()
+            if not elemento:
+                raise _error("Se esperaba un valor", buf, pos)
+            if buf[fin] != _COMA and buf[fin] != _CIERRE:
+                raise _error("Se esperaba ',' o ']'", buf, fin)
+            elementos.append(elemento)
+            self._vacio = False
+            self._cerrado = buf[fin] == _CIERRE
+            pos = _WHITESPACE.match(buf, fin + 1).end()
+
+        self._buf = buf[pos:]
+        if elementos:
+            items += self._decode(b"[" + b",".join(elementos) + b"]")
+        return items
+
+
+# Posicion del separador que sigue al elemento que empieza en pos, None si esta cortado
+def _fin_elemento(buf: bytes, pos: int) -> int | None:
+    profundidad = 0
+    while True:
+        pos = (_TRAMO if profundidad else _TRAMO_ELEMENTO).match(buf, pos).end()
+        if pos == len(buf) or buf[pos] == ord('"'):
+            # fin del buffer o una cadena sin la comilla final
+            return None
+        caracter = buf[pos]
+        if caracter in b"[{":
+            profundidad += 1
+        elif profundidad == 0:
+            return pos
+        else:
+            profundidad -= 1
+        pos += 1
+
+
+def _error(mensaje: str, buf: bytes, pos: int) -> json.JSONDecodeError:
+    return json.JSONDecodeError(mensaje, buf.decode("utf-8", "replace"), pos)
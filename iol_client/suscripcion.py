@@ -0,0 +1,136 @@
+import asyncio
+import logging
+from typing import TYPE_CHECKING, Awaitable, Callable
+
+from .constants import Instrumento, Mercado, Pais
+from .utils import get_logger
+
+if TYPE_CHECKING:
+    from .client import IOLClient
+
+
+class SuscripcionCotizaciones:
+    """
+    Iterador asincronico de cotizaciones que consulta periodicamente la API y
+    entrega solo los titulos cuya cotizacion cambio, como dict simbolo -> cotizacion.
+    Si se indica un panel se usa una unica consulta del panel por ciclo y solo los
+    simbolos ausentes del panel se consultan individualmente; sin panel cada ciclo
+    hace una consulta por simbolo, no se deduce a que panel pertenecen. Si el
+    consumidor es mas lento que el sondeo, las actualizaciones se combinan y queda
+    la ultima de cada simbolo. Las respuestas que no son una cotizacion (errores
+    de la API) se descartan y se conserva la ultima cotizacion valida.
+
+        async with client.suscribir_cotizaciones(["GGAL", "YPFD"], intervalo=2) as feed:
+            async for cambios in feed:
+                ...
+    """
+
+    def __init__(
+        self,
+        client: "IOLClient",
+        simbolos: list[str] | None = None,
+        mercado: Mercado = Mercado.BCBA,
+        pais: Pais | None = None,
+        instrumento: Instrumento.ARG | Instrumento.USA | None = None,
+        panel=None,
+        intervalo: float = 1.0,
+        sleep: Callable[[float], Awaitable] | None = None,
+        logging_level=logging.NOTSET,
+    ) -> None:
+        if simbolos is None and panel is None:
+            raise AttributeError("Se debe indicar simbolos, un panel o ambos")
+        if panel is not None and (pais is None or instrumento is None):
+            raise AttributeError("El panel requiere pais e instrumento")
+
+        self.logger = get_logger(__name__, logging_level)
+        self.client = client
+        self.simbolos = None if simbolos is None else set(simbolos)
+        self.mercado = mercado
+        self.pais = pais
+        self.instrumento = instrumento
+        self.panel = panel
+        self.intervalo = intervalo
+        self._sleep = sleep or asyncio.sleep
+        self._ultimas: dict[str, dict] = {}
+        self._pendientes: dict[str, dict] = {}
+        self._hay_cambios: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+
+    async def __aenter__(self):
+        self._start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> dict[str, dict]:
+        self._start()
+        await self._hay_cambios.wait()
+        self._hay_cambios.clear()
+        cambios, self._pendientes = self._pendientes, {}
+        return cambios
+
+    def _start(self):
+        if self._task is None:
+            self._hay_cambios = asyncio.Event()
+            self._task = asyncio.create_task(self._sondear())
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    async def _sondear(self):
+        while True:
+            try:
+                cotizaciones = await self.consultar()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.warning(f"Quote poll failed: {e}")
+                cotizaciones = {}
+
+            for simbolo, cotizacion in cotizaciones.items():
+                if self._ultimas.get(simbolo) != cotizacion:
+                    self._ultimas[simbolo] = cotizacion
+                    self._pendientes[simbolo] = cotizacion
+
+            if self._pendientes:
+                self._hay_cambios.set()
+            await self._sleep(self.intervalo)
+
+    # Una ronda de consultas eligiendo la forma mas barata de cubrir los simbolos
+    async def consultar(self) -> dict[str, dict]:
+        cotizaciones = {}
+        if self.panel is not None:
+            respuesta = await self.client.get_panel_cotizaciones(
+                self.pais, self.instrumento, self.panel
+            )
+            titulos = respuesta.get("titulos") if isinstance(respuesta, dict) else None
+            for titulo in titulos or []:
+                simbolo = titulo.get("simbolo")
+                if self.simbolos is None or simbolo in self.simbolos:
+                    cotizaciones[simbolo] = titulo
+
+        faltantes = [s for s in self.simbolos or () if s not in cotizaciones]
+        respuestas = await asyncio.gather(
+            *[self.client.get_titulo_cotizacion(s, self.mercado) for s in faltantes],
+            return_exceptions=True,
+        )
+        for simbolo, cotizacion in zip(faltantes, respuestas):
+            if isinstance(cotizacion, Exception):
+                self.logger.warning(f"Quote poll failed for {simbolo}: {cotizacion}")
+                continue
+            cotizaciones[simbolo] = cotizacion
+        return {s: c for s, c in cotizaciones.items() if es_cotizacion(c)}
+
+
+def es_cotizacion(respuesta) -> bool:
+    return isinstance(respuesta, dict) and "ultimoPrecio" in respuesta
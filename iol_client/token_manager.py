@@ -1,16 +1,21 @@
 import asyncio
 from datetime import timedelta, datetime
 import json
+import time
 
 import aiohttp
 import logging
 
-from typing import Any
+from typing import Any, Awaitable, Callable
 
 from .constants import *
-from .utils import get_logger, iol_decoder_hook
+from .metrics import MetricsHook, TokenEvent
+from .transport import AiohttpTransport, Transport
+from .utils import TOKEN_DATE_FIELDS, get_logger, make_iol_decoder_hook
 
 TOKEN_ENDPOINT = "https://api.invertironline.com/token"
+# margen antes del vencimiento a partir del cual el token se considera vencido
+EXPIRATION_MARGIN = timedelta(seconds=60)
 DEFAULT_HEADERS = {
     "Accept": "application/json",
     "Content-Type": "application/x-www-form-urlencoded;charset=UTF-8",
@@ -19,9 +24,23 @@ DEFAULT_HEADERS = {
 
 class TokenManager:
     def __init__(
-        self, username: str, password: str, logging_level=logging.NOTSET
+        self,
+        username: str,
+        password: str,
+        logging_level=logging.NOTSET,
+        get_session: Callable[[], Awaitable[aiohttp.ClientSession]] | None = None,
+        refresh_ahead: timedelta = timedelta(seconds=120),
+        min_refresh_interval: float = 5.0,
+        metrics: MetricsHook | None = None,
+        token_url: str = TOKEN_ENDPOINT,
+        transport: Transport | None = None,
     ) -> None:
         self.logger = get_logger(__name__, logging_level)
+        self.token_url = token_url
+        # si no se comparte el pool de un cliente se usa una sesion propia
+        self._get_shared_session = get_session
+        self._session: aiohttp.ClientSession | None = None
+        self.transport = transport or AiohttpTransport(self._get_session)
         self._username = username
         self._password = password
         self.token = {
@@ -31,39 +50,137 @@ class TokenManager:
             "access_token": "",
         }
         self.requested_token: bool = False
-        self.sem = asyncio.Semaphore(1)
+        # renovacion en curso, todos los llamadores concurrentes esperan la misma
+        self._renewal: asyncio.Future | None = None
+        # renovacion en segundo plano antes de que venza el access token
+        self.refresh_ahead = refresh_ahead
+        # con tokens de vida corta evita renovar sin pausa contra el endpoint
+        self.min_refresh_interval = min_refresh_interval
+        self._auto_refresh_task: asyncio.Task | None = None
+        self.metrics = metrics
+
+    def _authorization(self) -> str:
+        return f"{self.token['token_type']} {self.token['access_token']}"
+
+    def _is_valid(self) -> bool:
+        return (
+            self.requested_token
+            and self.token[".expires"] >= datetime.utcnow() + EXPIRATION_MARGIN
+        )
 
     async def ensure_access_token(self):
-        while self.sem.locked():
-            await asyncio.sleep(1)
+        # camino rapido sin sincronizacion cuando el token sigue vigente
+        if self._is_valid():
+            return self._authorization()
 
-        async with self.sem:
-            datetime_now = datetime.utcnow() + timedelta(seconds=60)
+        await self._single_flight()
+        return self._authorization()
 
-            if not self.requested_token or self.token[".refreshexpires"] < datetime_now:
-                await self._get_token()
-                self.requested_token = self.token[".refreshexpires"] >= datetime_now
-            elif self.token[".expires"] < datetime_now:
-                await self._refresh_token()
+    # Comparte una unica renovacion entre todos los llamadores concurrentes
+    async def _single_flight(self, force: bool = False):
+        if self._renewal is None:
+            self._renewal = asyncio.ensure_future(self._renew(force))
+            self._renewal.add_done_callback(self._renewal_done)
+        await asyncio.shield(self._renewal)
 
-            return f"{self.token['token_type']} {self.token['access_token']}"
+    def _renewal_done(self, future: asyncio.Future):
+        self._renewal = None
+        # evita el aviso de excepcion no recuperada si nadie esperaba la renovacion
+        if not future.cancelled():
+            future.exception()
 
-    async def _fetch_token(self, data) -> Any:
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                TOKEN_ENDPOINT, headers=DEFAULT_HEADERS, data=data
-            ) as resp:
-                if resp.status != 200:
-                    raise ConnectionError(
-                        f"Authentication Error {resp.status} {resp.headers}"
+    async def _renew(self, force: bool = False):
+        datetime_now = datetime.utcnow() + EXPIRATION_MARGIN
+
+        if not self.requested_token or self.token[".refreshexpires"] < datetime_now:
+            await self._get_token()
+            self.requested_token = self.token[".refreshexpires"] >= datetime_now
+        elif force or self.token[".expires"] < datetime_now:
+            await self._refresh_token()
+
+    # Inicia la renovacion en segundo plano del access token
+    def start_auto_refresh(self):
+        if self._auto_refresh_task is None or self._auto_refresh_task.done():
+            self._auto_refresh_task = asyncio.create_task(self._auto_refresh())
+
+    async def stop_auto_refresh(self):
+        if self._auto_refresh_task is not None:
+            self._auto_refresh_task.cancel()
+            try:
+                await self._auto_refresh_task
+            except asyncio.CancelledError:
+                pass
+        self._auto_refresh_task = None
+
+    async def _auto_refresh(self):
+        last_refresh = None
+        while True:
+            try:
+                await self.ensure_access_token()
+                wait = (
+                    self.token[".expires"] - self.refresh_ahead - datetime.utcnow()
+                ).total_seconds()
+                if last_refresh is not None:
+                    wait = max(
+                        wait,
+                        last_refresh + self.min_refresh_interval - time.monotonic(),
                     )
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                last_refresh = time.monotonic()
+                await self._single_flight(force=True)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.warning(f"Background token refresh failed: {e}")
+                await asyncio.sleep(5)
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        if self._get_shared_session is not None:
+            return await self._get_shared_session()
+
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession()
+        return self._session
+
+    # Cierra la sesion propia, el pool compartido lo cierra el cliente
+    async def close(self):
+        await self.stop_auto_refresh()
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def _fetch_token(self, data) -> Any:
+        if self.metrics is None:
+            return await self._post_token(data)
+
+        kind = "get" if data["grant_type"] == "password" else "refresh"
+        started = time.perf_counter()
+        ok = False
+        try:
+            token = await self._post_token(data)
+            ok = True
+            return token
+        finally:
+            self.metrics.on_token(
+                TokenEvent(kind=kind, duration=time.perf_counter() - started, ok=ok)
+            )
+
+    async def _post_token(self, data) -> Any:
+        resp = await self.transport.request(
+            "POST", self.token_url, headers=DEFAULT_HEADERS, data_body=data
+        )
+        if resp.status != 200:
+            raise ConnectionError(f"Authentication Error {resp.status} {resp.headers}")
 
-                self.token = json.loads(await resp.text(), object_hook=iol_decoder_hook)
+        self.token = json.loads(
+            resp.body, object_hook=make_iol_decoder_hook(TOKEN_DATE_FIELDS)
+        )
 
-                self.logger.info(
-                    f"Succes authentication. Token expires: {self.token['.expires']}, refreshexpires: {self.token['.refreshexpires']}"
-                )
-                return self.token
+        self.logger.info(
+            f"Succes authentication. Token expires: {self.token['.expires']}, refreshexpires: {self.token['.refreshexpires']}"
+        )
+        return self.token
 
     async def _get_token(self) -> Any:
         self.logger.debug("Getting Token")
@@ -0,0 +1,393 @@
+import abc
+import asyncio
+import bisect
+import hashlib
+import json
+import time
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from pathlib import Path
+from typing import AsyncIterator, Awaitable, Callable, Mapping
+from urllib.parse import urlsplit
+
+import aiohttp
+
+# las consultas de token no se graban y en la reproduccion se generan
+TOKEN_PATH = "/token"
+
+
+@dataclass
+class TransportResponse:
+    status: int
+    body: bytes
+    headers: Mapping[str, str] = field(default_factory=dict)
+    # perf_counter al recibir los encabezados, para las metricas
+    first_byte: float = 0.0
+
+
+@dataclass
+class StreamResponse:
+    status: int
+    chunks: AsyncIterator[bytes]
+    headers: Mapping[str, str] = field(default_factory=dict)
+
+
+async def _un_chunk(body: bytes):
+    yield body
+
+
+class Transport(abc.ABC):
+    """
+    Envia las consultas HTTP del cliente y del token manager y devuelve la
+    respuesta completa. sleep es la espera que usan los ciclos de sondeo, para
+    que un transporte pueda acelerar el tiempo.
+    """
+
+    # False si las respuestas no salen de la API, como al reproducir una
+    # grabacion: el cliente no les aplica el limitador de consultas
+    en_red = True
+
+    @abc.abstractmethod
+    async def request(
+        self,
+        method: str,
+        url: str,
+        headers: Mapping[str, str] | None = None,
+        data_body=None,
+        json_body=None,
+        trace: dict | None = None,
+    ) -> TransportResponse:
+        ...
+
+    # Respuesta por partes a medida que llega; por defecto se entrega completa
+    @asynccontextmanager
+    async def stream(
+        self,
+        method: str,
+        url: str,
+        headers: Mapping[str, str] | None = None,
+        data_body=None,
+        json_body=None,
+    ):
+        resp = await self.request(method, url, headers, data_body, json_body)
+        yield StreamResponse(resp.status, _un_chunk(resp.body), resp.headers)
+
+    async def sleep(self, delay: float):
+        await asyncio.sleep(delay)
+
+    # Abre de antemano una conexion con el host de url, si el transporte usa red
+    async def warm(self, url: str):
+        pass
+
+    async def close(self):
+        pass
+
+
+class AiohttpTransport(Transport):
+    """
+    Transporte por defecto sobre la sesion de aiohttp del cliente. Sin
+    get_session abre y cierra una sesion propia.
+    """
+
+    def __init__(
+        self,
+        get_session: Callable[[], Awaitable[aiohttp.ClientSession]] | None = None,
+        chunk_size: int = 64 * 1024,
+    ) -> None:
+        self._get_shared_session = get_session
+        self.chunk_size = chunk_size
+        self._session: aiohttp.ClientSession | None = None
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        if self._get_shared_session is not None:
+            return await self._get_shared_session()
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession()
+        return self._session
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        headers: Mapping[str, str] | None = None,
+        data_body=None,
+        json_body=None,
+        trace: dict | None = None,
+    ) -> TransportResponse:
+        session = await self._get_session()
+        async with session.request(
+            method=method,
+            url=url,
+            headers=headers,
+            data=data_body,
+            json=json_body,
+            trace_request_ctx=trace,
+        ) as resp:
+            first_byte = time.perf_counter()
+            return TransportResponse(
+                status=resp.status,
+                body=await resp.read(),
+                headers=resp.headers,
+                first_byte=first_byte,
+            )
+
+    @asynccontextmanager
+    async def stream(
+        self,
+        method: str,
+        url: str,
+        headers: Mapping[str, str] | None = None,
+        data_body=None,
+        json_body=None,
+    ):
+        session = await self._get_session()
+        async with session.request(
+            method=method, url=url, headers=headers, data=data_body, json=json_body
+        ) as resp:
+            yield StreamResponse(
+                resp.status, resp.content.iter_chunked(self.chunk_size), resp.headers
+            )
+
+    async def warm(self, url: str):
+        # la conexion queda en el pool con keep-alive para la proxima consulta
+        session = await self._get_session()
+        async with session.head(url) as resp:
+            await resp.read()
+
+
+def _clave(
+    method: str, url: str, json_body, data_body=None
+) -> tuple[str, str, str | None]:
+    parts = urlsplit(url)
+    path = parts.path + (f"?{parts.query}" if parts.query else "")
+    if json_body is not None:
+        return method, path, json.dumps(json_body, sort_keys=True)
+    if data_body is None:
+        return method, path, None
+    # de los cuerpos ya codificados o formularios solo se guarda un hash
+    if isinstance(data_body, str):
+        data_body = data_body.encode()
+    elif not isinstance(data_body, bytes):
+        data_body = json.dumps(data_body, sort_keys=True, default=str).encode()
+    return method, path, "sha256:" + hashlib.sha256(data_body).hexdigest()
+
+
+@dataclass
+class Grabacion:
+    t: float
+    method: str
+    path: str
+    body: str | None
+    status: int
+    headers: dict[str, str]
+    response: bytes
+
+
+class RecordingTransport(Transport):
+    """
+    Envuelve otro transporte y agrega cada par consulta/respuesta a un archivo.
+    Cada registro es una linea JSON con los metadatos seguida del cuerpo crudo
+    de la respuesta, asi que el archivo solo crece y no se reescribe. No se
+    graban las consultas de token ni los formularios con credenciales. Las
+    respuestas por partes (stream) se reciben y graban completas.
+    """
+
+    def __init__(
+        self,
+        inner: Transport,
+        path: str | Path,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.inner = inner
+        self.path = Path(path)
+        self.clock = clock
+        self._file = None
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        headers: Mapping[str, str] | None = None,
+        data_body=None,
+        json_body=None,
+        trace: dict | None = None,
+    ) -> TransportResponse:
+        response = await self.inner.request(
+            method, url, headers, data_body, json_body, trace
+        )
+        if not urlsplit(url).path.endswith(TOKEN_PATH):
+            self.write(method, url, json_body, response, data_body)
+        return response
+
+    def write(
+        self,
+        method: str,
+        url: str,
+        json_body,
+        response: TransportResponse,
+        data_body=None,
+    ):
+        method, path, body = _clave(method, url, json_body, data_body)
+        header = {
+            "t": self.clock(),
+            "m": method,
+            "p": path,
+            "b": body,
+            "s": response.status,
+            "n": len(response.body),
+        }
+        retry_after = response.headers.get("Retry-After")
+        if retry_after is not None:
+            header["h"] = {"Retry-After": retry_after}
+
+        if self._file is None:
+            self._file = self.path.open("ab")
+        self._file.write(json.dumps(header, separators=(",", ":")).encode())
+        self._file.write(b"\n" + response.body + b"\n")
+        self._file.flush()
+
+    async def sleep(self, delay: float):
+        await self.inner.sleep(delay)
+
+    async def warm(self, url: str):
+        await self.inner.warm(url)
+
+    async def close(self):
+        await self.inner.close()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def leer_grabacion(path: str | Path) -> list[Grabacion]:
+    grabaciones = []
+    with Path(path).open("rb") as f:
+        for line in f:
+            header = json.loads(line)
+            response = f.read(header["n"])
+            f.read(1)
+            grabaciones.append(
+                Grabacion(
+                    t=header["t"],
+                    method=header["m"],
+                    path=header["p"],
+                    body=header["b"],
+                    status=header["s"],
+                    headers=header.get("h", {}),
+                    response=response,
+                )
+            )
+    return grabaciones
+
+
+class VirtualClock:
+    """
+    Reloj virtual que solo avanza con sleep(). Con speed=None las esperas son
+    instantaneas; con speed=10 una espera de 1 segundo demora 0.1 reales.
+    """
+
+    def __init__(self, start: float | None = None, speed: float | None = None):
+        self.now = start
+        self.speed = speed
+
+    def time(self) -> float:
+        return self.now or 0.0
+
+    async def sleep(self, delay: float):
+        if self.speed is None:
+            await asyncio.sleep(0)
+        else:
+            await asyncio.sleep(delay / self.speed)
+        self.now = self.time() + delay
+
+
+class ReplayTransport(Transport):
+    """
+    Sirve desde memoria las respuestas de una grabacion, sin red. Las consultas
+    se buscan por metodo, path y cuerpo, y si no hay una igual por metodo y
+    path. Sin reloj cada consulta repetida devuelve la siguiente respuesta
+    grabada (la ultima se repite); con un VirtualClock devuelve la ultima
+    grabada hasta el instante virtual actual. Los tokens se generan al vuelo.
+    """
+
+    en_red = False
+
+    def __init__(self, path: str | Path, clock: VirtualClock | None = None) -> None:
+        self.grabaciones = leer_grabacion(path)
+        self.clock = clock
+        if clock is not None and clock.now is None and self.grabaciones:
+            clock.now = self.grabaciones[0].t
+        # por (metodo, path, cuerpo) y por (metodo, path)
+        self._grabaciones: dict[tuple, list[Grabacion]] = defaultdict(list)
+        for g in self.grabaciones:
+            self._grabaciones[(g.method, g.path, g.body)].append(g)
+            self._grabaciones[(g.method, g.path)].append(g)
+        self._tiempos = {
+            clave: [g.t for g in grabaciones]
+            for clave, grabaciones in self._grabaciones.items()
+        }
+        self._posicion: dict[tuple, int] = defaultdict(int)
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        headers: Mapping[str, str] | None = None,
+        data_body=None,
+        json_body=None,
+        trace: dict | None = None,
+    ) -> TransportResponse:
+        first_byte = time.perf_counter()
+        method, path, body = _clave(method, url, json_body, data_body)
+        if path.endswith(TOKEN_PATH):
+            return TransportResponse(200, _token(), first_byte=first_byte)
+
+        clave = (method, path, body)
+        if clave not in self._grabaciones:
+            clave = (method, path)
+        grabaciones = self._grabaciones.get(clave)
+        if grabaciones is None:
+            return TransportResponse(
+                404, b'{"message": "Sin respuesta grabada"}', first_byte=first_byte
+            )
+
+        grabacion = grabaciones[self._indice(clave, grabaciones)]
+        return TransportResponse(
+            grabacion.status, grabacion.response, grabacion.headers, first_byte
+        )
+
+    def _indice(self, clave: tuple, grabaciones: list[Grabacion]) -> int:
+        if self.clock is None:
+            indice = min(self._posicion[clave], len(grabaciones) - 1)
+            self._posicion[clave] += 1
+            return indice
+        # ultima respuesta grabada hasta el instante virtual, o la primera
+        return max(bisect.bisect_right(self._tiempos[clave], self.clock.time()) - 1, 0)
+
+    async def sleep(self, delay: float):
+        if self.clock is None:
+            await asyncio.sleep(delay)
+        else:
+            await self.clock.sleep(delay)
+
+
+def _token() -> bytes:
+    now = datetime.now(timezone.utc)
+    return json.dumps(
+        {
+            "access_token": "replay",
+            "token_type": "bearer",
+            "refresh_token": "replay",
+            ".issued": format_datetime(now, usegmt=True),
+            ".expires": format_datetime(now + timedelta(days=1), usegmt=True),
+            ".refreshexpires": format_datetime(now + timedelta(days=1), usegmt=True),
+        }
+    ).encode()
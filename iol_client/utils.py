@@ -1,49 +1,132 @@
 import re
-import pandas as pd
-from datetime import datetime
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Iterable
 
 import logging
 import sys
 
 
-def iol_decoder_hook(dct):
-    for k, v in dct.items():
-        if isinstance(v, str):
+# 2021-11-24T16:04:25.2370547-03:00
+_ISO_7_DIGITS_TZ = re.compile(
+    r"(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2})\.(\d{7})([+-]\d{2}:\d{2})"
+)
+# Fri, 26 Nov 2021 18:15:14 GMT
+_RFC_1123 = re.compile(
+    r"[a-zA-Z]{3}, (\d{2}) ([a-zA-Z]{3}) (\d{4}) (\d{2}):(\d{2}):(\d{2}) (GMT|UTC)"
+)
+_MONTHS = {
+    "jan": 1,
+    "feb": 2,
+    "mar": 3,
+    "apr": 4,
+    "may": 5,
+    "jun": 6,
+    "jul": 7,
+    "aug": 8,
+    "sep": 9,
+    "oct": 10,
+    "nov": 11,
+    "dec": 12,
+}
+
+# campos con fechas conocidos por endpoint, el resto de las claves no se revisan
+TOKEN_DATE_FIELDS = (".issued", ".expires", ".refreshexpires")
+HISTORICOS_DATE_FIELDS = ("fechaHora",)
+
+
+def parse_iol_date(v: str) -> datetime | None:
+    """
+    Convierte las fechas devueltas por la API a datetime naive en UTC.
+    Devuelve None si el string no tiene ninguno de los formatos conocidos.
+    """
+    n = len(v)
+    if n < 19:
+        return None
+
+    try:
+        if v[4] == "-" and v[10] == "T":
+            # 0001-01-01T00:00:00
+            if n == 19:
+                return datetime.fromisoformat(v)
+
+            if v[19] != ".":
+                return None
+
             # 2021-11-24T17:00:22.082Z
-            if re.match(r"(\d{4}\-\d{2}\-\d{2}T\d{2}\:\d{2}\:\d{2}\.\d{3}Z)", v):
-                dct[k] = datetime.utcfromtimestamp(
-                    pd.to_datetime(v, format="%Y-%m-%dT%H:%M:%S.%fZ").timestamp()
-                )
+            if n == 24 and v[23] == "Z":
+                return datetime.fromisoformat(v[:23])
 
             # 2021-11-24T17:00:22.082
-            elif re.match(r"(\d{4}\-\d{2}\-\d{2}T\d{2}\:\d{2}\:\d{2}\.\d{1,3}$)", v):
-                dct[k] = datetime.utcfromtimestamp(
-                    pd.to_datetime(v, format="%Y-%m-%dT%H:%M:%S.%f").timestamp()
-                )
+            if n <= 23 and v[-1].isdigit():
+                return datetime.fromisoformat(v)
+
             # 2021-11-24T16:04:25.2370547-03:00
-            elif re.match(
-                r"(\d{4}\-\d{2}\-\d{2}T\d{2}\:\d{2}\:\d{2}\.\d{7}[+-]\d{2}\:\d{2})", v
-            ):
-                dct[k] = datetime.utcfromtimestamp(
-                    pd.to_datetime(v, format="%Y-%m-%dT%H:%M:%S.%f%z").timestamp()
-                )
+            match = _ISO_7_DIGITS_TZ.match(v)
+            if match is not None:
+                seconds = datetime.fromisoformat(
+                    match.group(1) + match.group(3)
+                ).timestamp()
+                # mismo redondeo a microsegundos que pandas.Timestamp.timestamp
+                ns = int(seconds) * 1_000_000_000 + int(match.group(2)) * 100
+                return datetime.fromtimestamp(
+                    round(ns / 1_000_000_000, 6), timezone.utc
+                ).replace(tzinfo=None)
 
-            # Fri, 26 Nov 2021 18:15:14 GMT
-            elif re.match(
-                r"([a-zA-Z]{3}, \d{2} [a-zA-Z]{3} \d{4} \d{2}\:\d{2}\:\d{2} [A-Z]{3})",
-                v,
-            ):
-                dct[k] = datetime.utcfromtimestamp(
-                    pd.to_datetime(v, format="%a, %d %b %Y %H:%M:%S %Z").timestamp()
+        elif v[3] == ",":
+            match = _RFC_1123.match(v)
+            if match is not None:
+                day, month, year, hour, minute, second, _ = match.groups()
+                return datetime(
+                    int(year),
+                    _MONTHS[month.lower()],
+                    int(day),
+                    int(hour),
+                    int(minute),
+                    int(second),
                 )
+    except (ValueError, KeyError):
+        return None
 
-            # 0001-01-01T00:00:00
-            elif re.match(r"(\d{4}\-\d{2}\-\d{2}T\d{2}\:\d{2}\:\d{2})", v):
-                dct[k] = datetime.strptime(v, "%Y-%m-%dT%H:%M:%S")
+    return None
+
+
+def iol_decoder_hook(dct):
+    for k, v in dct.items():
+        # descarta rapido los strings que no pueden ser fechas
+        if isinstance(v, str) and len(v) >= 19 and (v[0].isdigit() or v[3] == ","):
+            parsed = parse_iol_date(v)
+            if parsed is not None:
+                dct[k] = parsed
 
     return dct
 
 
+@lru_cache(maxsize=None)
+def _make_decoder_hook(fields: frozenset):
+    def hook(dct):
+        for k in fields.intersection(dct):
+            v = dct[k]
+            if isinstance(v, str):
+                parsed = parse_iol_date(v)
+                if parsed is not None:
+                    dct[k] = parsed
+
+        return dct
+
+    return hook
+
+
+def make_iol_decoder_hook(date_fields: Iterable[str] | None = None):
+    # sin lista de campos se revisan todos los valores del objeto,
+    # con una lista vacia no se convierte ninguna fecha
+    if date_fields is None:
+        return iol_decoder_hook
+    if not date_fields:
+        return None
+    return _make_decoder_hook(frozenset(date_fields))
+
+
 def get_logger(name, level):
     formatter = logging.Formatter("%(levelname)s:%(name)s: %(message)s")
     handler = logging.StreamHandler(sys.stdout)
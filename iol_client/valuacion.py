@@ -0,0 +1,219 @@
+"""
+Valuacion de la cartera y resultado no realizado en columnas de numpy.
+
+Requiere numpy; se importa solo al usarla.
+"""
+
+import asyncio
+from typing import TYPE_CHECKING, Iterable
+
+import numpy as np
+
+from .constants import Mercado, Pais, Tarifas
+
+if TYPE_CHECKING:
+    from .client import IOLClient
+
+_MERCADOS = {m.value.lower(): m for m in Mercado}
+
+
+def _numero(valor) -> float | None:
+    if isinstance(valor, bool) or not isinstance(valor, (int, float)):
+        return None
+    return float(valor)
+
+
+def _precio(cotizacion) -> float | None:
+    # acepta el precio o una cotizacion (titulo de un panel o get_titulo_cotizacion)
+    if isinstance(cotizacion, dict):
+        cotizacion = cotizacion.get("ultimoPrecio")
+    return _numero(cotizacion)
+
+
+def _factor(activo: dict) -> float:
+    # los bonos cotizan cada 100 nominales; se deduce de la valorizacion informada
+    cantidad = activo.get("cantidad") or 0
+    precio = activo.get("ultimoPrecio") or 0
+    valorizado = activo.get("valorizado")
+    if not cantidad or not precio or not valorizado:
+        return 1.0
+    return 0.01 if abs(valorizado / (cantidad * precio) - 0.01) < 0.001 else 1.0
+
+
+class ValuacionCartera:
+    """
+    Valor de mercado, resultado no realizado y valor de salida neto de la
+    comision (Tarifas) de cada posicion del portafolio, como arrays de numpy.
+    Cada cotizacion nueva recalcula solo las posiciones que cambiaron; el total
+    se vuelve a sumar desde el array para no acumular error de redondeo.
+
+        valuacion = await client.valuar_portafolio(Pais.ARG, Tarifas.PLATINUM)
+        async with client.suscribir_cotizaciones(valuacion.simbolos) as feed:
+            async for cambios in feed:
+                valuacion.aplicar(cambios)
+                print(valuacion.resultado_total)
+    """
+
+    def __init__(
+        self, activos: list[dict], tarifa: Tarifas | float = Tarifas.GOLD
+    ) -> None:
+        self.comision = tarifa.value if isinstance(tarifa, Tarifas) else float(tarifa)
+        self.activos = [a for a in activos if (a.get("titulo") or {}).get("simbolo")]
+        self.simbolos = [a["titulo"]["simbolo"] for a in self.activos]
+        self.index = {simbolo: i for i, simbolo in enumerate(self.simbolos)}
+        n = len(self.activos)
+
+        def columna(clave: str) -> np.ndarray:
+            return np.fromiter(
+                (_numero(a.get(clave)) or 0.0 for a in self.activos),
+                dtype=np.float64,
+                count=n,
+            )
+
+        self.cantidad = columna("cantidad")
+        self.ppc = columna("ppc")
+        self.precio = columna("ultimoPrecio")
+        self.factor = np.fromiter(
+            (_factor(a) for a in self.activos), dtype=np.float64, count=n
+        )
+        self.costo = self.cantidad * self.ppc * self.factor
+        self.recalcular()
+
+    @classmethod
+    def desde_portafolio(
+        cls, portafolio: dict, tarifa: Tarifas | float = Tarifas.GOLD
+    ) -> "ValuacionCartera":
+        if not isinstance(portafolio, dict) or "activos" not in portafolio:
+            raise ConnectionError(f"Respuesta inesperada de portafolio {portafolio}")
+        return cls(portafolio["activos"], tarifa)
+
+    def __len__(self) -> int:
+        return len(self.simbolos)
+
+    # Recalcula todas las posiciones y los totales
+    def recalcular(self):
+        self.valor = self.cantidad * self.precio * self.factor
+        self._valor_total = float(self.valor.sum())
+        self._costo_total = float(self.costo.sum())
+
+    def actualizar(self, simbolo: str, cotizacion) -> bool:
+        return bool(self.aplicar({simbolo: cotizacion}))
+
+    # Aplica un dict simbolo -> cotizacion (o precio) y devuelve los simbolos que cambiaron
+    def aplicar(self, cotizaciones: dict) -> list[str]:
+        filas, precios = [], []
+        for simbolo, cotizacion in cotizaciones.items():
+            i = self.index.get(simbolo)
+            precio = _precio(cotizacion)
+            if i is not None and precio is not None:
+                filas.append(i)
+                precios.append(precio)
+        if not filas:
+            return []
+
+        filas = np.array(filas, dtype=np.intp)
+        precios = np.array(precios, dtype=np.float64)
+        cambiados = precios != self.precio[filas]
+        filas, precios = filas[cambiados], precios[cambiados]
+        if not filas.size:
+            return []
+        self.precio[filas] = precios
+        self.valor[filas] = self.cantidad[filas] * precios * self.factor[filas]
+        self._valor_total = float(self.valor.sum())
+        return [self.simbolos[i] for i in filas.tolist()]
+
+    @property
+    def resultado(self) -> np.ndarray:
+        return self.valor - self.costo
+
+    @property
+    def salida(self) -> np.ndarray:
+        return self.valor * (1.0 - self.comision)
+
+    @property
+    def valor_total(self) -> float:
+        return self._valor_total
+
+    @property
+    def costo_total(self) -> float:
+        return self._costo_total
+
+    @property
+    def resultado_total(self) -> float:
+        return self._valor_total - self._costo_total
+
+    @property
+    def salida_total(self) -> float:
+        return self._valor_total * (1.0 - self.comision)
+
+    def columnas(self) -> dict[str, np.ndarray]:
+        return {
+            "simbolo": np.array(self.simbolos, dtype=object),
+            "cantidad": self.cantidad,
+            "ppc": self.ppc,
+            "precio": self.precio,
+            "valor": self.valor,
+            "costo": self.costo,
+            "resultado": self.resultado,
+            "salida": self.salida,
+        }
+
+    def mercado(self, simbolo: str) -> Mercado:
+        titulo = self.activos[self.index[simbolo]]["titulo"]
+        return _MERCADOS.get(str(titulo.get("mercado", "")).lower(), Mercado.BCBA)
+
+    async def refrescar(
+        self,
+        client: "IOLClient",
+        paneles: Iterable[tuple] = (),
+        timeout: float | None = None,
+    ) -> list[str]:
+        """
+        Consulta en paralelo las cotizaciones de todas las posiciones: primero
+        los paneles (pais, instrumento, panel) indicados, con una consulta cada
+        uno, y despues individualmente los simbolos que no estaban en ninguno.
+        Sin paneles se hace una consulta por simbolo. timeout es el plazo de
+        cada consulta.
+        """
+        paneles = list(paneles)
+        respuestas = await asyncio.gather(
+            *[
+                client.get_panel_cotizaciones(*panel, timeout=timeout)
+                for panel in paneles
+            ]
+        )
+        cotizaciones = {}
+        for respuesta in respuestas:
+            if not isinstance(respuesta, dict):
+                continue
+            for titulo in respuesta.get("titulos", []):
+                simbolo = titulo.get("simbolo")
+                if simbolo in self.index:
+                    cotizaciones[simbolo] = titulo
+
+        faltantes = [s for s in self.simbolos if s not in cotizaciones]
+        respuestas = await asyncio.gather(
+            *[
+                client.get_titulo_cotizacion(s, self.mercado(s), timeout=timeout)
+                for s in faltantes
+            ]
+        )
+        cotizaciones.update(zip(faltantes, respuestas))
+        return self.aplicar(cotizaciones)
+
+
+async def valuar_portafolio(
+    client: "IOLClient",
+    pais: Pais,
+    tarifa: Tarifas | float = Tarifas.GOLD,
+    paneles: Iterable[tuple] = (),
+    refrescar: bool = True,
+    timeout: float | None = None,
+) -> ValuacionCartera:
+    valuacion = ValuacionCartera.desde_portafolio(
+        await client.get_portafolio(pais, timeout=timeout), tarifa
+    )
+    # sin refrescar se usa el ultimo precio que informa el portafolio
+    if refrescar:
+        await valuacion.refrescar(client, paneles, timeout=timeout)
+    return valuacion
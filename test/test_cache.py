@@ -0,0 +1,54 @@
+from iol_client import IOLClient
+from iol_client.cache import ResponseCache
+
+
+class Reloj:
+    def __init__(self) -> None:
+        self.ahora = 0.0
+
+    def __call__(self) -> float:
+        return self.ahora
+
+
+def test_ttl_por_endpoint():
+    cache = ResponseCache()
+    assert cache.ttl("argentina/Titulos/Cotizacion/Instrumentos") is not None
+    assert cache.ttl("argentina/Titulos/Cotizacion/Paneles/Acciones") is not None
+    assert cache.ttl("Titulos/FCI/Administradoras") is not None
+    assert cache.ttl("bCBA/Titulos/GGAL") is not None
+    assert cache.ttl("bCBA/Titulos/GGAL/Cotizacion") is None
+    assert cache.ttl("Titulos/FCI/ALPHA") is None
+
+
+def test_vencimiento_lru_e_invalidacion():
+    reloj = Reloj()
+    cache = ResponseCache(maxsize=2, ttls={r"^bCBA/Titulos/[^/]+$": 10}, clock=reloj)
+    cache.set("bCBA/Titulos/GGAL", {"simbolo": "GGAL"})
+    hit, value = cache.get("bCBA/Titulos/GGAL")
+    assert hit and value == {"simbolo": "GGAL"}
+
+    # las copias devueltas no alteran la entrada guardada
+    value["simbolo"] = "otro"
+    assert cache.get("bCBA/Titulos/GGAL")[1] == {"simbolo": "GGAL"}
+
+    # YPFD queda como la menos usada y se desaloja al agregar BMA
+    cache.set("bCBA/Titulos/YPFD", {})
+    assert cache.get("bCBA/Titulos/GGAL")[0]
+    cache.set("bCBA/Titulos/BMA", {})
+    assert len(cache) == 2
+    assert cache.get("bCBA/Titulos/YPFD")[0] is False
+
+    cache.invalidate("BMA")
+    assert cache.get("bCBA/Titulos/BMA")[0] is False
+
+    cache.set("bCBA/Titulos/PAMP", {})
+    reloj.ahora = 11
+    assert cache.get("bCBA/Titulos/PAMP")[0] is False
+    assert cache.stats()["hits"] == 3
+    assert cache.stats()["misses"] == 3
+
+
+def test_el_cliente_conserva_la_cache_vacia_que_recibe():
+    cache = ResponseCache(ttls={})
+    assert len(cache) == 0
+    assert IOLClient("user", "pass", response_cache=cache).response_cache is cache
@@ -0,0 +1,105 @@
+import asyncio
+
+from iol_client import IOLClient
+from iol_client.cache import ResponseCache
+from iol_client.constants import Mercado, Pais
+import pytest
+
+
+def cliente_falso():
+    client = IOLClient("user", "pass", response_cache=ResponseCache(ttls={}))
+    client.envios = []
+
+    async def send(method, path, url, data_body=None, json_body=None, date_fields=None):
+        client.envios.append((method.value, path))
+        await asyncio.sleep(0.01)
+        return 200, {"path": path, "puntas": {"precioCompra": 1}}
+
+    client._send = send
+    return client
+
+
+@pytest.mark.asyncio
+async def test_consultas_get_identicas_comparten_respuesta():
+    client = cliente_falso()
+    respuestas = await asyncio.gather(
+        *[client.get_titulo_cotizacion("GGAL", Mercado.BCBA) for _ in range(10)],
+        client.get_portafolio(Pais.ARG),
+    )
+    assert client.envios == [
+        ("GET", "bCBA/Titulos/GGAL/Cotizacion"),
+        ("GET", "portafolio/argentina"),
+    ]
+    # cada llamador recibe su propia copia
+    respuestas[0]["puntas"]["precioCompra"] = 2
+    assert respuestas[1]["puntas"]["precioCompra"] == 1
+
+    await client.get_titulo_cotizacion("GGAL", Mercado.BCBA)
+    assert len(client.envios) == 3
+
+
+@pytest.mark.asyncio
+async def test_metodos_que_modifican_no_se_agrupan():
+    client = cliente_falso()
+    await asyncio.gather(*[client.delete_operaciones(1) for _ in range(3)])
+    assert client.envios == [("DELETE", "operaciones/1")] * 3
+
+
+def cliente_con_demoras(*demoras: float):
+    client = IOLClient("user", "pass", response_cache=ResponseCache(ttls={}))
+    client.envios = 0
+    client.canceladas = 0
+    demoras = list(demoras)
+
+    async def send(method, path, url, data_body=None, json_body=None, date_fields=None):
+        client.envios += 1
+        try:
+            await asyncio.sleep(demoras.pop(0))
+        except asyncio.CancelledError:
+            client.canceladas += 1
+            raise
+        return 200, {"envio": client.envios}
+
+    client._send = send
+    return client
+
+
+@pytest.mark.asyncio
+async def test_consulta_abandonada_no_bloquea_las_siguientes():
+    client = cliente_con_demoras(10.0, 0.01)
+    with pytest.raises(TimeoutError):
+        await client.get_titulo_cotizacion("GGAL", Mercado.BCBA, timeout=0.05)
+    await asyncio.sleep(0)
+
+    assert client._inflight == {}
+    assert client.canceladas == 1
+    respuesta = await client.get_titulo_cotizacion("GGAL", Mercado.BCBA, timeout=0.5)
+    assert respuesta == {"envio": 2}
+
+
+@pytest.mark.asyncio
+async def test_consulta_compartida_usa_el_plazo_mas_largo():
+    client = cliente_con_demoras(0.1)
+    corta, larga = await asyncio.gather(
+        client.get_titulo_cotizacion("GGAL", Mercado.BCBA, timeout=0.05),
+        client.get_titulo_cotizacion("GGAL", Mercado.BCBA, timeout=1.0),
+        return_exceptions=True,
+    )
+    assert isinstance(corta, TimeoutError)
+    assert larga == {"envio": 1}
+    assert client.envios == 1
+
+
+@pytest.mark.asyncio
+async def test_consulta_compartida_tiene_plazo_propio():
+    client = cliente_con_demoras(10.0)
+
+    async def fetch():
+        return await client._send(None, "", "")
+
+    # sin un plazo externo, el plazo de la propia consulta compartida la corta
+    deadline = asyncio.get_running_loop().time() + 0.05
+    with pytest.raises(TimeoutError):
+        await client._coalesce(("GGAL",), fetch, deadline)
+    assert client.canceladas == 1
+    assert client._inflight == {}
@@ -0,0 +1,94 @@
+import asyncio
+
+from iol_client import IOLClient
+from iol_client.cache import ResponseCache
+from iol_client.constants import Instrumento, Mercado, Pais, Panel, Plazo
+from iol_client.endpoints import endpoint_template
+from iol_client.hedging import LatencyTracker, hedged
+import pytest
+
+
+def test_endpoint_template():
+    assert (
+        endpoint_template("bCBA/Titulos/GGAL/Cotizacion")
+        == "{mercado}/Titulos/{simbolo}/Cotizacion"
+    )
+    assert (
+        endpoint_template(
+            "bCBA/Titulos/GGAL/Cotizacion/seriehistorica/2023-01-01/2023-02-01/ajustada"
+        )
+        == "{mercado}/Titulos/{simbolo}/Cotizacion/seriehistorica"
+    )
+    assert endpoint_template("operar/Comprar") == "operar/Comprar"
+    assert endpoint_template("Titulos/FCI/TipoFondos") == "Titulos/FCI/TipoFondos"
+    assert endpoint_template("Titulos/FCI/ALPHA") == "Titulos/FCI/{simbolo}"
+
+
+def test_percentil_de_latencias():
+    tracker = LatencyTracker(min_samples=5)
+    assert tracker.percentile("x", 0.95) is None
+    for i in range(1, 101):
+        tracker.record("x", i / 1000)
+    assert tracker.percentile("x", 0.95) == 0.095
+
+
+@pytest.mark.asyncio
+async def test_hedged_devuelve_la_primera_respuesta():
+    demoras = [0.5, 0.01]
+    canceladas = []
+
+    async def send():
+        demora = demoras.pop(0)
+        try:
+            await asyncio.sleep(demora)
+        except asyncio.CancelledError:
+            canceladas.append(demora)
+            raise
+        return demora
+
+    assert await hedged(send, delay=0.02) == 0.01
+    await asyncio.sleep(0)
+    assert canceladas == [0.5]
+
+
+def cliente_lento(demora: float):
+    client = IOLClient("user", "pass", response_cache=ResponseCache(ttls={}))
+    client.envios = 0
+
+    async def send(method, path, url, data_body=None, json_body=None, date_fields=None):
+        client.envios += 1
+        await asyncio.sleep(demora if client.envios == 1 else 0.01)
+        return 200, {"envio": client.envios}
+
+    client._send = send
+    return client
+
+
+@pytest.mark.asyncio
+async def test_plazo_limite_por_consulta():
+    client = cliente_lento(1.0)
+    with pytest.raises(TimeoutError):
+        await client.get_titulo_cotizacion("GGAL", Mercado.BCBA, timeout=0.05)
+
+
+@pytest.mark.asyncio
+async def test_plazo_limite_del_panel_en_columnas():
+    client = cliente_lento(1.0)
+    with pytest.raises(TimeoutError):
+        await client.get_panel_cotizaciones(
+            Pais.ARG,
+            Instrumento.ARG.ACCIONES,
+            Panel.ARG.ACCIONES.MERVAL,
+            as_columns=True,
+            timeout=0.05,
+        )
+
+
+@pytest.mark.asyncio
+async def test_cotizacion_con_consulta_de_respaldo():
+    client = cliente_lento(1.0)
+    client.hedge_default_delay = 0.02
+    respuesta = await client.get_titulo_cotizacion_plazo(
+        Mercado.BCBA, "GGAL", Plazo.T0, timeout=0.5, hedge=True
+    )
+    assert respuesta == {"envio": 2}
@@ -0,0 +1,121 @@
+import asyncio
+from datetime import date, datetime, timedelta
+
+from iol_client.constants import Mercado
+from iol_client.descarga import DescargaHistoricos, HistoricoSpec, ventanas
+import pytest
+
+
+class ClienteFalso:
+    def __init__(self, demora: float = 0.01) -> None:
+        self.demora = demora
+        self.en_curso = 0
+        self.max_en_curso = 0
+
+    async def get_titulo_historicos(
+        self, simbolo, mercado, ajustada, fecha_desde, fecha_hasta
+    ):
+        self.en_curso += 1
+        self.max_en_curso = max(self.max_en_curso, self.en_curso)
+        await asyncio.sleep(self.demora)
+        self.en_curso -= 1
+        if simbolo == "ERROR":
+            return {"message": "Simbolo inexistente"}
+
+        serie = []
+        dia = fecha_desde
+        while dia <= fecha_hasta:
+            serie.append({"fechaHora": datetime(dia.year, dia.month, dia.day, 17)})
+            dia += timedelta(days=1)
+        return serie
+
+
+def test_ventanas():
+    assert ventanas(date(2023, 1, 1), date(2023, 1, 10), 4) == [
+        (date(2023, 1, 1), date(2023, 1, 4)),
+        (date(2023, 1, 5), date(2023, 1, 8)),
+        (date(2023, 1, 9), date(2023, 1, 10)),
+    ]
+    with pytest.raises(AttributeError):
+        ventanas(date(2023, 1, 1), date(2023, 1, 5), 0)
+    with pytest.raises(AttributeError):
+        DescargaHistoricos(ClienteFalso(), [], window_days=0)
+
+
+@pytest.mark.asyncio
+async def test_descarga_concurrente_con_reporte():
+    client = ClienteFalso()
+    specs = [
+        HistoricoSpec(
+            simbolo,
+            Mercado.BCBA,
+            fecha_desde=date(2023, 1, 1),
+            fecha_hasta=date(2023, 3, 31),
+        )
+        for simbolo in ["GGAL", "YPFD", "ERROR", "PAMP"]
+    ]
+    descarga = DescargaHistoricos(client, specs, concurrency=3, window_days=30)
+
+    series = {spec.simbolo: serie async for spec, serie in descarga}
+
+    assert sorted(series) == ["GGAL", "PAMP", "YPFD"]
+    assert len(series["GGAL"]) == 90
+    assert series["GGAL"][0]["fechaHora"] == datetime(2023, 3, 31, 17)
+    assert client.max_en_curso == 3
+    assert [spec.simbolo for spec, _ in descarga.reporte.fallidos] == ["ERROR"]
+    assert descarga.reporte.pendientes == 0
+
+
+class ClienteConVentanaFallida(ClienteFalso):
+    def __init__(self) -> None:
+        super().__init__(demora=1)
+        self.terminadas = 0
+
+    async def get_titulo_historicos(
+        self, simbolo, mercado, ajustada, fecha_desde, fecha_hasta
+    ):
+        if fecha_desde == date(2023, 1, 1):
+            await asyncio.sleep(0.01)
+            raise ConnectionError("Error de red")
+        if fecha_desde == date(2023, 1, 31):
+            return [{"fechaHora": None}, {"fechaHora": datetime(2023, 2, 1, 17)}]
+        serie = await super().get_titulo_historicos(
+            simbolo, mercado, ajustada, fecha_desde, fecha_hasta
+        )
+        self.terminadas += 1
+        return serie
+
+
+@pytest.mark.asyncio
+async def test_una_ventana_fallida_cancela_las_demas():
+    client = ClienteConVentanaFallida()
+    spec = HistoricoSpec(
+        "GGAL",
+        Mercado.BCBA,
+        fecha_desde=date(2023, 1, 1),
+        fecha_hasta=date(2023, 6, 30),
+    )
+    descarga = DescargaHistoricos(client, [spec], window_days=30)
+
+    series = await asyncio.wait_for(_consumir(descarga), timeout=0.5)
+
+    assert series == []
+    assert client.terminadas == 0
+    assert isinstance(descarga.reporte.fallidos[0][1], ConnectionError)
+
+
+@pytest.mark.asyncio
+async def test_barras_sin_fecha_se_descartan():
+    client = ClienteConVentanaFallida()
+    spec = HistoricoSpec(
+        "GGAL",
+        Mercado.BCBA,
+        fecha_desde=date(2023, 1, 31),
+        fecha_hasta=date(2023, 2, 1),
+    )
+    series = await _consumir(DescargaHistoricos(client, [spec], window_days=30))
+    assert series == [[{"fechaHora": datetime(2023, 2, 1, 17)}]]
+
+
+async def _consumir(descarga: DescargaHistoricos) -> list:
+    return [serie async for _, serie in descarga]
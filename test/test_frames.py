@@ -0,0 +1,47 @@
+from datetime import datetime
+
+import numpy as np
+
+from iol_client.frames import historicos_columnas, panel_columnas, to_frame
+
+
+def test_historicos_columnas():
+    serie = [
+        {
+            "fechaHora": "2023-11-24T17:00:22.082Z",
+            "ultimoPrecio": 1200.5,
+            "volumenNominal": 1000,
+            "cantidadOperaciones": None,
+        },
+        {
+            "fechaHora": datetime(2023, 11, 23, 17, 0, 0),
+            "ultimoPrecio": 1190,
+            "volumenNominal": 900,
+            "cantidadOperaciones": 12,
+        },
+    ]
+    columnas = historicos_columnas(serie)
+    assert columnas["ultimoPrecio"].dtype == np.float64
+    assert columnas["volumenNominal"].tolist() == [1000, 900]
+    assert columnas["cantidadOperaciones"].tolist() == [0, 12]
+    assert columnas["fechaHora"][0] == np.datetime64("2023-11-24T17:00:22.082")
+    assert np.isnan(columnas["apertura"]).all()
+
+
+def test_panel_frame():
+    panel = {
+        "titulos": [
+            {
+                "simbolo": "GGAL",
+                "fecha": "2023-11-24T16:04:25.2370547-03:00",
+                "ultimoPrecio": 1200.5,
+                "volumen": 5000,
+                "puntas": {"precioCompra": 1200, "precioVenta": 1201},
+            },
+            {"simbolo": "YPFD", "fecha": None, "ultimoPrecio": 15000, "puntas": None},
+        ]
+    }
+    frame = to_frame(panel_columnas(panel), index="simbolo")
+    assert frame.loc["GGAL", "precioVenta"] == 1201
+    assert np.isnan(frame.loc["YPFD", "precioCompra"])
+    assert frame.loc["GGAL", "fecha"] == datetime(2023, 11, 24, 19, 4, 25, 237055)
@@ -0,0 +1,94 @@
+from datetime import date, datetime, timedelta
+
+from iol_client.constants import Ajustada, Mercado
+from iol_client.historicos_cache import HistoricosCache
+import pytest
+
+
+def serie_falsa(desde: date, hasta: date):
+    serie = []
+    dia = desde
+    while dia <= hasta:
+        serie.append(
+            {
+                "ultimoPrecio": float(dia.day),
+                "fechaHora": datetime(dia.year, dia.month, dia.day, 17, 0, 0, 82000),
+            }
+        )
+        dia += timedelta(days=1)
+    return list(reversed(serie))
+
+
+@pytest.mark.asyncio
+async def test_solo_descarga_los_tramos_faltantes():
+    cache = HistoricosCache()
+    pedidos = []
+
+    async def fetch(desde, hasta):
+        pedidos.append((desde, hasta))
+        return serie_falsa(desde, hasta)
+
+    args = (Mercado.BCBA, "GGAL", Ajustada.SIN_AJUSTAR)
+    primera = await cache.get_titulo_historicos(
+        fetch, *args, date(2023, 1, 10), date(2023, 1, 20)
+    )
+    segunda = await cache.get_titulo_historicos(
+        fetch, *args, date(2023, 1, 1), date(2023, 1, 31)
+    )
+    tercera = await cache.get_titulo_historicos(
+        fetch, *args, date(2023, 1, 5), date(2023, 1, 25)
+    )
+
+    assert pedidos == [
+        (date(2023, 1, 10), date(2023, 1, 20)),
+        (date(2023, 1, 1), date(2023, 1, 9)),
+        (date(2023, 1, 21), date(2023, 1, 31)),
+    ]
+    assert len(primera) == 11 and len(segunda) == 31 and len(tercera) == 21
+    assert segunda[0]["fechaHora"] == datetime(2023, 1, 31, 17, 0, 0, 82000)
+    assert cache.cobertura(*args) == [(date(2023, 1, 1), date(2023, 1, 31))]
+
+
+@pytest.mark.asyncio
+async def test_el_dia_actual_se_vuelve_a_consultar():
+    cache = HistoricosCache()
+    pedidos = []
+
+    async def fetch(desde, hasta):
+        pedidos.append((desde, hasta))
+        return serie_falsa(desde, hasta)
+
+    args = (Mercado.BCBA, "AL30", Ajustada.AJUSTADA)
+    hoy = date.today()
+    await cache.get_titulo_historicos(fetch, *args, hoy - timedelta(days=5), hoy)
+    await cache.get_titulo_historicos(fetch, *args, hoy - timedelta(days=5), hoy)
+    assert pedidos == [(hoy - timedelta(days=5), hoy), (hoy, hoy)]
+
+
+@pytest.mark.asyncio
+async def test_series_ajustadas_vencen_y_se_pueden_invalidar():
+    pedidos = []
+
+    async def fetch(desde, hasta):
+        pedidos.append((desde, hasta))
+        return serie_falsa(desde, hasta)
+
+    desde, hasta = date(2023, 1, 1), date(2023, 1, 10)
+    ajustada = (Mercado.BCBA, "GGAL", Ajustada.AJUSTADA)
+    sin_ajustar = (Mercado.BCBA, "GGAL", Ajustada.SIN_AJUSTAR)
+
+    # con ttl nulo la serie ajustada se descarga completa en cada consulta
+    cache = HistoricosCache(ttl_ajustada=timedelta(0))
+    for args in (ajustada, ajustada, sin_ajustar, sin_ajustar):
+        await cache.get_titulo_historicos(fetch, *args, desde, hasta)
+    assert pedidos == [(desde, hasta)] * 3
+
+    pedidos.clear()
+    cache = HistoricosCache()
+    await cache.get_titulo_historicos(fetch, *ajustada, desde, hasta)
+    await cache.get_titulo_historicos(fetch, *ajustada, desde, hasta)
+    cache.invalidar(Mercado.BCBA, "GGAL")
+    assert cache.cobertura(*ajustada) == []
+    serie = await cache.get_titulo_historicos(fetch, *ajustada, desde, hasta)
+    assert pedidos == [(desde, hasta)] * 2
+    assert len(serie) == 10
@@ -0,0 +1,34 @@
+import subprocess
+import sys
+
+# presupuesto de importacion en microsegundos (dominado por aiohttp)
+IMPORT_BUDGET_US = 1_000_000
+FORBIDDEN_MODULES = ("pandas", "numpy")
+
+
+def importtime(modulo: str) -> dict[str, int]:
+    res = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {modulo}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    tiempos = {}
+    for linea in res.stderr.splitlines():
+        if not linea.startswith("import time:") or "|" not in linea:
+            continue
+        _, acumulado, nombre = linea.split("|")
+        if acumulado.strip().isdigit():
+            tiempos[nombre.strip()] = int(acumulado)
+    return tiempos
+
+
+def test_import_iol_client_no_carga_pandas():
+    tiempos = importtime("iol_client")
+    cargados = {nombre.split(".")[0] for nombre in tiempos}
+    assert not cargados.intersection(FORBIDDEN_MODULES)
+
+
+def test_import_iol_client_dentro_del_presupuesto():
+    tiempos = importtime("iol_client")
+    assert tiempos["iol_client"] < IMPORT_BUDGET_US
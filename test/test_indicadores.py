@@ -0,0 +1,165 @@
+import math
+from datetime import datetime, timedelta
+
+from iol_client.indicadores import (
+    EMA,
+    RSI,
+    SMA,
+    VWAP,
+    Bollinger,
+    Indicador,
+    MotorIndicadores,
+    serie_cronologica,
+)
+import numpy as np
+import pytest
+
+rng = np.random.default_rng(7)
+PRECIOS = 1000.0 + np.cumsum(rng.normal(0, 10, 300))
+VOLUMENES = rng.integers(100, 1000, 300).astype(np.float64)
+
+
+def ema_referencia(precios, n):
+    alpha = 2 / (n + 1)
+    ema = sum(precios[:n]) / n
+    for p in precios[n:]:
+        ema = alpha * p + (1 - alpha) * ema
+    return ema
+
+
+def rsi_referencia(precios, n):
+    variaciones = [b - a for a, b in zip(precios, precios[1:])]
+    subas = sum(max(v, 0) for v in variaciones[:n]) / n
+    bajas = sum(max(-v, 0) for v in variaciones[:n]) / n
+    for v in variaciones[n:]:
+        subas = (subas * (n - 1) + max(v, 0)) / n
+        bajas = (bajas * (n - 1) + max(-v, 0)) / n
+    return 100 - 100 / (1 + subas / bajas)
+
+
+def referencia(precios, volumenes):
+    ultimos = precios[-20:]
+    media, desvio = ultimos.mean(), ultimos.std()
+    return {
+        "sma20": ultimos.mean(),
+        "ema20": ema_referencia(list(precios), 20),
+        "rsi14": rsi_referencia(list(precios), 14),
+        "vwap20": (ultimos * volumenes[-20:]).sum() / volumenes[-20:].sum(),
+        "bollinger20": (media - 2 * desvio, media, media + 2 * desvio),
+    }
+
+
+def comparar(valores, esperados):
+    assert valores.keys() == esperados.keys()
+    for nombre, esperado in esperados.items():
+        np.testing.assert_allclose(valores[nombre], esperado, rtol=1e-9)
+
+
+def inicializado(indicador, precios, volumenes):
+    indicador.inicializar(precios, volumenes)
+    return indicador
+
+
+def test_inicializar_igual_que_agregar_barra_por_barra():
+    for crear in (
+        lambda: SMA(20),
+        lambda: EMA(20),
+        lambda: RSI(14),
+        lambda: VWAP(20),
+        lambda: Bollinger(20),
+    ):
+        for corte in (0, 5, 19, 20, 21, 150):
+            incremental = inicializado(crear(), PRECIOS[:corte], VOLUMENES[:corte])
+            for p, v in zip(PRECIOS[corte:], VOLUMENES[corte:]):
+                incremental.agregar(p, v)
+            completo = inicializado(crear(), PRECIOS, VOLUMENES)
+            np.testing.assert_allclose(incremental.valor, completo.valor, rtol=1e-9)
+
+
+def test_valores_contra_referencia():
+    motor = MotorIndicadores()
+    inicio = datetime(2023, 1, 1, 17)
+    historicos = [
+        {
+            "fechaHora": inicio + timedelta(days=i),
+            "ultimoPrecio": p,
+            "volumenNominal": int(v),
+        }
+        for i, (p, v) in enumerate(zip(PRECIOS[:250], VOLUMENES[:250]))
+    ]
+    # get_titulo_historicos devuelve de la mas reciente a la mas antigua
+    comparar(
+        motor.cargar("GGAL", historicos[::-1]),
+        referencia(PRECIOS[:250], VOLUMENES[:250]),
+    )
+
+    for i in range(250, 300):
+        valores = motor.barra("GGAL", PRECIOS[i], VOLUMENES[i])
+    comparar(valores, referencia(PRECIOS, VOLUMENES))
+
+
+def test_tick_no_modifica_el_estado():
+    motor = MotorIndicadores()
+    motor.cargar(
+        "GGAL",
+        {
+            "fechaHora": np.arange(299),
+            "ultimoPrecio": PRECIOS[:-1],
+            "volumenNominal": VOLUMENES[:-1],
+        },
+    )
+    antes = motor.valores("GGAL")
+
+    previsto = motor.aplicar(
+        {
+            "GGAL": {"ultimoPrecio": PRECIOS[-1], "volumenNominal": VOLUMENES[-1]},
+            "YPFD": {"ultimoPrecio": 1.0},
+        }
+    )
+
+    assert list(previsto) == ["GGAL"]
+    comparar(motor.valores("GGAL"), antes)
+    comparar(previsto["GGAL"], motor.barra("GGAL", PRECIOS[-1], VOLUMENES[-1]))
+
+
+def test_sin_barras_suficientes_da_nan():
+    sma = inicializado(SMA(20), PRECIOS[:19], VOLUMENES[:19])
+    assert math.isnan(sma.valor)
+    assert not math.isnan(sma.previsualizar(1000.0))
+    assert math.isnan(inicializado(RSI(14), PRECIOS[:14], VOLUMENES[:14]).valor)
+    assert inicializado(RSI(14), np.full(20, 10.0), VOLUMENES[:20]).valor == 50.0
+
+
+def test_serie_cronologica_ordena_por_fecha():
+    precios, volumenes = serie_cronologica(
+        [
+            {
+                "fechaHora": datetime(2023, 1, 3),
+                "ultimoPrecio": 3.0,
+                "volumenNominal": 30,
+            },
+            {
+                "fechaHora": datetime(2023, 1, 2),
+                "ultimoPrecio": 2.0,
+                "volumenNominal": 20,
+            },
+        ]
+    )
+    assert precios.tolist() == [2.0, 3.0] and volumenes.tolist() == [20.0, 30.0]
+
+
+def test_el_redondeo_no_se_acumula():
+    sma = SMA(5)
+    precios = np.tile([1e9, 1.0, 1e-9, 3.0, 7.0], 2000)
+    for p in precios:
+        sma.agregar(p)
+    assert sma.valor == pytest.approx(precios[-5:].mean(), rel=1e-12)
+
+
+def test_indicador_exige_implementar_la_interfaz():
+    class Incompleto(Indicador):
+        def agregar(self, precio, volumen=0.0):
+            return precio
+
+    with pytest.raises(TypeError):
+        Incompleto()
@@ -1,4 +1,6 @@
-from iol_client.utils import iol_decoder_hook
+from datetime import datetime
+
+from iol_client.utils import iol_decoder_hook, make_iol_decoder_hook
 
 
 def test_iol_decoder_hook():
@@ -6,3 +8,28 @@ def test_iol_decoder_hook():
     date_json = {"fecha": date_str}
     date_res = iol_decoder_hook(date_json)["fecha"]
     assert date_res.year == 2023
+
+
+def test_iol_decoder_hook_formatos():
+    fechas = {
+        "a": "2021-11-24T17:00:22.082Z",
+        "b": "2021-11-24T17:00:22.08",
+        "c": "2021-11-24T16:04:25.2370547-03:00",
+        "d": "Fri, 26 Nov 2021 18:15:14 GMT",
+        "e": "0001-01-01T00:00:00",
+        "f": "GGAL",
+    }
+    res = iol_decoder_hook(fechas)
+    assert res["a"] == datetime(2021, 11, 24, 17, 0, 22, 82000)
+    assert res["b"] == datetime(2021, 11, 24, 17, 0, 22, 80000)
+    assert res["c"] == datetime(2021, 11, 24, 19, 4, 25, 237055)
+    assert res["d"] == datetime(2021, 11, 26, 18, 15, 14)
+    assert res["e"] == datetime(1, 1, 1)
+    assert res["f"] == "GGAL"
+
+
+def test_iol_decoder_hook_por_campos():
+    hook = make_iol_decoder_hook(["fechaHora"])
+    res = hook({"fechaHora": "2021-11-24T17:00:22.082Z", "x": "2021-11-24T17:00:22"})
+    assert res["fechaHora"] == datetime(2021, 11, 24, 17, 0, 22, 82000)
+    assert res["x"] == "2021-11-24T17:00:22"
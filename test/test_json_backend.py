@@ -0,0 +1,67 @@
+from datetime import datetime
+import json
+
+from benchmarks.payloads import (
+    cotizacion_payload,
+    historico_payload,
+    opciones_payload,
+    panel_payload,
+)
+from iol_client.json_backend import STDLIB, get_json_backend
+from iol_client.utils import HISTORICOS_DATE_FIELDS, TOKEN_DATE_FIELDS
+import pytest
+
+orjson = pytest.importorskip("orjson")
+
+PAYLOADS = [
+    (historico_payload(200), None),
+    (historico_payload(200), HISTORICOS_DATE_FIELDS),
+    (historico_payload(200), ()),
+    (panel_payload(50), None),
+    (opciones_payload(30), None),
+    (cotizacion_payload(), ("fechaHora",)),
+    (
+        json.dumps(
+            {
+                ".expires": "Fri, 26 Nov 2021 18:15:14 GMT",
+                ".issued": "Fri, 26 Nov 2021 18:00:14 GMT",
+                "access_token": "abc",
+            }
+        ),
+        TOKEN_DATE_FIELDS,
+    ),
+]
+
+
+@pytest.mark.parametrize("payload,date_fields", PAYLOADS)
+def test_mismo_resultado_con_cualquier_backend(payload, date_fields):
+    body = payload.encode()
+    esperado = STDLIB.decode(body, date_fields)
+    assert get_json_backend("orjson").decode(body, date_fields) == esperado
+
+
+def test_fechas_anidadas():
+    body = b'[{"a": {"fecha": "2023-11-24T17:00:22.082Z"}, "b": [{"fecha": "2023-11-24T17:00:22"}]}]'
+    (valor,) = get_json_backend("orjson").decode(body)
+    assert valor["a"]["fecha"] == datetime(2023, 11, 24, 17, 0, 22, 82000)
+    assert valor["b"][0]["fecha"] == datetime(2023, 11, 24, 17, 0, 22)
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        b'{"id": 123456789012345678901234567890}',
+        b'{"id": -18446744073709551616}',
+        b'{"precio": NaN}',
+        b'{"precio": 1e400}',
+        b'\xef\xbb\xbf{"a": 1}',
+    ],
+)
+def test_documentos_que_orjson_no_representa_igual(body):
+    # repr para comparar tambien NaN
+    assert repr(get_json_backend("orjson").decode(body)) == repr(STDLIB.decode(body))
+
+
+def test_auto_elige_backend_instalado():
+    assert get_json_backend("auto").name == "orjson"
+    assert get_json_backend("json") is STDLIB
@@ -0,0 +1,90 @@
+import asyncio
+import itertools
+
+from iol_client.constants import Mercado
+from iol_client.lote import EstadoOrden, LoteDeOrdenes
+from iol_client.ordenes import OrdenDeCompra, OrdenDeVenta
+import pytest
+
+
+class ClienteFalso:
+    def __init__(self, rechazar: set[str] = frozenset()) -> None:
+        self.rechazar = rechazar
+        self.enviadas = []
+        self.canceladas = []
+        self.en_curso = 0
+        self.max_en_curso = 0
+        self._numeros = itertools.count(1000)
+
+    async def _post_operar(self, path, payload, timeout=None):
+        self.en_curso += 1
+        self.max_en_curso = max(self.max_en_curso, self.en_curso)
+        await asyncio.sleep(0.01)
+        self.en_curso -= 1
+        self.enviadas.append((path, payload["simbolo"]))
+        if payload["simbolo"] in self.rechazar:
+            return {"ok": False, "messages": [{"title": "Saldo insuficiente"}]}
+        return {"ok": True, "messages": [], "numeroOperacion": next(self._numeros)}
+
+    async def delete_operaciones(self, id_operacion, timeout=None):
+        self.canceladas.append(id_operacion)
+        return {"ok": True, "messages": []}
+
+
+def ordenes(simbolos: list[str]):
+    return [
+        OrdenDeCompra(Mercado.BCBA, simbolo, cantidad=10, precio=100)
+        if i % 2 == 0
+        else OrdenDeVenta(Mercado.BCBA, simbolo, cantidad=10, precio=100)
+        for i, simbolo in enumerate(simbolos)
+    ]
+
+
+def test_orden_de_venta_requiere_cantidad():
+    assert OrdenDeVenta(Mercado.BCBA, "GGAL", cantidad=10, precio=100).cantidad == 10
+    with pytest.raises(AttributeError):
+        OrdenDeVenta(Mercado.BCBA, "GGAL", cantidad=None, precio=100)
+
+
+@pytest.mark.asyncio
+async def test_lote_con_concurrencia_limitada():
+    client = ClienteFalso(rechazar={"S3"})
+    simbolos = [f"S{i}" for i in range(12)]
+    lote = await LoteDeOrdenes(client, ordenes(simbolos), concurrency=3).enviar()
+
+    assert client.max_en_curso == 3
+    assert [r.orden.simbolo for r in lote.resultados] == simbolos
+    assert [r.orden.simbolo for r in lote.por_estado(EstadoOrden.RECHAZADA)] == ["S3"]
+    assert len(lote.por_estado(EstadoOrden.ACEPTADA)) == 11
+    assert ("operar/Vender", "S1") in client.enviadas
+    assert not lote.ok and not lote.cancelado
+
+
+@pytest.mark.asyncio
+async def test_all_or_cancel_cancela_las_aceptadas():
+    client = ClienteFalso(rechazar={"S1"})
+    lote = await LoteDeOrdenes(
+        client, ordenes(["S0", "S1", "S2", "S3"]), concurrency=2, all_or_cancel=True
+    ).enviar()
+
+    estados = [r.estado for r in lote.resultados]
+    assert estados == [
+        EstadoOrden.CANCELADA,
+        EstadoOrden.RECHAZADA,
+        EstadoOrden.NO_ENVIADA,
+        EstadoOrden.NO_ENVIADA,
+    ]
+    assert lote.cancelado
+    assert client.canceladas == [lote.resultados[0].numero_operacion]
+
+
+@pytest.mark.asyncio
+async def test_all_or_cancel_no_envia_si_hay_ordenes_invalidas():
+    client = ClienteFalso()
+    lista = ordenes(["S0", "S1"])
+    lista[1].precio = 0
+    lote = await LoteDeOrdenes(client, lista, all_or_cancel=True).enviar()
+
+    assert client.enviadas == []
+    assert lote.resultados[1].estado == EstadoOrden.INVALIDA
+    assert isinstance(lote.resultados[1].error, AttributeError)
@@ -0,0 +1,123 @@
+import asyncio
+import json
+
+from iol_client import IOLClient
+from iol_client.cache import ResponseCache
+from iol_client.constants import Mercado
+from iol_client.metrics import Metrics, MetricsHook, RequestSample, TokenEvent
+from iol_client.rate_limiter import RateLimiter
+from iol_client.token_manager import TokenManager
+from iol_client.transport import Transport
+import pytest
+
+
+def muestra(status: int = 200, ttfb: float = 0.03) -> RequestSample:
+    return RequestSample(
+        endpoint="{mercado}/Titulos/{simbolo}/Cotizacion",
+        method="GET",
+        status=status,
+        connect=0.0,
+        ttfb=ttfb,
+        body=0.001,
+        decode=0.0002,
+        bytes=512,
+    )
+
+
+def test_metricas_por_endpoint():
+    metrics = Metrics()
+    metrics.on_request(muestra())
+    metrics.on_request(muestra(ttfb=0.2))
+    metrics.on_request(muestra(status=500))
+
+    (endpoint,) = metrics.snapshot()["requests"]
+    assert endpoint["count"] == 3
+    assert endpoint["bytes"] == 1536
+    assert endpoint["status"] == {"200": 2, "500": 1}
+    ttfb = endpoint["seconds"]["ttfb"]
+    assert ttfb["count"] == 3
+    assert ttfb["buckets"]["0.05"] == 2
+    assert ttfb["buckets"]["+Inf"] == 3
+    assert json.loads(metrics.to_json()) == metrics.snapshot()
+
+
+def test_formato_prometheus():
+    metrics = Metrics()
+    metrics.on_request(muestra())
+    metrics.on_token(TokenEvent(kind="refresh", duration=0.1, ok=False))
+
+    texto = metrics.prometheus()
+    labels = 'endpoint="{mercado}/Titulos/{simbolo}/Cotizacion",method="GET"'
+    assert f'iol_requests_total{{{labels},status="200"}} 1' in texto
+    assert f'iol_request_seconds_count{{{labels},phase="ttfb"}} 1' in texto
+    assert 'iol_token_requests_total{kind="refresh",result="error"} 1' in texto
+
+
+def test_hooks_reciben_cada_medicion():
+    class Hook(MetricsHook):
+        def __init__(self):
+            self.recibidas = []
+
+        def on_request(self, sample):
+            self.recibidas.append(sample)
+
+    hook = Hook()
+    metrics = Metrics(hooks=[hook])
+    metrics.on_request(muestra())
+    assert hook.recibidas == [muestra()]
+
+
+@pytest.mark.asyncio
+async def test_eventos_de_token():
+    metrics = Metrics()
+    token_manager = TokenManager("user", "pass", metrics=metrics)
+
+    async def post_token(data):
+        if data["grant_type"] == "refresh_token":
+            raise ConnectionError("Authentication Error 401")
+        return {}
+
+    token_manager._post_token = post_token
+    await token_manager._fetch_token({"grant_type": "password"})
+    with pytest.raises(ConnectionError):
+        await token_manager._fetch_token({"grant_type": "refresh_token"})
+
+    tokens = metrics.snapshot()["tokens"]
+    assert tokens["get"]["results"] == {"ok": 1}
+    assert tokens["refresh"]["results"] == {"error": 1}
+
+
+class TransporteConFallas(Transport):
+    async def request(
+        self, method, url, headers=None, data_body=None, json_body=None, trace=None
+    ):
+        if "GGAL" in url:
+            await asyncio.sleep(10)
+        raise ConnectionError("Conexion rechazada")
+
+
+@pytest.mark.asyncio
+async def test_consultas_sin_respuesta_se_cuentan():
+    metrics = Metrics()
+    client = IOLClient(
+        "user",
+        "pass",
+        rate_limiter=RateLimiter(budgets={}),
+        response_cache=ResponseCache(ttls={}),
+        metrics=metrics,
+        transport=TransporteConFallas(),
+    )
+
+    async def get_headers():
+        return {}
+
+    client._get_headers = get_headers
+    with pytest.raises(TimeoutError):
+        await client.get_titulo_cotizacion("GGAL", Mercado.BCBA, timeout=0.05)
+    with pytest.raises(ConnectionError):
+        await client.get_titulo_cotizacion("YPFD", Mercado.BCBA)
+
+    (endpoint,) = metrics.snapshot()["requests"]
+    assert endpoint["status"] == {"timeout": 1, "error": 1}
+    assert endpoint["seconds"]["ttfb"]["count"] == 2
+    assert 'status="timeout"} 1' in metrics.prometheus()
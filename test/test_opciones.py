@@ -0,0 +1,103 @@
+import math
+from datetime import datetime
+
+from iol_client.opciones import (
+    CadenaOpciones,
+    _norm_cdf,
+    black_scholes,
+    parse_strike,
+    volatilidad_implicita,
+)
+import numpy as np
+
+AHORA = datetime(2023, 11, 24, 17, 0, 0)
+SPOT = 1000.0
+TASA = 0.5
+
+
+def cadena_falsa(vols: dict[float, float]) -> list[dict]:
+    vencimiento = datetime(2024, 2, 16, 17, 0, 0)
+    t = (vencimiento - AHORA).total_seconds() / (365 * 24 * 3600)
+    opciones = []
+    for strike, vol in vols.items():
+        for tipo in ("Call", "Put"):
+            prima = float(black_scholes(SPOT, strike, t, vol, tipo == "Call", TASA))
+            opciones.append(
+                {
+                    "cotizacion": {"ultimoPrecio": prima, "puntas": None},
+                    "simboloSubyacente": "GGAL",
+                    "fechaVencimiento": vencimiento.strftime("%Y-%m-%dT%H:%M:%S"),
+                    "tipoOpcion": tipo,
+                    "simbolo": f"GF{tipo[0]}{int(strike)}FE",
+                    "descripcion": f"{tipo} GGAL {strike:,.2f} Vencimiento: 16/02/2024",
+                    "mercado": "bCBA",
+                }
+            )
+    return opciones
+
+
+def test_parse_strike():
+    assert parse_strike("Call GGAL 1,234.50 Vencimiento: 15/12/2023") == 1234.5
+    assert parse_strike("Put GGAL 980.00 Vencimiento: 15/12/2023") == 980.0
+    assert parse_strike("GGAL") is None
+
+
+def test_norm_cdf():
+    x = np.linspace(-8, 8, 161)
+    esperado = [0.5 * math.erfc(-v / math.sqrt(2)) for v in x]
+    np.testing.assert_allclose(_norm_cdf(x), esperado, rtol=2e-7, atol=1e-12)
+
+
+def test_volatilidad_implicita_de_toda_la_cadena():
+    vols = {800.0: 0.65, 900.0: 0.6, 1000.0: 0.55, 1100.0: 0.5, 1300.0: 0.7}
+    cadena = CadenaOpciones(cadena_falsa(vols), ahora=AHORA)
+
+    analisis = cadena.evaluar(SPOT, tasa=TASA)
+
+    esperadas = np.repeat(list(vols.values()), 2)
+    np.testing.assert_allclose(analisis["iv"], esperadas, atol=1e-5)
+    np.testing.assert_allclose(analisis["moneyness"], SPOT / cadena.strike)
+    # paridad: delta del call menos delta del put es 1
+    delta = analisis["delta"]
+    np.testing.assert_allclose(delta[0::2] - delta[1::2], 1.0, atol=1e-9)
+
+
+def test_griegas_contra_diferencias_finitas():
+    cadena = CadenaOpciones(cadena_falsa({950.0: 0.5}), ahora=AHORA)
+    vol = np.array([0.5, 0.5])
+    griegas = cadena.griegas(SPOT, vol, TASA)
+
+    def prima(spot=SPOT, v=vol, t=cadena.t):
+        return black_scholes(spot, cadena.strike, t, v, cadena.es_call, TASA)
+
+    h = 0.01
+    delta = (prima(SPOT + h) - prima(SPOT - h)) / (2 * h)
+    gamma = (prima(SPOT + h) - 2 * prima() + prima(SPOT - h)) / h**2
+    vega = (prima(v=vol + 1e-4) - prima(v=vol - 1e-4)) / 2e-4 / 100
+    # theta por dia: la prima cae a medida que se acorta el plazo
+    e = 1e-5
+    theta = (prima(t=cadena.t - e) - prima(t=cadena.t + e)) / (2 * e) / 365
+
+    np.testing.assert_allclose(griegas["delta"], delta, rtol=1e-5)
+    np.testing.assert_allclose(griegas["gamma"], gamma, rtol=1e-3)
+    np.testing.assert_allclose(griegas["vega"], vega, rtol=1e-5)
+    np.testing.assert_allclose(griegas["theta"], theta, rtol=1e-4)
+
+
+def test_primas_fuera_de_limites_dan_nan():
+    vol, _ = volatilidad_implicita(
+        [0.0, 1200.0, 50.0], SPOT, [1000.0, 1000.0, 1000.0], 0.25, True
+    )
+    assert np.isnan(vol[0]) and np.isnan(vol[1]) and not np.isnan(vol[2])
+
+
+def test_reevaluar_parte_de_la_ultima_volatilidad():
+    vols = {s: 0.5 + (s - 1000.0) ** 2 / 1e6 for s in np.arange(700.0, 1400.0, 20.0)}
+    cadena = CadenaOpciones(cadena_falsa(vols), ahora=AHORA)
+
+    cadena.evaluar(SPOT, tasa=TASA)
+    primera = cadena.iteraciones
+    cadena.evaluar(SPOT, tasa=TASA)
+
+    assert cadena.iteraciones < primera
+    assert cadena.iteraciones <= 2
@@ -0,0 +1,149 @@
+from datetime import date, datetime, timedelta
+
+from iol_client.constants import EstadoDeOperaciones, Pais
+from iol_client.operaciones_sync import OperacionesSync
+import pytest
+
+
+def operacion(numero: int, dia: date, estado: str = "terminada") -> dict:
+    return {
+        "numero": numero,
+        "fechaOrden": datetime(dia.year, dia.month, dia.day, 11, 0, 0, 123000),
+        "tipo": "Compra",
+        "estado": estado,
+        "mercado": "BCBA",
+        "simbolo": "GGAL",
+        "cantidad": 10,
+    }
+
+
+class FakeClient:
+    def __init__(self, operaciones: list[dict]):
+        self.operaciones = {o["numero"]: o for o in operaciones}
+        self.consultas = []
+        self.detalles = []
+
+    async def get_operaciones(self, estado, pais, fecha_desde, fecha_hasta):
+        self.consultas.append((estado, fecha_desde, fecha_hasta))
+        res = []
+        for o in self.operaciones.values():
+            if not fecha_desde <= o["fechaOrden"].date() < fecha_hasta:
+                continue
+            if estado == EstadoDeOperaciones.PENDIENTES and o["estado"] != "pendiente":
+                continue
+            res.append(dict(o))
+        return res
+
+    async def get_operacion(self, numero):
+        self.detalles.append(numero)
+        o = self.operaciones[numero]
+        return {
+            "numero": numero,
+            "fechaAlta": o["fechaOrden"],
+            "estadoActual": o["estado"],
+            "cantidad": o["cantidad"],
+            "estados": [],
+        }
+
+
+@pytest.mark.asyncio
+async def test_primera_sincronizacion_en_ventanas_y_despues_incremental():
+    hoy = date(2023, 6, 30)
+    client = FakeClient(
+        [operacion(i, date(2023, 1, 1) + timedelta(days=i * 10)) for i in range(18)]
+    )
+    sync = OperacionesSync(client, window_days=30)
+
+    primera = await sync.sincronizar(desde=date(2023, 1, 1), hoy=hoy)
+
+    assert primera.nuevas == 18 and primera.consultas == 7
+    assert len(client.consultas) == 7
+    assert sync.watermark(EstadoDeOperaciones.TODAS, Pais.ARG) == hoy
+
+    client.consultas.clear()
+    client.operaciones[100] = operacion(100, date(2023, 7, 2))
+    segunda = await sync.sincronizar(hoy=date(2023, 7, 3))
+
+    # solo el tramo desde la ultima sincronizacion, con un dia de solapamiento
+    assert client.consultas == [
+        (EstadoDeOperaciones.TODAS, date(2023, 6, 29), date(2023, 7, 4))
+    ]
+    assert segunda.nuevas == 1 and segunda.actualizadas == 0
+
+    leidas = sync.leer(Pais.ARG)
+    assert [o["numero"] for o in leidas[:2]] == [100, 17]
+    assert leidas[0]["fechaOrden"] == datetime(2023, 7, 2, 11, 0, 0, 123000)
+
+
+@pytest.mark.asyncio
+async def test_revisa_solo_las_pendientes_con_get_operacion():
+    client = FakeClient(
+        [
+            operacion(1, date(2023, 1, 5)),
+            operacion(2, date(2023, 1, 6), "pendiente"),
+            operacion(3, date(2023, 1, 7), "iniciada"),
+        ]
+    )
+    sync = OperacionesSync(client, window_days=365)
+    await sync.sincronizar(desde=date(2023, 1, 1), hoy=date(2023, 1, 10))
+    assert client.detalles == []
+
+    client.operaciones[2]["estado"] = "terminada"
+    client.consultas.clear()
+    resultado = await sync.sincronizar(hoy=date(2023, 3, 1))
+
+    assert sorted(client.detalles) == [2, 3]
+    assert resultado.actualizadas == 1 and resultado.pendientes == 1
+    assert [o["numero"] for o in sync.leer(Pais.ARG, solo_pendientes=True)] == [3]
+    assert sync.leer(Pais.ARG)[1]["estado"] == "terminada"
+
+
+@pytest.mark.asyncio
+async def test_muchas_pendientes_se_revisan_con_una_consulta():
+    dia = date(2023, 1, 5)
+    client = FakeClient([operacion(i, dia, "pendiente") for i in range(20)])
+    sync = OperacionesSync(client, window_days=365, max_individuales=5)
+    await sync.sincronizar(desde=date(2023, 1, 1), hoy=date(2023, 1, 10))
+
+    client.operaciones[7]["estado"] = "cancelada"
+    client.consultas.clear()
+    resultado = await sync.reconciliar_pendientes(Pais.ARG, hoy=date(2023, 2, 1))
+
+    assert client.consultas == [(EstadoDeOperaciones.PENDIENTES, dia, date(2023, 2, 2))]
+    assert client.detalles == [7]
+    assert resultado.consultas == 2 and resultado.pendientes == 19
+
+
+@pytest.mark.asyncio
+async def test_pendientes_viejas_o_sin_fecha_no_se_revisan_para_siempre():
+    client = FakeClient(
+        [operacion(i, date(2023, 5, 1), "en_proceso") for i in range(6)]
+        + [operacion(10, date(2023, 1, 5), "desconocido")]
+    )
+    sync = OperacionesSync(
+        client, window_days=365, max_individuales=5, max_dias_pendiente=60
+    )
+    await sync.sincronizar(desde=date(2023, 1, 1), hoy=date(2023, 5, 2))
+    sin_fecha = dict(client.operaciones[0], numero=20, fechaOrden=None)
+    sync.guardar(Pais.ARG, [sin_fecha])
+
+    client.consultas.clear()
+    await sync.reconciliar_pendientes(Pais.ARG, hoy=date(2023, 5, 10))
+
+    # la operacion de enero supera los 60 dias y la sin fecha no tiene antiguedad
+    assert client.consultas == [
+        (EstadoDeOperaciones.PENDIENTES, date(2023, 5, 1), date(2023, 5, 11))
+    ]
+    assert sorted(client.detalles) == list(range(6))
+
+    # sin limite la pendiente sin fecha se revisa, sin romper el calculo del rango
+    client.operaciones[20] = dict(sin_fecha, fechaOrden=datetime(2023, 5, 1))
+    client.detalles.clear()
+    sync.max_dias_pendiente = None
+    await sync.reconciliar_pendientes(Pais.ARG, hoy=date(2023, 5, 10))
+    assert sorted(client.detalles) == [*range(6), 10, 20]
+
+
+def test_ventanas_de_al_menos_un_dia():
+    with pytest.raises(AttributeError):
+        OperacionesSync(FakeClient([]), window_days=0)
@@ -0,0 +1,43 @@
+import numpy as np
+
+from iol_client.panel_snapshot import PanelSnapshot
+
+
+def titulo(simbolo, precio, compra=None):
+    puntas = (
+        None if compra is None else {"precioCompra": compra, "precioVenta": compra + 1}
+    )
+    return {
+        "simbolo": simbolo,
+        "ultimoPrecio": precio,
+        "volumen": 100,
+        "puntas": puntas,
+    }
+
+
+def test_aplicar_devuelve_solo_los_cambios():
+    snapshot = PanelSnapshot(capacity=2)
+    primera = snapshot.aplicar(
+        {"titulos": [titulo("GGAL", 1000, 999), titulo("YPFD", 15000)]}
+    )
+    assert [t["simbolo"] for t in primera] == ["GGAL", "YPFD"]
+
+    sin_cambios = snapshot.aplicar(
+        {"titulos": [titulo("GGAL", 1000, 999), titulo("YPFD", 15000)]}
+    )
+    assert sin_cambios == []
+
+    cambios = snapshot.aplicar(
+        {
+            "titulos": [
+                titulo("YPFD", 15000),
+                titulo("GGAL", 1000, 998),
+                titulo("BMA", 2000),
+            ]
+        }
+    )
+    assert [t["simbolo"] for t in cambios] == ["GGAL", "BMA"]
+    assert len(snapshot) == 3
+    assert snapshot.fila("GGAL")["precioVenta"] == 999
+    assert np.isnan(snapshot.fila("YPFD")["precioCompra"])
+    assert snapshot.columna("ultimoPrecio").tolist() == [1000, 15000, 2000]
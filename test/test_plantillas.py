@@ -0,0 +1,72 @@
+import asyncio
+from datetime import datetime
+import json
+
+from iol_client import IOLClient
+from iol_client.constants import Mercado, TipoDeOrden
+from iol_client.ordenes import OrdenDeCompra
+import numpy as np
+import pytest
+
+
+class ClienteFalso:
+    def __init__(self) -> None:
+        self.enviados = []
+        self.calentado = 0
+
+    async def calentar(self):
+        self.calentado += 1
+
+    async def _post_operar(self, path, payload, timeout=None):
+        self.enviados.append((path, payload))
+        await asyncio.sleep(0.01)
+        return {"ok": True, "numeroOperacion": 1}
+
+
+def plantilla(client, **kwargs):
+    return IOLClient.plantilla_de_compra(client, Mercado.BCBA, "GGAL", **kwargs)
+
+
+def test_cuerpo_igual_al_de_la_orden():
+    validez = datetime(2023, 11, 24, 23, 59, 59)
+    compra = plantilla(ClienteFalso(), validez=validez)
+    orden = OrdenDeCompra(
+        Mercado.BCBA, "GGAL", validez=validez, cantidad=10, precio=1234.5
+    )
+    assert json.loads(compra.body(1234.5, 10)) == orden.json()
+
+    mercado = plantilla(ClienteFalso(), tipo_orden=TipoDeOrden.PRECIO_MERCADO)
+    assert json.loads(mercado.body(0, 50000))["monto"] == 50000
+
+
+def test_escalares_de_numpy():
+    compra = plantilla(ClienteFalso())
+    body = json.loads(compra.body(np.float64(1234.5), np.int64(10)))
+    assert body["precio"] == 1234.5 and body["cantidad"] == 10
+    assert compra.body(np.float64(1234.5), np.int64(10)) == compra.body(1234.5, 10)
+    with pytest.raises(AttributeError):
+        compra.body(np.float64("nan"), 10)
+
+
+def test_validacion_de_precio_y_cantidad():
+    compra = plantilla(ClienteFalso())
+    with pytest.raises(AttributeError):
+        compra.body(0, 10)
+    with pytest.raises(AttributeError):
+        compra.body(100, 0)
+    with pytest.raises(AttributeError):
+        compra.body(float("nan"), 10)
+
+
+@pytest.mark.asyncio
+async def test_envio_con_rtt_y_conexion_caliente():
+    client = ClienteFalso()
+    async with plantilla(client) as compra:
+        ack = await compra.enviar(precio=100, cantidad=5)
+
+    assert client.calentado == 1
+    assert client.enviados[0][0] == "operar/Comprar"
+    assert isinstance(client.enviados[0][1], bytes)
+    assert ack.numero_operacion == 1
+    assert ack.rtt >= 0.01
+    assert compra.rtt_percentil(0.5) == ack.rtt
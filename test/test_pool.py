@@ -0,0 +1,83 @@
+import asyncio
+
+from benchmarks.servidor import ServidorIOL
+from iol_client.cache import ResponseCache
+from iol_client.constants import Mercado
+from iol_client.pool import IOLClientPool
+from iol_client.rate_limiter import FairRateLimiter
+import pytest
+
+
+@pytest.mark.asyncio
+async def test_turnos_entre_cuentas():
+    limiter = FairRateLimiter({"titulos": (200.0, 1.0)})
+    orden = []
+
+    async def consulta(cuenta: str):
+        await limiter.acquire("bCBA/Titulos/GGAL", cuenta)
+        orden.append(cuenta)
+
+    # la cuenta "a" encola 10 consultas antes que "b" y "c"
+    tareas = [asyncio.create_task(consulta("a")) for _ in range(10)]
+    await asyncio.sleep(0)
+    tareas += [asyncio.create_task(consulta(c)) for c in ("b", "b", "c")]
+    await asyncio.gather(*tareas)
+
+    assert orden[:7] == ["a", "a", "b", "c", "a", "b", "a"]
+    assert limiter.pending("a") == 0
+
+
+@pytest.mark.asyncio
+async def test_consulta_cancelada_no_bloquea_el_turno():
+    limiter = FairRateLimiter({"titulos": (50.0, 1.0)})
+    await limiter.acquire("Titulos", "a")
+    cancelada = asyncio.create_task(limiter.acquire("Titulos", "a"))
+    await asyncio.sleep(0)
+    cancelada.cancel()
+    await asyncio.wait_for(limiter.acquire("Titulos", "b"), 1)
+    # las familias sin presupuesto no esperan turno
+    await limiter.acquire("operar/Comprar", "a")
+
+
+@pytest.mark.asyncio
+async def test_pool_comparte_conexiones_y_reparte_consultas_de_mercado():
+    async with ServidorIOL() as servidor:
+        cuentas = {"a": ("user_a", "pass_a"), "b": ("user_b", "pass_b")}
+        async with IOLClientPool(
+            cuentas, base_url=servidor.base_url, token_url=servidor.token_url
+        ) as pool:
+            cotizaciones = await asyncio.gather(
+                *[pool.get_titulo_cotizacion("GGAL", Mercado.BCBA) for _ in range(4)]
+            )
+            sesiones = {
+                id(await client.transport._get_session())
+                for client in pool.clients.values()
+            }
+
+            assert len(sesiones) == 1
+            assert all(c["ultimoPrecio"] == 1234.5 for c in cotizaciones)
+            # cada cuenta obtiene su propio token
+            assert servidor.token_requests == 2
+            managers = [client.token_manager for client in pool.clients.values()]
+            assert all(manager.requested_token for manager in managers)
+            assert len({manager.token["access_token"] for manager in managers}) == 2
+
+
+@pytest.mark.asyncio
+async def test_cache_compartida_entre_cuentas():
+    # la cache recibida esta vacia y no debe reemplazarse por la de defecto
+    cache = ResponseCache(ttls={r"^[^/]+/Titulos/[^/]+/Cotizacion$": 60})
+    async with ServidorIOL() as servidor:
+        cuentas = {"a": ("user_a", "pass_a"), "b": ("user_b", "pass_b")}
+        async with IOLClientPool(
+            cuentas,
+            base_url=servidor.base_url,
+            token_url=servidor.token_url,
+            response_cache=cache,
+        ) as pool:
+            primera = await pool["a"].get_titulo_cotizacion("GGAL", Mercado.BCBA)
+            segunda = await pool["b"].get_titulo_cotizacion("GGAL", Mercado.BCBA)
+
+    assert pool.response_cache is cache
+    assert primera == segunda
+    assert servidor.requests == 1
@@ -0,0 +1,55 @@
+import asyncio
+import time
+
+from iol_client.rate_limiter import RateLimiter, TokenBucket, familia, parse_retry_after
+import pytest
+
+
+def test_familias():
+    assert familia("operar/Comprar") == "operar"
+    assert familia("operaciones/123") == "operaciones"
+    assert familia("bCBA/Titulos/GGAL/Cotizacion") == "titulos"
+    assert familia("Cotizaciones/Acciones/Merval/argentina") == "titulos"
+    assert familia("portafolio/argentina") == "cuenta"
+
+
+def test_retry_after():
+    assert parse_retry_after("2") == 2.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("Fri, 26 Nov 2021 18:15:14 GMT") == 0.0
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_respeta_la_tasa():
+    bucket = TokenBucket(rate=100, capacity=5)
+    inicio = time.monotonic()
+    await asyncio.gather(*[bucket.acquire() for _ in range(25)])
+    # 5 de rafaga y 20 a 100 por segundo
+    assert time.monotonic() - inicio >= 0.19
+
+
+@pytest.mark.asyncio
+async def test_rechazo_reduce_la_tasa_y_respeta_retry_after():
+    limiter = RateLimiter({"titulos": (100.0, 1.0)})
+    bucket = limiter.bucket("bCBA/Titulos/GGAL")
+    limiter.feedback("bCBA/Titulos/GGAL", 429, retry_after=0.1)
+    assert bucket.rate == 50.0
+
+    inicio = time.monotonic()
+    await limiter.acquire("bCBA/Titulos/GGAL")
+    assert time.monotonic() - inicio >= 0.09
+
+    for _ in range(10):
+        limiter.feedback("bCBA/Titulos/GGAL", 200)
+    assert bucket.rate >= 90.0
+    # las familias sin presupuesto no se limitan
+    await limiter.acquire("operar/Comprar")
+
+
+def test_rechazos_simultaneos_reducen_la_tasa_una_vez():
+    limiter = RateLimiter({"titulos": (100.0, 1.0)})
+    bucket = limiter.bucket("bCBA/Titulos/GGAL")
+    for _ in range(20):
+        limiter.feedback("bCBA/Titulos/GGAL", 429)
+    assert bucket.rate == 50.0
+    assert bucket.ceiling == 90.0
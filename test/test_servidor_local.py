@@ -0,0 +1,49 @@
+import asyncio
+from datetime import date, datetime
+
+from benchmarks.bench_client import comparar, crear_cliente
+from benchmarks.servidor import ServidorIOL
+from iol_client.constants import Ajustada, Mercado
+import pytest
+
+
+@pytest.mark.asyncio
+async def test_cliente_contra_servidor_local():
+    async with ServidorIOL() as servidor:
+        async with crear_cliente(servidor) as client:
+            cotizacion = await client.get_titulo_cotizacion("GGAL", Mercado.BCBA)
+            serie = await client.get_titulo_historicos(
+                "GGAL",
+                Mercado.BCBA,
+                Ajustada.AJUSTADA,
+                date(2014, 1, 1),
+                date(2023, 12, 31),
+            )
+
+    assert cotizacion["ultimoPrecio"] == 1234.5
+    assert isinstance(serie[0]["fechaHora"], datetime)
+    assert servidor.token_requests == 1
+
+
+@pytest.mark.asyncio
+async def test_una_renovacion_de_token_por_ronda():
+    async with ServidorIOL() as servidor:
+        async with crear_cliente(servidor) as client:
+            await client.get_titulo_cotizacion("GGAL", Mercado.BCBA)
+            client.token_manager.token[".expires"] = datetime.utcnow()
+            await asyncio.gather(
+                *[
+                    client.get_titulo_cotizacion(f"SIM{i}", Mercado.BCBA)
+                    for i in range(20)
+                ]
+            )
+
+    assert servidor.token_requests == 2
+
+
+def test_comparar_detecta_regresiones():
+    previo = [{"nombre": "cotizacion", "rps": 1000.0, "p95_ms": 10.0}]
+    actual = [{"nombre": "cotizacion", "rps": 700.0, "p95_ms": 10.5}]
+    assert comparar(actual, previo, tolerancia=0.15) == [
+        "cotizacion: rps 1000.0 -> 700.0"
+    ]
@@ -0,0 +1,11 @@
+from iol_client import IOLClient
+import pytest
+
+
+@pytest.mark.asyncio
+async def test_pool_compartido_con_token_manager():
+    async with IOLClient(username="user", password="pass", limit_per_host=5) as client:
+        session = await client._get_session()
+        assert session is await client.token_manager._get_session()
+        assert session.connector.limit_per_host == 5
+    assert session.closed
@@ -0,0 +1,153 @@
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import date, datetime
+import json
+
+from benchmarks.bench_client import crear_cliente
+from benchmarks.payloads import historico_payload
+from benchmarks.servidor import ServidorIOL
+from iol_client import IOLClient
+from iol_client.constants import Ajustada, Mercado
+from iol_client.metrics import Metrics
+from iol_client.rate_limiter import RateLimiter
+from iol_client.streaming import JsonArrayParser
+from iol_client.transport import StreamResponse, Transport
+from iol_client.utils import HISTORICOS_DATE_FIELDS, make_iol_decoder_hook
+import pytest
+
+
+def parsear(body: bytes, chunk_size: int, hook=None) -> list:
+    parser = JsonArrayParser(hook)
+    items = []
+    for i in range(0, len(body), chunk_size):
+        items += parser.feed(body[i : i + chunk_size])
+    return items + parser.close()
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 4096])
+def test_mismo_resultado_que_la_respuesta_completa(chunk_size):
+    hook = make_iol_decoder_hook(HISTORICOS_DATE_FIELDS)
+    payload = historico_payload(50).replace("Galicia", "Galicia ñandú")
+    esperado = json.loads(payload, object_hook=hook)
+    assert parsear(payload.encode(), chunk_size, hook) == esperado
+
+
+def test_escalares_y_arrays_vacios():
+    assert parsear(b' [1, 23 ,456,\n-7.5e3, null, "a,]"] ', 1) == [
+        1,
+        23,
+        456,
+        -7500.0,
+        None,
+        "a,]",
+    ]
+    assert parsear(b"[ ]", 1) == []
+
+
+@pytest.mark.parametrize("chunk_size", [1, 5, 4096])
+def test_separadores_dentro_de_cadenas_y_objetos_anidados(chunk_size):
+    body = b'[{"a": "x},{"}, {"b": {"c": 1}, "d": [2, {}]}, 3, {"e": "\\"},"}]'
+    assert parsear(body, chunk_size) == json.loads(body)
+
+
+@pytest.mark.parametrize(
+    "body", [b'[{"a": 1}', b'{"message": "error"}', b"[1,]", b"[1] 2"]
+)
+def test_respuestas_invalidas(body):
+    with pytest.raises(json.JSONDecodeError):
+        parsear(body, 3)
+
+
+def test_memoria_acotada():
+    body = historico_payload(2000).encode()
+    parser = JsonArrayParser()
+    maximo = 0
+    for i in range(0, len(body), 4096):
+        parser.feed(body[i : i + 4096])
+        maximo = max(maximo, len(parser._buf))
+    parser.close()
+    assert maximo < 4096 + 1000
+
+
+@pytest.mark.asyncio
+async def test_iter_titulo_historicos():
+    args = ("GGAL", Mercado.BCBA, Ajustada.AJUSTADA, date(2014, 1, 1), date(2023, 1, 1))
+    async with ServidorIOL() as servidor:
+        async with crear_cliente(servidor) as client:
+            serie = await client.get_titulo_historicos(*args)
+            barras = [barra async for barra in client.iter_titulo_historicos(*args)]
+    assert barras == serie
+
+
+async def partes(*chunks: bytes):
+    for chunk in chunks:
+        yield chunk
+
+
+class TransportePorPartes(Transport):
+    def __init__(self, respuestas: list):
+        self.respuestas = respuestas
+        self.urls = []
+
+    async def request(self, *args, **kwargs):
+        raise AssertionError("Se esperaba una consulta por partes")
+
+    @asynccontextmanager
+    async def stream(self, method, url, headers=None, data_body=None, json_body=None):
+        self.urls.append(url)
+        respuesta = self.respuestas.pop(0)
+        if respuesta is None:
+            # conexion que nunca devuelve los encabezados
+            await asyncio.sleep(10)
+        yield respuesta
+
+
+def cliente_por_partes(*respuestas, **kwargs) -> IOLClient:
+    client = IOLClient(
+        "user",
+        "pass",
+        rate_limiter=RateLimiter(budgets={}),
+        transport=TransportePorPartes(list(respuestas)),
+        **kwargs,
+    )
+
+    async def get_headers():
+        return {}
+
+    client._get_headers = get_headers
+    return client
+
+
+ARGS = ("GGAL", Mercado.BCBA, Ajustada.AJUSTADA, date(2023, 1, 1), date(2023, 1, 2))
+
+
+@pytest.mark.asyncio
+async def test_plazo_limite_hasta_los_encabezados():
+    client = cliente_por_partes(None)
+    with pytest.raises(TimeoutError):
+        async for _ in client.iter_titulo_historicos(*ARGS, timeout=0.05):
+            pass
+
+
+@pytest.mark.asyncio
+async def test_fecha_hasta_por_defecto_es_el_dia_de_la_consulta():
+    client = cliente_por_partes(StreamResponse(200, partes(b"[]")))
+    async for _ in client.iter_titulo_historicos(*ARGS[:4]):
+        pass
+    (url,) = client.transport.urls
+    assert url.endswith(f"/{date.today():%Y-%m-%d}/ajustada")
+
+
+@pytest.mark.asyncio
+async def test_reintento_y_metricas_por_partes():
+    metrics = Metrics()
+    client = cliente_por_partes(
+        StreamResponse(429, partes(b"{}")),
+        StreamResponse(200, partes(b'[{"fechaHora": "2023-01-02T1', b'7:00:00"}]')),
+        metrics=metrics,
+    )
+    barras = [barra async for barra in client.iter_titulo_historicos(*ARGS)]
+
+    assert barras == [{"fechaHora": datetime(2023, 1, 2, 17)}]
+    (endpoint,) = metrics.snapshot()["requests"]
+    assert endpoint["status"] == {"429": 1, "200": 1}
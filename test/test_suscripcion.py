@@ -0,0 +1,78 @@
+import asyncio
+
+from iol_client.constants import Instrumento, Mercado, Pais, Panel
+from iol_client.suscripcion import SuscripcionCotizaciones
+import pytest
+
+
+class ClienteFalso:
+    def __init__(self) -> None:
+        self.precios = {"GGAL": 1000.0, "YPFD": 15000.0, "BMA": 2000.0}
+        self.consultas = []
+
+    async def get_panel_cotizaciones(self, pais, instrumento, panel):
+        self.consultas.append("panel")
+        return {
+            "titulos": [
+                {"simbolo": s, "ultimoPrecio": p}
+                for s, p in self.precios.items()
+                if s != "BMA"
+            ]
+        }
+
+    async def get_titulo_cotizacion(self, simbolo, mercado):
+        self.consultas.append(simbolo)
+        if self.precios[simbolo] is None:
+            return {"message": "Error interno"}
+        return {"ultimoPrecio": self.precios[simbolo]}
+
+
+@pytest.mark.asyncio
+async def test_usa_el_panel_y_solo_emite_cambios():
+    client = ClienteFalso()
+    feed = SuscripcionCotizaciones(
+        client,
+        simbolos=["GGAL", "YPFD", "BMA"],
+        mercado=Mercado.BCBA,
+        pais=Pais.ARG,
+        instrumento=Instrumento.ARG.ACCIONES,
+        panel=Panel.ARG.ACCIONES.MERVAL,
+        intervalo=0.01,
+    )
+    async with feed:
+        primera = await feed.__anext__()
+        assert sorted(primera) == ["BMA", "GGAL", "YPFD"]
+        assert client.consultas[:2] == ["panel", "BMA"]
+
+        client.precios["GGAL"] = 1010.0
+        segunda = await feed.__anext__()
+        assert segunda == {"GGAL": {"simbolo": "GGAL", "ultimoPrecio": 1010.0}}
+
+
+@pytest.mark.asyncio
+async def test_consumidor_lento_recibe_la_ultima_cotizacion():
+    client = ClienteFalso()
+    feed = SuscripcionCotizaciones(client, simbolos=["GGAL"], intervalo=0.005)
+    async with feed:
+        await feed.__anext__()
+        for precio in (1001.0, 1002.0, 1003.0):
+            client.precios["GGAL"] = precio
+            await asyncio.sleep(0.03)
+        cambios = await feed.__anext__()
+        assert cambios == {"GGAL": {"ultimoPrecio": 1003.0}}
+
+
+@pytest.mark.asyncio
+async def test_respuestas_de_error_no_son_cotizaciones():
+    client = ClienteFalso()
+    feed = SuscripcionCotizaciones(client, simbolos=["GGAL", "YPFD"], intervalo=0.005)
+    async with feed:
+        await feed.__anext__()
+        client.precios["GGAL"] = None
+        await asyncio.sleep(0.03)
+        client.precios["GGAL"] = 1000.0
+        client.precios["YPFD"] = 15100.0
+        await asyncio.sleep(0.03)
+        # GGAL volvio al mismo precio: no es un cambio
+        cambios = await feed.__anext__()
+        assert cambios == {"YPFD": {"ultimoPrecio": 15100.0}}
@@ -0,0 +1,76 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from iol_client.token_manager import TokenManager
+import pytest
+
+
+def token_falso(expires_in: int):
+    now = datetime.utcnow()
+    return {
+        ".expires": now + timedelta(seconds=expires_in),
+        ".refreshexpires": now + timedelta(hours=1),
+        "token_type": "bearer",
+        "access_token": "abc",
+        "refresh_token": "def",
+    }
+
+
+@pytest.mark.asyncio
+async def test_una_sola_renovacion_para_llamadas_concurrentes():
+    token_manager = TokenManager("user", "pass")
+    llamadas = []
+
+    async def fetch_token(data):
+        llamadas.append(data["grant_type"])
+        await asyncio.sleep(0.05)
+        token_manager.token = token_falso(900)
+        return token_manager.token
+
+    token_manager._fetch_token = fetch_token
+    headers = await asyncio.gather(
+        *[token_manager.ensure_access_token() for _ in range(50)]
+    )
+    assert llamadas == ["password"]
+    assert set(headers) == {"bearer abc"}
+
+
+@pytest.mark.asyncio
+async def test_renovacion_en_segundo_plano():
+    token_manager = TokenManager("user", "pass", refresh_ahead=timedelta(seconds=100))
+    llamadas = []
+
+    async def fetch_token(data):
+        llamadas.append(data["grant_type"])
+        # vence justo despues del margen de renovacion anticipada
+        token_manager.token = token_falso(100 if len(llamadas) == 1 else 900)
+        return token_manager.token
+
+    token_manager._fetch_token = fetch_token
+    token_manager.start_auto_refresh()
+    await asyncio.sleep(0.05)
+    await token_manager.close()
+    assert llamadas == ["password", "refresh_token"]
+
+
+@pytest.mark.asyncio
+async def test_token_de_vida_corta_no_renueva_sin_pausa():
+    token_manager = TokenManager(
+        "user",
+        "pass",
+        refresh_ahead=timedelta(seconds=300),
+        min_refresh_interval=0.05,
+    )
+    llamadas = []
+
+    async def fetch_token(data):
+        llamadas.append(data["grant_type"])
+        # siempre vence antes del margen de renovacion anticipada
+        token_manager.token = token_falso(120)
+        return token_manager.token
+
+    token_manager._fetch_token = fetch_token
+    token_manager.start_auto_refresh()
+    await asyncio.sleep(0.12)
+    await token_manager.close()
+    assert 2 <= len(llamadas) <= 4
@@ -0,0 +1,162 @@
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+import json
+import time
+
+from benchmarks.servidor import ServidorIOL
+from iol_client import IOLClient
+from iol_client.cache import ResponseCache
+from iol_client.constants import Mercado
+from iol_client.rate_limiter import RateLimiter
+from iol_client.transport import (
+    AiohttpTransport,
+    RecordingTransport,
+    ReplayTransport,
+    Transport,
+    TransportResponse,
+    VirtualClock,
+    leer_grabacion,
+)
+import pytest
+
+
+def cliente(transport: Transport, **kwargs) -> IOLClient:
+    return IOLClient(
+        "user",
+        "pass",
+        rate_limiter=RateLimiter(budgets={}),
+        response_cache=ResponseCache(ttls={}),
+        transport=transport,
+        **kwargs,
+    )
+
+
+@pytest.mark.asyncio
+async def test_grabar_y_reproducir(tmp_path):
+    archivo = tmp_path / "sesion.rec"
+    async with ServidorIOL() as servidor:
+        transport = RecordingTransport(AiohttpTransport(), archivo)
+        async with cliente(
+            transport, base_url=servidor.base_url, token_url=servidor.token_url
+        ) as client:
+            grabada = await client.get_titulo_cotizacion("GGAL", Mercado.BCBA)
+            opciones = await client.get_titulo_opciones("GGAL", Mercado.BCBA)
+
+    # solo las consultas a la API, sin tokens
+    assert [g.path for g in leer_grabacion(archivo)] == [
+        "/api/v2/bCBA/Titulos/GGAL/Cotizacion",
+        "/api/v2/bCBA/Titulos/GGAL/Opciones",
+    ]
+
+    # sin servidor: el base_url por defecto nunca se consulta
+    async with cliente(ReplayTransport(archivo)) as client:
+        assert await client.get_titulo_cotizacion("GGAL", Mercado.BCBA) == grabada
+        assert await client.get_titulo_opciones("GGAL", Mercado.BCBA) == opciones
+        assert await client.get_titulo_opciones("YPFD", Mercado.BCBA) == {
+            "message": "Sin respuesta grabada"
+        }
+
+
+TOKEN = json.dumps(
+    {
+        "access_token": "abc",
+        "token_type": "bearer",
+        "refresh_token": "def",
+        ".expires": format_datetime(
+            datetime.now(timezone.utc) + timedelta(hours=1), usegmt=True
+        ),
+        ".refreshexpires": format_datetime(
+            datetime.now(timezone.utc) + timedelta(hours=2), usegmt=True
+        ),
+    }
+).encode()
+
+
+class Secuencia(Transport):
+    def __init__(self):
+        self.n = 0
+
+    async def request(
+        self, method, url, headers=None, data_body=None, json_body=None, trace=None
+    ):
+        if url.endswith("/token"):
+            return TransportResponse(200, TOKEN)
+        self.n += 1
+        return TransportResponse(200, f'{{"ultimoPrecio": {self.n}}}'.encode())
+
+
+def grabar_cotizaciones(archivo, n: int):
+    tiempos = iter(range(1000, 1000 + 10 * n, 10))
+    return RecordingTransport(Secuencia(), archivo, clock=lambda: next(tiempos))
+
+
+@pytest.mark.asyncio
+async def test_reproduccion_en_orden_y_en_tiempo_virtual(tmp_path):
+    archivo = tmp_path / "sesion.rec"
+    async with cliente(grabar_cotizaciones(archivo, 3)) as client:
+        for _ in range(3):
+            await client.get_titulo_cotizacion("GGAL", Mercado.BCBA)
+
+    async with cliente(ReplayTransport(archivo)) as client:
+        precios = [
+            (await client.get_titulo_cotizacion("GGAL", Mercado.BCBA))["ultimoPrecio"]
+            for _ in range(4)
+        ]
+    assert precios == [1, 2, 3, 3]
+
+    clock = VirtualClock()
+    async with cliente(ReplayTransport(archivo, clock=clock)) as client:
+        precios = []
+        for _ in range(5):
+            cotizacion = await client.get_titulo_cotizacion("GGAL", Mercado.BCBA)
+            precios.append(cotizacion["ultimoPrecio"])
+            await client.transport.sleep(5)
+    assert precios == [1, 1, 2, 2, 3]
+    assert clock.time() == 1025
+
+
+@pytest.mark.asyncio
+async def test_reproduccion_sin_limitador_con_cliente_por_defecto(tmp_path):
+    archivo = tmp_path / "sesion.rec"
+    async with cliente(grabar_cotizaciones(archivo, 3)) as client:
+        for _ in range(3):
+            await client.get_titulo_cotizacion("GGAL", Mercado.BCBA)
+
+    # el limitador por defecto (10 consultas por segundo) demoraria 4 segundos
+    inicio = time.monotonic()
+    async with IOLClient("user", "pass", transport=ReplayTransport(archivo)) as client:
+        for _ in range(60):
+            await client.get_titulo_cotizacion("GGAL", Mercado.BCBA)
+    assert time.monotonic() - inicio < 1
+
+
+class Eco(Transport):
+    async def request(
+        self, method, url, headers=None, data_body=None, json_body=None, trace=None
+    ):
+        return TransportResponse(200, data_body)
+
+
+@pytest.mark.asyncio
+async def test_cuerpos_codificados_se_distinguen_en_la_grabacion(tmp_path):
+    archivo = tmp_path / "sesion.rec"
+    url = "https://api.invertironline.com/api/v2/operar/Comprar"
+    cuerpos = [b'{"simbolo": "GGAL"}', b'{"simbolo": "YPFD"}']
+    transport = RecordingTransport(Eco(), archivo)
+    for cuerpo in cuerpos:
+        await transport.request("POST", url, data_body=cuerpo)
+    await transport.close()
+
+    # solo se guarda el hash del cuerpo
+    assert all(g.body.startswith("sha256:") for g in leer_grabacion(archivo))
+    replay = ReplayTransport(archivo)
+    for cuerpo in reversed(cuerpos):
+        assert (await replay.request("POST", url, data_body=cuerpo)).body == cuerpo
+
+
+def test_transporte_sin_request_no_se_instancia():
+    class Incompleto(Transport):
+        pass
+
+    with pytest.raises(TypeError):
+        Incompleto()
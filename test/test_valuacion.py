@@ -0,0 +1,103 @@
+from iol_client.constants import Instrumento, Mercado, Pais, Panel, Tarifas
+from iol_client.valuacion import ValuacionCartera, valuar_portafolio
+import numpy as np
+import pytest
+
+
+def activo(simbolo, cantidad, ppc, precio, mercado="bcba", factor=1.0):
+    return {
+        "cantidad": cantidad,
+        "ppc": ppc,
+        "ultimoPrecio": precio,
+        "valorizado": cantidad * precio * factor,
+        "titulo": {"simbolo": simbolo, "mercado": mercado},
+    }
+
+
+PORTAFOLIO = {
+    "pais": "argentina",
+    "activos": [
+        activo("GGAL", 100, 1000.0, 1200.0),
+        activo("YPFD", 10, 20000.0, 19000.0),
+        # los bonos cotizan cada 100 nominales
+        activo("AL30", 1000, 50000.0, 55000.0, factor=0.01),
+        activo("AAPL", 5, 150.0, 180.0, mercado="nasdaq"),
+    ],
+}
+
+
+class FakeClient:
+    def __init__(self):
+        self.paneles = []
+        self.cotizaciones = []
+
+    async def get_portafolio(self, pais, timeout=None):
+        self.plazos = [timeout]
+        return PORTAFOLIO
+
+    async def get_panel_cotizaciones(self, pais, instrumento, panel, timeout=None):
+        self.plazos.append(timeout)
+        self.paneles.append(panel)
+        return {
+            "titulos": [
+                {"simbolo": "GGAL", "ultimoPrecio": 1300.0},
+                {"simbolo": "PAMP", "ultimoPrecio": 2000.0},
+            ]
+        }
+
+    async def get_titulo_cotizacion(self, simbolo, mercado, timeout=None):
+        self.plazos.append(timeout)
+        self.cotizaciones.append((simbolo, mercado))
+        precios = {"YPFD": 19000.0, "AL30": 55500.0, "AAPL": 190.0}
+        return {"ultimoPrecio": precios[simbolo]}
+
+
+def test_valuacion_y_resultado_por_posicion():
+    valuacion = ValuacionCartera.desde_portafolio(PORTAFOLIO, Tarifas.PLATINUM)
+
+    np.testing.assert_allclose(valuacion.valor, [120000, 190000, 550000, 900])
+    np.testing.assert_allclose(valuacion.resultado, [20000, -10000, 50000, 150])
+    np.testing.assert_allclose(valuacion.salida, valuacion.valor * 0.997)
+    assert valuacion.resultado_total == pytest.approx(60150)
+
+
+def test_cotizaciones_nuevas_actualizan_los_totales():
+    valuacion = ValuacionCartera.desde_portafolio(PORTAFOLIO, Tarifas.GOLD)
+
+    cambiados = valuacion.aplicar(
+        {"GGAL": {"ultimoPrecio": 1250.0}, "YPFD": 19000.0, "PAMP": 1.0}
+    )
+    assert cambiados == ["GGAL"]
+    assert valuacion.actualizar("AL30", 56000.0)
+    assert not valuacion.actualizar("AL30", {"ultimoPrecio": None})
+
+    total = valuacion.valor_total
+    valuacion.recalcular()
+    assert total == pytest.approx(valuacion.valor_total)
+    assert valuacion.valor_total == pytest.approx(125000 + 190000 + 560000 + 900)
+    assert valuacion.salida_total == pytest.approx(valuacion.valor_total * 0.995)
+
+
+@pytest.mark.asyncio
+async def test_refresca_por_panel_y_consulta_el_resto():
+    client = FakeClient()
+    panel = (Pais.ARG, Instrumento.ARG.ACCIONES, Panel.ARG.ACCIONES.PANEL_GENERAL)
+
+    valuacion = await valuar_portafolio(client, Pais.ARG, paneles=[panel], timeout=2)
+
+    assert client.paneles == [Panel.ARG.ACCIONES.PANEL_GENERAL]
+    assert sorted(client.cotizaciones) == [
+        ("AAPL", Mercado.NASDAQ),
+        ("AL30", Mercado.BCBA),
+        ("YPFD", Mercado.BCBA),
+    ]
+    assert valuacion.precio.tolist() == [1300.0, 19000.0, 55500.0, 190.0]
+    assert client.plazos == [2] * 5
+
+
+def test_total_sin_error_acumulado():
+    valuacion = ValuacionCartera.desde_portafolio(PORTAFOLIO, Tarifas.GOLD)
+    for i in range(10000):
+        valuacion.actualizar("GGAL", 1200.0 + (i % 7) * 0.1)
+        valuacion.actualizar("AAPL", 180.0 + (i % 3) * 0.01)
+    assert valuacion.valor_total == float(valuacion.valor.sum())